@@ -0,0 +1,115 @@
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from hub_utils.catalog import scan_catalog
+
+DEFAULT_MAX_KB = 100
+
+
+def logo_root(hub_root):
+    return f"{hub_root}/static/assets/logos"
+
+
+def logo_files(hub_root):
+    for root, _, files in os.walk(logo_root(hub_root)):
+        for file in sorted(files):
+            yield os.path.join(root, file)
+
+
+def _hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest(), os.path.getsize(path)
+
+
+def _logo_path(hub_root, logo_url):
+    # logo_url is relative to the site root, e.g. /assets/logos/extractors/x.png
+    return os.path.normpath(f"{hub_root}/static/{logo_url.lstrip('/')}")
+
+
+def _is_absolute(logo_url):
+    return urlparse(logo_url).scheme in ("http", "https")
+
+
+def audit_logos(hub_root, max_kb=DEFAULT_MAX_KB, workers=None):
+    """
+    Hash every logo and cross-reference the `logo_url` of every definition.
+
+    Returns a report with byte-identical duplicate groups, files over the
+    `max_kb` budget, definitions referencing a missing file and logos no
+    definition references. Absolute `http(s)://` logo URLs are skipped. Paths
+    are relative to the hub root.
+    """
+    # Walked and referenced paths are compared as strings, so both have to be
+    # built from the same normalized root, e.g. for `.` or a trailing slash
+    hub_root = os.path.abspath(hub_root)
+    # The catalog scan forks worker processes so run it before starting threads
+    definitions = scan_catalog(hub_root, fields=["logo_url"], workers=workers)
+    paths = list(logo_files(hub_root))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        files = dict(zip(paths, pool.map(_hash_file, paths)))
+
+    def relative(path):
+        return os.path.relpath(path, hub_root)
+
+    groups = {}
+    for path, (digest, size) in files.items():
+        groups.setdefault(digest, []).append(path)
+    duplicates = [
+        {
+            "hash": digest,
+            "size": files[group[0]][1],
+            "paths": [relative(path) for path in group],
+        }
+        for digest, group in groups.items()
+        if len(group) > 1
+    ]
+    referenced = set()
+    missing = []
+    for entry in definitions:
+        # Logos hosted elsewhere aren't part of the local assets
+        if not entry["logo_url"] or _is_absolute(entry["logo_url"]):
+            continue
+        path = _logo_path(hub_root, entry["logo_url"])
+        referenced.add(path)
+        if path not in files:
+            missing.append({"suffix": entry["suffix"], "logo_url": entry["logo_url"]})
+    return {
+        "files": len(files),
+        "total_bytes": sum(size for _, size in files.values()),
+        "duplicates": sorted(duplicates, key=lambda group: group["paths"]),
+        "wasted_bytes": sum(
+            group["size"] * (len(group["paths"]) - 1) for group in duplicates
+        ),
+        "oversized": [
+            {"path": relative(path), "size": size}
+            for path, (_, size) in files.items()
+            if size > max_kb * 1024
+        ],
+        "missing": missing,
+        "unreferenced": [relative(path) for path in files if path not in referenced],
+    }
+
+
+def format_report(report, max_kb=DEFAULT_MAX_KB):
+    lines = []
+    for group in report["duplicates"]:
+        lines.append(f"Duplicate ({group['size']} bytes): {', '.join(group['paths'])}")
+    for file in report["oversized"]:
+        lines.append(f"Over {max_kb}KB ({file['size'] // 1024}KB): {file['path']}")
+    for ref in report["missing"]:
+        lines.append(f"Missing logo: {ref['suffix']} -> {ref['logo_url']}")
+    for path in report["unreferenced"]:
+        lines.append(f"Unreferenced: {path}")
+    lines.append(
+        f"{report['files']} logos, {report['total_bytes'] // 1024}KB total, "
+        f"{len(report['duplicates'])} duplicate groups "
+        f"({report['wasted_bytes'] // 1024}KB duplicated), "
+        f"{len(report['oversized'])} over budget, {len(report['missing'])} missing, "
+        f"{len(report['unreferenced'])} unreferenced"
+    )
+    return lines
@@ -0,0 +1,124 @@
+import json
+import os
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+
+class Checkpoint:
+    """
+    Append-only JSONL journal of per-plugin results so a re-run with `--resume`
+    can skip the suffixes that already succeeded.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.completed = self._load()
+
+    def _load(self):
+        completed = {}
+        if not os.path.exists(self.path):
+            return completed
+        with open(self.path, "r") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A partially written last line from an interrupted run
+                    continue
+                if entry.get("status") == "success":
+                    completed[entry["suffix"]] = entry.get("hash")
+                else:
+                    completed.pop(entry["suffix"], None)
+        return completed
+
+    def is_done(self, suffix):
+        return suffix in self.completed
+
+    def record(self, suffix, status, hash_id=None, error=None):
+        entry = {
+            "suffix": suffix,
+            "status": status,
+            "hash": hash_id,
+            "error": error,
+            "timestamp": datetime.utcnow().isoformat(),
+        }
+        Path(os.path.dirname(os.path.abspath(self.path))).mkdir(
+            parents=True, exist_ok=True
+        )
+        with open(self.path, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        if status == "success":
+            self.completed[suffix] = hash_id
+
+
+class Once:
+    """
+    Runs `func` the first time it's called and replays its outcome, including a
+    raised exception, on every later call from any thread.
+    """
+
+    def __init__(self, func):
+        self._func = func
+        self._lock = threading.Lock()
+        self._called = False
+        self._error = None
+
+    def __call__(self):
+        with self._lock:
+            if not self._called:
+                try:
+                    self._func()
+                except Exception as e:
+                    self._error = e
+                self._called = True
+        if self._error:
+            raise self._error
+
+
+def _run_item(func, suffix, item):
+    try:
+        return func(item), None
+    except Exception as e:
+        print(f"Failed {suffix}: {e}")
+        traceback.print_exc()
+        return None, repr(e)
+
+
+def run_batch(items, func, key, checkpoint=None, resume=False, workers=1):
+    """
+    Call `func` for each item, continuing past failures.
+
+    `key` maps an item to its suffix and `func` returns the extract hash. Items
+    run on up to `workers` threads. The returned summary lists succeeded, failed
+    and skipped suffixes in input order.
+    """
+    summary = {"succeeded": [], "failed": [], "skipped": []}
+    pending = []
+    for item in items:
+        suffix = key(item)
+        if resume and checkpoint and checkpoint.is_done(suffix):
+            print(f"Skipping {suffix}, already completed")
+            summary["skipped"].append(
+                {"suffix": suffix, "hash": checkpoint.completed[suffix]}
+            )
+            continue
+        pending.append((suffix, item))
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        results = pool.map(lambda pair: _run_item(func, *pair), pending)
+        for (suffix, _), (hash_id, error) in zip(pending, results):
+            if error:
+                summary["failed"].append({"suffix": suffix, "error": error})
+                if checkpoint:
+                    checkpoint.record(suffix, "failed", error=error)
+                continue
+            summary["succeeded"].append({"suffix": suffix, "hash": hash_id})
+            if checkpoint:
+                checkpoint.record(suffix, "success", hash_id=hash_id)
+    return summary
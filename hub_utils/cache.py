@@ -0,0 +1,31 @@
+import hashlib
+import os
+from pathlib import Path
+
+
+def cache_dir(name):
+    """
+    Return (and create) a hub-utils cache directory, `$HUB_UTILS_CACHE_DIR` or
+    `$XDG_CACHE_HOME/hub-utils` if set, `~/.cache/hub-utils` otherwise.
+    """
+    root = os.environ.get("HUB_UTILS_CACHE_DIR") or os.path.join(
+        os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "hub-utils"
+    )
+    path = Path(root) / name
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def file_fingerprint(path, salt=None):
+    """
+    Content hash of a file, used to key caches derived from it. `salt` is
+    hashed in too so a cache is invalidated when the rules used to derive it
+    change.
+    """
+    digest = hashlib.sha256()
+    if salt is not None:
+        digest.update(repr(salt).encode("utf-8"))
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
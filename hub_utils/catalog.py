@@ -0,0 +1,67 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from ruamel.yaml import YAML
+
+from hub_utils.yaml_lint import find_all_yamls
+
+
+def definition_paths(hub_root, plugin_types=None):
+    """
+    Yield the plugin definition yaml paths in the hub, optionally limited to
+    the given plugin types.
+    """
+    for yaml_file in find_all_yamls(f_path=f"{hub_root}/_data/meltano/"):
+        if plugin_types and yaml_file.split("/")[-3] not in plugin_types:
+            continue
+        yield yaml_file
+
+
+def suffix_parts(yaml_file):
+    p_type, p_name, p_variant = os.path.splitext(yaml_file)[0].split("/")[-3:]
+    return p_type, p_name, p_variant
+
+
+def load_projection(yaml_file, fields=None):
+    """
+    Read a definition with the fast safe loader and keep only `fields`, plus the
+    path and the type/name/variant parsed from it.
+    """
+    with open(yaml_file, "r") as f:
+        data = YAML(typ="safe").load(f) or {}
+    p_type, p_name, p_variant = suffix_parts(yaml_file)
+    entry = {
+        "path": yaml_file,
+        "suffix": f"{p_type}/{p_name}/{p_variant}",
+        "plugin_type": p_type,
+        "plugin_name": p_name,
+        "plugin_variant": p_variant,
+    }
+    if fields is None:
+        entry.update(data)
+    else:
+        entry.update({field: data.get(field) for field in fields})
+    return entry
+
+
+def map_definitions(hub_root, func, plugin_types=None, workers=None):
+    """
+    Yield `func(yaml_file)` for every plugin definition, in path order. YAML
+    parsing is CPU bound so it's spread over `workers` processes, `workers=1`
+    stays in process. `func` must be picklable.
+    """
+    paths = list(definition_paths(hub_root, plugin_types))
+    if workers == 1 or len(paths) < 2:
+        yield from map(func, paths)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(func, paths, chunksize=16)
+
+
+def scan_catalog(hub_root, fields=None, plugin_types=None, workers=None):
+    """
+    Load a projection of every plugin definition in one pass.
+    """
+    load = partial(load_projection, fields=fields)
+    return list(map_definitions(hub_root, load, plugin_types, workers))
@@ -0,0 +1,47 @@
+import json
+import os
+import socket
+import sys
+import tempfile
+
+
+def default_socket_path():
+    return os.environ.get(
+        "HUB_UTILS_SOCKET", os.path.join(tempfile.gettempdir(), "hub-utils.sock")
+    )
+
+
+def parse_params(params):
+    """
+    Turn `key=value` strings into keyword arguments, parsing values as JSON
+    when possible.
+    """
+    kwargs = {}
+    for param in params:
+        key, _, value = param.partition("=")
+        try:
+            kwargs[key] = json.loads(value)
+        except json.JSONDecodeError:
+            kwargs[key] = value
+    return kwargs
+
+
+def query(op, socket_path=None, timeout=10, **params):
+    """
+    Send one request to a running `hub-utils serve` and return its result.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path or default_socket_path())
+        sock.sendall(json.dumps({"op": op, **params}).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as f:
+            response = json.loads(f.readline())
+    if not response["ok"]:
+        raise RuntimeError(response["error"])
+    return response["result"]
+
+
+if __name__ == "__main__":
+    # Stdlib-only client for scripts that query the daemon in a loop, skipping
+    # the CLI start-up cost: `python -m hub_utils.client OP [key=value ...]`
+    print(json.dumps(query(sys.argv[1], **parse_params(sys.argv[2:]))))
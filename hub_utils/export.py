@@ -0,0 +1,100 @@
+import csv
+import json
+from functools import partial
+
+import typer
+from ruamel.yaml import YAML
+
+from hub_utils.catalog import map_definitions, suffix_parts
+
+DEFAULT_COLUMNS = ("plugin_type", "name", "variant", "quality", "maintenance_status")
+
+
+def _setting_count(data):
+    return len(data.get("settings") or [])
+
+
+COLUMNS = {
+    "plugin_type": lambda data, p_type: p_type,
+    "name": lambda data, p_type: data.get("name"),
+    "variant": lambda data, p_type: data.get("variant"),
+    "quality": lambda data, p_type: data.get("quality"),
+    "maintenance_status": lambda data, p_type: data.get("maintenance_status"),
+    "keywords": lambda data, p_type: data.get("keywords") or [],
+    "setting_count": lambda data, p_type: _setting_count(data),
+    "capabilities": lambda data, p_type: data.get("capabilities") or [],
+    "sdk": lambda data, p_type: "meltano_sdk" in (data.get("keywords") or []),
+}
+
+
+def export_row(yaml_file, columns=DEFAULT_COLUMNS):
+    """
+    Read one definition and reduce it to the requested columns, so only the
+    small row is sent back from the worker process.
+    """
+    with open(yaml_file, "r") as f:
+        data = YAML(typ="safe").load(f) or {}
+    p_type = suffix_parts(yaml_file)[0]
+    return {column: COLUMNS[column](data, p_type) for column in columns}
+
+
+def _write_csv(rows, columns, f):
+    writer = csv.writer(f)
+    writer.writerow(columns)
+    for row in rows:
+        writer.writerow(
+            [
+                ";".join(value) if isinstance(value, list) else value
+                for value in (row[column] for column in columns)
+            ]
+        )
+
+
+def _write_jsonl(rows, columns, f):
+    for row in rows:
+        f.write(json.dumps(row) + "\n")
+
+
+def _write_json(rows, columns, f):
+    # Written item by item so rows stream out as the workers produce them
+    f.write("[")
+    for index, row in enumerate(rows):
+        f.write(",\n  " if index else "\n  ")
+        f.write(json.dumps(row))
+    f.write("\n]\n")
+
+
+WRITERS = {"csv": _write_csv, "jsonl": _write_jsonl, "json": _write_json}
+
+
+def check_columns(columns):
+    unknown = [column for column in columns if column not in COLUMNS]
+    if unknown:
+        raise typer.BadParameter(
+            f"Unknown columns: {', '.join(unknown)}. "
+            f"Choose from: {', '.join(COLUMNS)}",
+            param_hint="'--columns'",
+        )
+
+
+def export_catalog(
+    hub_root, f, fmt="csv", columns=None, plugin_types=None, workers=None
+):
+    """
+    Stream the requested columns of every plugin definition to `f` in one
+    parallel pass. Returns the number of rows written.
+    """
+    columns = list(columns or DEFAULT_COLUMNS)
+    check_columns(columns)
+    count = 0
+
+    def rows():
+        nonlocal count
+        for row in map_definitions(
+            hub_root, partial(export_row, columns=columns), plugin_types, workers
+        ):
+            count += 1
+            yield row
+
+    WRITERS[fmt](rows(), columns, f)
+    return count
@@ -0,0 +1,194 @@
+import copy
+import json
+
+from hub_utils.s3 import DELTA_EXTENSION, parse_extract_name
+
+# A full extract is stored at least once every this many versions
+KEYFRAME_INTERVAL = 10
+
+
+def _escape(token):
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token):
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def _diff_dict(old, new, path):
+    ops = []
+    for key in old:
+        child = f"{path}/{_escape(key)}"
+        if key not in new:
+            ops.append({"op": "remove", "path": child})
+        else:
+            ops.extend(diff(old[key], new[key], child))
+    for key in new:
+        if key not in old:
+            ops.append(
+                {"op": "add", "path": f"{path}/{_escape(key)}", "value": new[key]}
+            )
+    return ops
+
+
+def _diff_list(old, new, path):
+    common = min(len(old), len(new))
+    ops = []
+    for index in range(common):
+        ops.extend(diff(old[index], new[index], f"{path}/{index}"))
+    # Trailing items are removed from the end so earlier indexes stay valid
+    for index in range(len(old) - 1, common - 1, -1):
+        ops.append({"op": "remove", "path": f"{path}/{index}"})
+    for index in range(common, len(new)):
+        ops.append({"op": "add", "path": f"{path}/{index}", "value": new[index]})
+    return ops
+
+
+def diff(old, new, path=""):
+    """
+    Return the JSON patch (RFC 6902 add, remove and replace operations) that
+    turns `old` into `new`.
+    """
+    if type(old) is not type(new):
+        return [{"op": "replace", "path": path, "value": new}]
+    if isinstance(old, dict):
+        return _diff_dict(old, new, path)
+    if isinstance(old, list):
+        return _diff_list(old, new, path)
+    if old != new:
+        return [{"op": "replace", "path": path, "value": new}]
+    return []
+
+
+def _apply_op(parent, token, op):
+    value = copy.deepcopy(op.get("value"))
+    if isinstance(parent, list):
+        index = len(parent) if token == "-" else int(token)
+        if op["op"] == "add":
+            parent.insert(index, value)
+        elif op["op"] == "remove":
+            del parent[index]
+        else:
+            parent[index] = value
+    elif op["op"] == "remove":
+        del parent[token]
+    else:
+        parent[token] = value
+
+
+def apply_patch(doc, patch):
+    """
+    Return a copy of `doc` with the JSON patch applied, `doc` is left as is.
+    """
+    doc = copy.deepcopy(doc)
+    for op in patch:
+        if op["path"] == "":
+            doc = copy.deepcopy(op.get("value"))
+            continue
+        tokens = [_unescape(token) for token in op["path"].split("/")[1:]]
+        parent = doc
+        for token in tokens[:-1]:
+            parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+        _apply_op(parent, tokens[-1], op)
+    return doc
+
+
+class ExtractHistory:
+    """
+    The stored versions of one plugin's extract, read from a single listing of
+    its `<type>/<name>/<variant>` prefix.
+
+    A version is either a keyframe, the full extract at
+    `<hash>--<date>.json`, or a delta at `<hash>--<date>.delta.json` holding
+    a JSON patch against the version named in its `base`. Rebuilt versions are
+    cached so reading several versions of a chain fetches each object once.
+    """
+
+    def __init__(self, s3, bucket, prefix):
+        self.s3 = s3
+        self.bucket = bucket
+        self.prefix = prefix.rstrip("/")
+        self._docs = {}
+        self.versions = self._list_versions()
+
+    def _list_versions(self):
+        versions = []
+        for obj in self.s3.list_objects(self.bucket, f"{self.prefix}/"):
+            hash_id, date, is_delta = parse_extract_name(obj["Key"])
+            versions.append(
+                {
+                    "key": obj["Key"],
+                    "hash": hash_id,
+                    "date": date,
+                    "delta": is_delta,
+                    "size": obj["Size"],
+                    "modified": obj["LastModified"],
+                }
+            )
+        return sorted(versions, key=lambda v: (v["date"], v["modified"]))
+
+    def has_hash(self, hash_id):
+        return any(version["hash"] == hash_id for version in self.versions)
+
+    def find(self, ref):
+        """
+        Find a version by key, hash prefix or date, `latest` is the newest. A
+        date with several versions resolves to the newest of that day.
+        """
+        if ref == "latest" and self.versions:
+            return self.versions[-1]
+        for field in ("key", "date"):
+            matches = [version for version in self.versions if version[field] == ref]
+            if matches:
+                return matches[-1]
+        matches = [
+            version for version in self.versions if version["hash"].startswith(ref)
+        ]
+        if len({version["hash"] for version in matches}) > 1:
+            raise ValueError(f"{ref} matches several versions of {self.prefix}")
+        if not matches:
+            raise ValueError(f"No version of {self.prefix} matches {ref}")
+        return matches[-1]
+
+    def read(self, ref):
+        """
+        Return the full extract of a version, applying deltas back to the
+        nearest keyframe.
+        """
+        version = self.find(ref)
+        key = version["key"]
+        if key not in self._docs:
+            record = json.loads(self.s3.read_object(self.bucket, key))
+            if version["delta"]:
+                record = apply_patch(self.read(record["base"]), record["patch"])
+            self._docs[key] = record
+        return self._docs[key]
+
+    def _deltas_since_keyframe(self):
+        count = 0
+        for version in reversed(self.versions):
+            if not version["delta"]:
+                break
+            count += 1
+        return count
+
+    def write(self, key, data, content, compress=False, interval=KEYFRAME_INTERVAL):
+        """
+        Store a new version. It's written as a delta against the newest
+        version unless the chain since the last keyframe is `interval - 1`
+        deltas long or the delta wouldn't be smaller than `content`, the full
+        serialized extract, which is then written at `key`. Returns the key
+        written to.
+        """
+        if self.versions and self._deltas_since_keyframe() < interval - 1:
+            base = self.versions[-1]["key"]
+            record = json.dumps(
+                {"base": base, "patch": diff(self.read(base), data)},
+                sort_keys=True,
+                separators=(",", ":"),
+            ).encode("utf-8")
+            if len(record) < len(content):
+                key = key[: -len(".json")] + DELTA_EXTENSION
+                content = record
+        self.s3.upload_bytes(self.bucket, key, content, compress=compress)
+        return key
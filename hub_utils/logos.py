@@ -0,0 +1,144 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from hub_utils.cache import cache_dir
+
+HOTGLUE_LOGO_URL = "https://s3.amazonaws.com/cdn.hotglue.xyz/images/logos/"
+# In order of preference
+LOGO_EXTENSIONS = (".svg", ".png", ".jpeg", ".webp")
+# (connect, read) seconds
+DEFAULT_TIMEOUT = (3.05, 10)
+DEFAULT_WORKERS = 8
+# Missing logos are re-checked after a day, found ones are kept
+NEGATIVE_TTL = 24 * 60 * 60
+
+
+def hotglue_candidates(service_name):
+    return [f"{HOTGLUE_LOGO_URL}{service_name}{ext}" for ext in LOGO_EXTENSIONS]
+
+
+def _new_session(workers):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class ProbeCache:
+    """
+    On-disk record of which logo URLs exist, so repeated runs don't re-probe
+    them.
+    """
+
+    def __init__(self, path=None, negative_ttl=NEGATIVE_TTL):
+        self.path = path or str(cache_dir("logos") / "probes.json")
+        self.negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+        self._entries = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def get(self, url):
+        """
+        Return True/False for a cached result, None if unknown or expired.
+        """
+        entry = self._entries.get(url)
+        if entry is None:
+            return None
+        if not entry["found"] and time.time() - entry["checked"] > self.negative_ttl:
+            return None
+        return entry["found"]
+
+    def set(self, url, found):
+        with self._lock:
+            self._entries[url] = {"found": found, "checked": time.time()}
+
+    def save(self):
+        with self._lock:
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self.path)
+
+
+class LogoResolver:
+    """
+    Finds the first existing URL out of a list of logo candidates.
+
+    Uncached candidates are probed concurrently with HEAD requests on a pooled
+    session, then only the winning URL is downloaded.
+    """
+
+    def __init__(
+        self,
+        session=None,
+        cache=None,
+        timeout=DEFAULT_TIMEOUT,
+        workers=DEFAULT_WORKERS,
+    ):
+        self.session = session or _new_session(workers)
+        self.cache = cache if cache is not None else ProbeCache()
+        self.timeout = timeout
+        self.workers = workers
+
+    def _exists(self, url):
+        try:
+            resp = self.session.head(url, timeout=self.timeout, allow_redirects=True)
+            if resp.status_code == 405:
+                # HEAD not allowed, check the status without reading the body
+                with self.session.get(url, timeout=self.timeout, stream=True) as resp:
+                    return resp.status_code == 200
+            return resp.status_code == 200
+        except requests.RequestException as e:
+            print(f"Logo probe failed for {url}: {e}")
+            return None
+
+    def probe(self, urls):
+        """
+        Return `{url: found}`, probing only the URLs not in the cache.
+        """
+        results = {url: self.cache.get(url) for url in urls}
+        unknown = [url for url, found in results.items() if found is None]
+        if unknown:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                for url, found in zip(unknown, pool.map(self._exists, unknown)):
+                    results[url] = found
+                    # Network errors aren't cached so they're retried next time
+                    if found is not None:
+                        self.cache.set(url, found)
+            self.cache.save()
+        return results
+
+    def resolve(self, urls):
+        """
+        Return `(url, content)` for the first candidate that exists and can be
+        downloaded, or None.
+        """
+        results = self.probe(urls)
+        for url in urls:
+            if not results[url]:
+                continue
+            try:
+                resp = self.session.get(url, timeout=self.timeout)
+            except requests.RequestException as e:
+                # Not cached, like a failed probe, so it's retried next time
+                print(f"Logo download failed for {url}: {e}")
+                continue
+            if resp.status_code == 200:
+                return url, resp.content
+            # Gone since it was cached
+            self.cache.set(url, False)
+            self.cache.save()
+        return None
@@ -1,18 +1,33 @@
+import atexit
 import csv
 import hashlib
 import json
 import os
+import sys
 from copy import copy
 from datetime import datetime
 from enum import Enum
-from typing import List, Optional
+from pathlib import Path
+from typing import List, Optional, Tuple
 
-import requests
 import typer
 
+from hub_utils import assets, client
+from hub_utils import export as catalog_export
+from hub_utils import history as extract_history
+from hub_utils import logos
+from hub_utils import manifest as bulk_add
+from hub_utils import probe, quality, server
+from hub_utils import snapshot as extract_snapshot
+from hub_utils import sync
+from hub_utils import watch as watch_mode
+from hub_utils.batch import Checkpoint, Once, run_batch
 from hub_utils.meltano_util import MeltanoUtil
+from hub_utils.responsiveness import Responsiveness
 from hub_utils.s3 import S3
+from hub_utils.tracing import TRACER
 from hub_utils.utilities import Utilities
+from hub_utils.variant_list import iter_variant_paths
 from hub_utils.yaml_lint import find_all_yamls, fix_yaml, run_yamllint
 
 app = typer.Typer()
@@ -39,7 +54,13 @@ SDK_SUFFIX_LIST = [
 
 
 @app.callback()
-def callback():
+def callback(
+    trace_path: str = typer.Option(
+        None,
+        envvar="HUB_UTILS_TRACE_PATH",
+        help="Write a Chrome trace-event JSON file of the run to this path.",
+    ),
+):
     """
     [MeltanoHub](https://hub.meltano.com/) Utilities - A utility CLI intended
     to streamline the work needed to maintain MeltanoHub.
@@ -61,6 +82,16 @@ def callback():
     poetry run pytest -v tests/test_meltano_utils.py::test_sdk_about_parsing_1
     ```
 
+    **Benchmarks**
+
+    Measure settings/sec and allocations of the `--about` parsing functions over the
+    corpus in `tests/data` with the `tests/benchmark.py` harness. Outputs are
+    checked against the snapshots in `tests/data/benchmark/snapshots` first.
+
+    ```bash
+    poetry run python -m tests.benchmark
+    ```
+
     **Refreshing This README**
 
     The CLI is auto documenting so put all content in the CLI modules
@@ -73,7 +104,16 @@ def callback():
     poetry run typer hub_utils/main.py utils docs --name hub-utils --output README.md
     ```
 
+    **Tracing**
+
+    Pass `--trace-path` (or set `HUB_UTILS_TRACE_PATH`) to record spans for plugin
+    installs, `--about` probes, S3 calls and definition reads/writes. The output can
+    be loaded in [Perfetto](https://ui.perfetto.dev) or `about:tracing`.
+
     """
+    if trace_path:
+        TRACER.enable()
+        atexit.register(TRACER.export, trace_path)
 
 
 class YamlLint(str, Enum):
@@ -97,7 +137,91 @@ def yamllint(action: YamlLint, paths: Optional[List[str]] = None):
 
 
 @app.command()
-def add(repo_url: str = None, auto_accept: bool = typer.Option(False)):
+def watch(
+    path: str = None,
+    interval: float = watch_mode.DEFAULT_INTERVAL,
+    debounce: float = watch_mode.DEFAULT_DEBOUNCE,
+    fix: bool = typer.Option(True),
+):
+    """
+    Watch the hub definitions and fix and lint each file as it's edited.
+
+    `_data/` under the hub root (or `--path`) is polled every `--interval`
+    seconds. Once no change has been seen for `--debounce` seconds the changed
+    files are fixed like `yamllint fix` and then linted in process with
+    `.yamllint.yaml`. Stop with Ctrl+C.
+    """
+    util = Utilities(True)
+    root = path or f"{util.hub_root}/_data/"
+    watcher = watch_mode.Watcher(
+        root,
+        config_path=f"{util.hub_root}/.yamllint.yaml",
+        interval=interval,
+        debounce=debounce,
+        fix=fix,
+    )
+    print(f"Watching {len(watcher.poller.stats)} files in {root}")
+    watcher.run()
+
+
+@app.command()
+def serve(
+    socket_path: str = None,
+    poll_interval: float = server.DEFAULT_POLL_INTERVAL,
+):
+    """
+    Load the hub catalog once and answer queries over a Unix socket until
+    stopped with Ctrl+C.
+
+    Definitions are re-read as they change on disk, checked every
+    `--poll-interval` seconds. The socket defaults to `$HUB_UTILS_SOCKET` or
+    `hub-utils.sock` in the temp directory. Use `hub-utils query` as the client.
+    A leftover socket file is replaced, but the command exits if a server is
+    still answering on it.
+    """
+    util = Utilities(True)
+    socket_path = socket_path or client.default_socket_path()
+    index = server.CatalogIndex(util.hub_root)
+    try:
+        hub_server = server.HubServer(socket_path, index, poll_interval=poll_interval)
+    except server.ServerAlreadyRunning as e:
+        print(e)
+        raise typer.Exit(code=1)
+    print(f"Serving {len(index.definitions())} definitions on {socket_path}")
+    try:
+        hub_server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        hub_server.server_close()
+
+
+@app.command()
+def query(
+    op: str,
+    params: Optional[List[str]] = typer.Argument(None),
+    socket_path: str = None,
+):
+    """
+    Query a running `hub-utils serve` and print the JSON result.
+
+    Ops are `variant_names`, `list`, `lookup`, `refresh` and `ping`. Params
+    are `key=value` pairs, values are parsed as JSON when possible, e.g.
+    `hub-utils query lookup plugin_type=extractors name=tap-github` or
+    `hub-utils query list keyword=meltano_sdk 'fields=["quality"]'`.
+    """
+    kwargs = client.parse_params(params or [])
+    print(json.dumps(client.query(op, socket_path=socket_path, **kwargs)))
+
+
+@app.command()
+def add(
+    repo_url: str = None,
+    auto_accept: bool = typer.Option(False),
+    manifest: str = None,
+    workers: int = 4,
+    summary_path: str = None,
+):
     """
     Add a new tap or target to the hub.
     It will prompt you for any attributes that need input.
@@ -106,7 +230,40 @@ def add(repo_url: str = None, auto_accept: bool = typer.Option(False)):
     the settings for you. It will prompt you for any missing attributes. If its not
     SDK based it will prompt you for settings 1 at a time and help you by suggesting
     defaults that you can accept or override.
+
+    The install test is offered first. If accepted, it and the `--about` scrape
+    start in the background with the default answers while the remaining
+    prompts are answered, and are only restarted if the pip_url or executable
+    answer differs from the default. Their output is shown once the install
+    result is collected.
+
+    For Hotglue variants the logo is found by probing the candidate URLs
+    concurrently. Probe results are cached in `$HUB_UTILS_CACHE_DIR` (default
+    `~/.cache/hub-utils`), missing logos are re-checked after a day.
+
+    With `--manifest` (a CSV or YAML file of `repo_url`s with optional
+    overrides such as name, plugin_type, variant, pip_url, namespace,
+    executable, is_meltano_sdk, keywords, capabilities, label, description,
+    domain_url, logo_url, maintenance_status and quality) all plugins are added
+    without prompting. Install tests and `--about` scrapes run on up to
+    `--workers` threads and the default variant and maintainer changes are
+    written once for the whole batch. Plugins that already have a definition
+    are skipped. A JSON summary is written to `--summary-path` and the command
+    exits non-zero if any plugin failed.
     """
+    if manifest:
+        util = Utilities(True)
+        summary = bulk_add.add_from_manifest(util, manifest, workers=workers)
+        if summary_path:
+            util._write_dict(summary_path, summary)
+        print(
+            f"Added: {len(summary['added'])}, "
+            f"Failed: {len(summary['failed'])}, "
+            f"Skipped: {len(summary['skipped'])}"
+        )
+        if summary["failed"]:
+            raise typer.Exit(code=1)
+        return
     util = Utilities(auto_accept)
     if not repo_url:
         repo_url = util._prompt("repo_url")
@@ -121,41 +278,50 @@ def add(repo_url: str = None, auto_accept: bool = typer.Option(False)):
             # Attempt to scrape logo from hotglue's website
             name = repo_url.split("/")[-1]
             service_name = name.replace("tap-", "").replace("target-", "")
-            ext = ".svg"
-            url = (
-                "https://s3.amazonaws.com/cdn.hotglue.xyz/"
-                f"images/logos/{service_name}{ext}"
-            )
-            resp = requests.get(url)
-            if resp.status_code != 200:
-                ext = ".png"
-                url = (
-                    f"https://s3.amazonaws.com/cdn.hotglue.xyz/images/"
-                    f"logos/{service_name}{ext}"
-                )
-                resp = requests.get(url)
-                if resp.status_code != 200:
-                    ext = ".jpeg"
-                    url = (
-                        "https://s3.amazonaws.com/cdn.hotglue.xyz/"
-                        f"images/logos/{service_name}{ext}"
-                    )
-                    resp = requests.get(url)
-                    if resp.status_code != 200:
-                        ext = ".webp"
-                        url = (
-                            f"https://s3.amazonaws.com/cdn.hotglue.xyz/images"
-                            f"/logos/{service_name}{ext}"
-                        )
-                        resp = requests.get(url)
-                        if resp.status_code != 200:
-                            print(f"Unable to find logo for {service_name}")
-                            return
+            logo = logos.LogoResolver().resolve(logos.hotglue_candidates(service_name))
+            if not logo:
+                print(f"Unable to find logo for {service_name}")
+                return
+            url, content = logo
+            ext = os.path.splitext(url)[1]
             with open(
                 f"{util.hub_root}/static/assets/logos/extractors/{service_name}{ext}",
                 "wb",
             ) as f:
-                f.write(resp.content)
+                f.write(content)
+
+
+assets_app = typer.Typer()
+app.add_typer(assets_app, name="assets", help="Manage the hub's static assets.")
+
+
+@assets_app.command("audit")
+def assets_audit(
+    max_kb: int = assets.DEFAULT_MAX_KB,
+    output_path: str = None,
+    strict: bool = typer.Option(False),
+    workers: int = None,
+):
+    """
+    Audit the logos in `static/assets/logos/`.
+
+    Every logo is hashed in one parallel pass to find byte-identical duplicates
+    and files over the `--max-kb` size budget. The `logo_url` of every
+    definition is cross-referenced to find missing and unreferenced logos,
+    absolute `http(s)://` URLs are skipped. The full report is written as JSON
+    to `--output-path` if set. With `--strict` the command fails if anything
+    was found.
+    """
+    util = Utilities(True)
+    report = assets.audit_logos(util.hub_root, max_kb=max_kb, workers=workers)
+    for line in assets.format_report(report, max_kb=max_kb):
+        print(line)
+    if output_path:
+        with open(output_path, "w") as f:
+            json.dump(report, f, indent=2)
+    issues = ("duplicates", "oversized", "missing", "unreferenced")
+    if strict and any(report[issue] for issue in issues):
+        raise typer.Exit(code=1)
 
 
 @app.command()
@@ -183,6 +349,10 @@ def update_definition(
 @app.command()
 def update_quality(
     metrics_file_path: str,
+    batch: bool = typer.Option(False),
+    dry_run: bool = typer.Option(False),
+    workers: int = None,
+    activity_path: str = None,
 ):
     """
     Update the quality of all taps and targets on the hub.
@@ -190,9 +360,43 @@ def update_quality(
     This command accepts a path to the [variant_metrics.yml]
     (https://github.com/meltano/hub/blob/main/_data/variant_metrics.yml)
     yaml file, make sure its the most up to date version likely sourced from S3.
+
+    With `--batch` the variant, keywords, repo and quality of every plugin are
+    loaded in one parallel pass and the rules are evaluated for the whole table.
+    The change plan is printed and only changed files are rewritten, in
+    parallel, followed by a single yamllint run. `--dry-run` only prints the
+    plan.
+
+    Responsiveness is computed from `--activity-path`, a local JSON or CSV
+    export of issue/PR response times per repo (see
+    `hub_utils/responsiveness.py`). The computed classes are cached between
+    runs, keyed by the export's content and the classification thresholds.
+    Repos missing from the export, or all repos if no export is given, are
+    treated as "high".
     """
     util = Utilities(True)
-    usage_metrics = util._read_yaml(metrics_file_path)["metrics"]
+    activity = (
+        Responsiveness.from_export(activity_path)
+        if activity_path
+        else Responsiveness({})
+    )
+    if batch or dry_run:
+        table = quality.load_quality_table(util.hub_root, workers=workers)
+        usage_counts = quality.read_usage_metrics(
+            metrics_file_path, repos={entry["repo"] for entry in table}
+        )
+        changes = quality.plan_quality_updates(
+            table,
+            usage_counts,
+            activity.for_repos({entry["repo"] for entry in table}),
+        )
+        for line in quality.format_plan(changes):
+            print(line)
+        print(f"{len(changes)} of {len(table)} plugins change quality")
+        if not dry_run:
+            quality.apply_quality_updates(changes, workers=workers)
+        return
+    usage_counts = quality.read_usage_metrics(metrics_file_path)
     for yaml_file in find_all_yamls(f_path=f"{util.hub_root}/_data/meltano/"):
         if yaml_file.split("/")[-3] not in ("extractors", "loaders"):
             continue
@@ -201,12 +405,10 @@ def update_quality(
 
         if "keywords" in data and "meltano_sdk" in data.get("keywords"):
             is_sdk_based = True
-        usage_count = usage_metrics.get(data["repo"], {}).get("all_projects", 0)
+        usage_count = usage_counts.get(data["repo"], 0)
         orig_quality = copy(data["quality"])
-        # TODO: Calculate responsiveness
-        responsiveness = "high"
         data["quality"] = MeltanoUtil.get_quality(
-            data["variant"], is_sdk_based, usage_count, responsiveness
+            data["variant"], is_sdk_based, usage_count, activity.get(data["repo"])
         )
         if orig_quality != data["quality"]:
             util._write_yaml(yaml_file, data, reformat=True)
@@ -235,6 +437,49 @@ def sdk_variants_as_csv():
             csvwriter.writerow([p_type, p_name, p_variant, sdk])
 
 
+class ExportFormat(str, Enum):
+    csv = "csv"
+    jsonl = "jsonl"
+    json = "json"
+
+
+@app.command()
+def export(
+    output_path: str = None,
+    format: ExportFormat = typer.Option(ExportFormat.csv),
+    # comma separated list
+    columns: str = ",".join(catalog_export.DEFAULT_COLUMNS),
+    # comma separated list
+    plugin_type: str = None,
+    workers: int = None,
+):
+    """
+    Export the hub catalog as CSV, JSONL or JSON, one row per plugin variant.
+
+    Available columns are plugin_type, name, variant, quality,
+    maintenance_status, keywords, setting_count, capabilities and sdk. List
+    columns are `;` separated in CSV. All definitions are read in a single
+    parallel pass and rows are streamed to `--output-path`, or stdout if not set.
+    """
+    util = Utilities(True)
+    plugin_types = plugin_type.split(",") if plugin_type else None
+    columns = columns.split(",")
+    # Before the output file is opened, so a typo doesn't truncate it
+    catalog_export.check_columns(columns)
+    export_args = dict(
+        fmt=format.value,
+        columns=columns,
+        plugin_types=plugin_types,
+        workers=workers,
+    )
+    if not output_path:
+        catalog_export.export_catalog(util.hub_root, sys.stdout, **export_args)
+        return
+    with open(output_path, "w", newline="") as f:
+        count = catalog_export.export_catalog(util.hub_root, f, **export_args)
+    print(f"Exported {count} plugins to {output_path}")
+
+
 @app.command()
 def get_variant_names(
     hub_root: str,
@@ -243,6 +488,7 @@ def get_variant_names(
     plugin_type: str = None,
     skip: int = 0,
     limit: int = 10000,
+    ndjson: bool = typer.Option(False),
 ):
     """
     NOTE: USED FOR
@@ -250,82 +496,251 @@ def get_variant_names(
 
     Generate a list of variant names for a given set of filters.
     The list will be formatted as escaped JSON to be used by Github Actions.
+    With `--ndjson` one JSON object is printed per line instead, which can be
+    piped into the commands accepting `-` as their variant path list.
     """
     util = Utilities(True)
     util.hub_root = hub_root
     formatted_output = util.get_variant_names(plugin_type, metadata_type, skip, limit)
+    if ndjson:
+        for variant in formatted_output:
+            print(json.dumps(variant))
+        return
     print(json.dumps(formatted_output).replace('"', '\\"'))
 
 
+def _read_variant(util, yaml_file):
+    data = util._read_yaml(yaml_file)
+    p_name = data.get("name")
+    return {
+        "yaml_file": yaml_file,
+        "suffix": util.get_suffix(yaml_file),
+        "name": p_name,
+        "type": util.get_plugin_type(data.get("repo")),
+        "pip_url": data.get("pip_url"),
+        "namespace": data.get("namespace"),
+        "executable": data.get("executable", p_name),
+        "config": util.get_probe_config(data),
+    }
+
+
+def _read_variants(util, yaml_files, summary, checkpoint=None):
+    # A path that can't be read or parsed fails on its own rather than aborting
+    # the whole batch before anything has run.
+    variants = []
+    for yaml_file in yaml_files:
+        try:
+            variants.append(_read_variant(util, yaml_file))
+        except Exception as e:
+            try:
+                suffix = util.get_suffix(yaml_file)
+            except ValueError:
+                suffix = yaml_file
+            print(f"Failed {suffix}: {e}")
+            summary["failed"].append({"suffix": suffix, "error": repr(e)})
+            if checkpoint:
+                checkpoint.record(suffix, "failed", error=repr(e))
+    return variants
+
+
+def _group_by_pip_url(variants):
+    groups = {}
+    for variant in variants:
+        groups.setdefault(variant["pip_url"], []).append(variant)
+    return groups
+
+
+def _extract_hash(data):
+    # Always taken from the pretty printed JSON, so compressed and uncompressed
+    # uploads of the same extract share a hash and aren't stored twice.
+    return hashlib.md5(
+        json.dumps(data, sort_keys=True, indent=2).encode("utf-8")
+    ).hexdigest()
+
+
+def _serialize_extract(data, compress=False):
+    if compress:
+        # Canonical compact JSON, gzipped on upload
+        return json.dumps(data, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    # Same bytes `_write_dict` would write
+    return json.dumps(data).encode("utf-8")
+
+
+def _store_extract(s3, bucket, s3_file_path, data, content, compress, delta):
+    """
+    Upload an extract unless its hash is already stored, as a delta on the
+    previous version if `delta` is set.
+    """
+    if delta:
+        history = extract_history.ExtractHistory(
+            s3, bucket, os.path.dirname(s3_file_path)
+        )
+        exists = history.has_hash(os.path.basename(s3_file_path).split("--")[0])
+    else:
+        exists = s3.hash_exists(bucket, s3_file_path)
+    if exists:
+        print(f"Extract already exists: {s3_file_path}")
+    elif delta:
+        print(f"Uploading: {history.write(s3_file_path, data, content, compress)}")
+    else:
+        print(f"Uploading: {s3_file_path}")
+        s3.upload_bytes(bucket, s3_file_path, content, compress=compress)
+
+
+def _extract_sdk_metadata(
+    util, variant, output_dir, install, compress=False, delta=False
+):
+    install()
+    p_type = variant["type"]
+    p_name = variant["name"]
+    MeltanoUtil.help_test(variant["executable"], config=variant["config"])
+    sdk_def = MeltanoUtil.sdk_about(variant["executable"], config=variant["config"])
+    hash_id = _extract_hash(sdk_def)
+    file_path = os.path.basename(variant["yaml_file"]).replace(".yml", "")
+    content = _serialize_extract(sdk_def, compress)
+    if output_dir:
+        local_file_path = f"{output_dir}/{p_type}/{p_name}/{hash_id}--{file_path}.json"
+        Path(os.path.dirname(local_file_path)).mkdir(parents=True, exist_ok=True)
+        with open(local_file_path, "wb") as f:
+            f.write(content)
+    date_now = datetime.utcnow().strftime("%Y-%m-%d")
+    s3_file_path = f"{p_type}/{p_name}/{file_path}/{hash_id}--{date_now}.json"
+    s3_bucket = os.environ.get("AWS_S3_BUCKET")
+    _store_extract(S3(), s3_bucket, s3_file_path, sdk_def, content, compress, delta)
+    return hash_id
+
+
 @app.command()
 def extract_sdk_metadata_to_s3(
     variant_path_list: str,
-    output_dir: str,
+    output_dir: Optional[str] = typer.Argument(None),
+    probe_report_path: str = None,
+    checkpoint_path: str = None,
+    resume: bool = typer.Option(False),
+    summary_path: str = None,
+    workers: int = 4,
+    compress: bool = typer.Option(False, envvar="HUB_UTILS_COMPRESS_EXTRACTS"),
+    delta: bool = False,
 ):
     """
     NOTE: USED FOR
     [AUTOMATION](https://github.com/meltano/hub/tree/main/.github/workflows) ONLY
 
     Extract the SDK metadata for the given variants and upload them to S3.
+
+    Each `--help`/`--about` probe runs with stdin closed and is killed after
+    `HUB_UTILS_PROBE_TIMEOUT` seconds (default 300). Optional
+    `HUB_UTILS_PROBE_MEMORY_MB` and `HUB_UTILS_PROBE_CPU_SECONDS` rlimits can be
+    set. Wall time, CPU time and max RSS per probe are written to
+    `--probe-report-path` if provided.
+
+    A failing plugin doesn't stop the batch. Results are journaled to
+    `--checkpoint-path` and `--resume` skips suffixes that already succeeded.
+    A JSON summary of successes and failures is written to `--summary-path` and
+    the command exits non-zero if any plugin failed.
+
+    Variants sharing a `pip_url` (e.g. all Airbyte variants) are installed once
+    and their `--about` probes then run concurrently on up to `--workers`
+    threads against that install.
+
+    `VARIANT_PATH_LIST` is a comma separated list, `@path` to read the paths
+    from a file or `-` to stream them from stdin, one per line or as NDJSON
+    (e.g. `get-variant-names --ndjson` output).
+
+    Extracts are uploaded straight from memory. A local copy is only written
+    if `OUTPUT_DIR` is given. With `--compress` they're stored as compact
+    canonical JSON with `Content-Encoding: gzip`, readers decompress them
+    transparently. With `--delta` a changed extract is stored as a JSON patch
+    against the previous version, with a full keyframe every 10 versions, see
+    `history`.
     """
     util = Utilities(True)
-    for yaml_file in variant_path_list.split(","):
-        data = util._read_yaml(yaml_file)
-        p_type = util.get_plugin_type(data.get("repo"))
-        p_name = data.get("name")
-        sdk_def = util._test_exception(
-            p_name,
-            p_type,
-            data.get("pip_url"),
-            data.get("namespace"),
-            data.get("executable", p_name),
-            True,
+    checkpoint = Checkpoint(checkpoint_path) if checkpoint_path else None
+    summary = {"succeeded": [], "failed": [], "skipped": []}
+    variants = _read_variants(
+        util, iter_variant_paths(variant_path_list), summary, checkpoint
+    )
+    # Groups are processed one at a time since different pip_urls can provide
+    # the same executable name.
+    for pip_url, group in _group_by_pip_url(variants).items():
+        first = group[0]
+        install = Once(
+            lambda: MeltanoUtil.add(
+                first["name"],
+                first["namespace"],
+                first["executable"],
+                pip_url,
+                first["type"],
+            )
         )
-        hash_id = hashlib.md5(
-            json.dumps(sdk_def, sort_keys=True, indent=2).encode("utf-8")
-        ).hexdigest()
-        file_path = os.path.basename(yaml_file).replace(".yml", "")
-        file_name = file_path + ".json"
-        local_file_path = f"{output_dir}/{p_type}/{p_name}/{hash_id}--{file_name}"
-        util._write_dict(local_file_path, sdk_def)
-        date_now = datetime.utcnow().strftime("%Y-%m-%d")
-        s3_file_path = f"{p_type}/{p_name}/{file_path}/{hash_id}--{date_now}.json"
-        s3_bucket = os.environ.get("AWS_S3_BUCKET")
-        if not S3().hash_exists(s3_bucket, s3_file_path):
-            print(f"Uploading: {s3_file_path}")
-            S3().upload(s3_bucket, s3_file_path, local_file_path)
-        else:
-            print(f"Extract already exists: {s3_file_path}")
+        group_summary = run_batch(
+            group,
+            lambda variant: _extract_sdk_metadata(
+                util, variant, output_dir, install, compress=compress, delta=delta
+            ),
+            key=lambda variant: variant["suffix"],
+            checkpoint=checkpoint,
+            resume=resume,
+            workers=workers,
+        )
+        for status, entries in group_summary.items():
+            summary[status].extend(entries)
+    if probe_report_path:
+        util._write_dict(probe_report_path, probe.report())
+    if summary_path:
+        util._write_dict(summary_path, summary)
+    print(
+        f"Succeeded: {len(summary['succeeded'])}, "
+        f"Failed: {len(summary['failed'])}, "
+        f"Skipped: {len(summary['skipped'])}"
+    )
+    if summary["failed"]:
+        raise typer.Exit(code=1)
 
 
 @app.command()
 def upload_airbyte(
     variant_path_list: str,
     artifact_name: str,
+    compress: bool = typer.Option(False, envvar="HUB_UTILS_COMPRESS_EXTRACTS"),
+    delta: bool = False,
 ):
     """
     NOTE: USED FOR
     [AUTOMATION](https://github.com/meltano/hub/tree/main/.github/workflows) ONLY
 
     Upload the given Airbyte artifacts to S3.
+
+    `VARIANT_PATH_LIST` also accepts `@path` or `-` (stdin), see
+    `extract-sdk-metadata-to-s3`. `--compress` stores the artifact as
+    gzipped compact JSON and `--delta` as a delta on the previous version.
     """
-    util = Utilities(True)
-    yaml_file = variant_path_list
-    for yaml_file in variant_path_list.split(","):
-        spec_data = util._read_json(artifact_name)
+    with open(artifact_name, "rb") as f:
+        content = f.read()
+    spec_data = json.loads(content)
+    hash_id = _extract_hash(spec_data)
+    if compress:
+        content = _serialize_extract(spec_data, compress)
+    date_now = datetime.utcnow().strftime("%Y-%m-%d")
+    s3_bucket = os.environ.get("AWS_S3_BUCKET")
+    s3 = S3()
+    for yaml_file in iter_variant_paths(variant_path_list):
         p_type, p_name, p_variant = yaml_file.split("/")[-3:]
-        hash_id = hashlib.md5(
-            json.dumps(spec_data, sort_keys=True, indent=2).encode("utf-8")
-        ).hexdigest()
         file_path = os.path.basename(yaml_file).replace(".yml", "")
-        date_now = datetime.utcnow().strftime("%Y-%m-%d")
         s3_file_path = f"{p_type}/{p_name}/{file_path}/{hash_id}--{date_now}.json"
-        s3_bucket = os.environ.get("AWS_S3_BUCKET")
-        if not S3().hash_exists(s3_bucket, s3_file_path):
-            print(f"Uploading: {s3_file_path}")
-            S3().upload(s3_bucket, s3_file_path, artifact_name)
-        else:
-            print(f"Extract already exists: {s3_file_path}")
+        _store_extract(s3, s3_bucket, s3_file_path, spec_data, content, compress, delta)
+
+
+def _sdk_variant_paths(util, variant_path_list, all_sdk, ignore_list=()):
+    if all_sdk:
+        return (
+            i["plugin-name"].split(".yml")[0]
+            for i in util.get_variant_names(None, "sdk")
+            if i["plugin-name"].split(".yml")[0] not in ignore_list
+        )
+    if variant_path_list:
+        return iter_variant_paths(variant_path_list)
+    return SDK_SUFFIX_LIST
 
 
 # GITHUB ACTIONS
@@ -335,31 +750,80 @@ def download_metadata(
     variant_path_list: str = None,
     all_sdk: bool = True,
     ignore_list_str: str = "",
+    snapshot: bool = False,
+    snapshot_key: str = extract_snapshot.SNAPSHOT_KEY,
 ):
     """
     NOTE: USED FOR
     [AUTOMATION](https://github.com/meltano/hub/tree/main/.github/workflows) ONLY
     Download the latest metadata for the given variants from S3.
+
+    `--variant-path-list` also accepts `@path` or `-` (stdin), see
+    `extract-sdk-metadata-to-s3`.
+
+    With `--snapshot` the extracts are unpacked from the single bundle at
+    `--snapshot-key` written by `publish-snapshot` instead of being looked up
+    one by one.
     """
     util = Utilities()
     s3 = S3()
+    bucket = os.environ.get("AWS_S3_BUCKET")
     ignore_list = ignore_list_str.split(",")
-    if not variant_path_list:
-        variant_path_list = ",".join(SDK_SUFFIX_LIST)
-    if all_sdk:
-        variant_path_list = ",".join(
-            [
-                i["plugin-name"].split(".yml")[0]
-                for i in util.get_variant_names(None, "sdk")
-                if i["plugin-name"].split(".yml")[0] not in ignore_list
-            ]
+    suffixes = (
+        util.get_suffix(yaml_file)
+        for yaml_file in _sdk_variant_paths(
+            util, variant_path_list, all_sdk, ignore_list
         )
-    for yaml_file in variant_path_list.split(","):
-        if not yaml_file:
-            continue
-        suffix = util.get_suffix(yaml_file)
+    )
+    if snapshot:
+        written = extract_snapshot.write_snapshot(
+            s3.read_object(bucket, snapshot_key),
+            extract_snapshot.snapshot_format(snapshot_key),
+            local_path,
+            suffixes,
+        )
+        print(f"Unpacked {written} extracts from {snapshot_key}")
+        return
+    for suffix in suffixes:
         local_file_path = f"{local_path}/{suffix}.json"
-        s3.download_latest(os.environ.get("AWS_S3_BUCKET"), suffix, local_file_path)
+        s3.download_latest(bucket, suffix, local_file_path)
+
+
+# GITHUB ACTIONS
+@app.command()
+def publish_snapshot(
+    hub_root: str,
+    variant_path_list: str = None,
+    key: str = extract_snapshot.SNAPSHOT_KEY,
+    workers: int = 8,
+):
+    """
+    NOTE: USED FOR
+    [AUTOMATION](https://github.com/meltano/hub/tree/main/.github/workflows) ONLY
+
+    Bundle the latest extract of every SDK variant, or those in
+    `--variant-path-list`, into a single S3 object so
+    `download-metadata --snapshot` can fetch them all in one request.
+
+    The format follows `--key`: a `.tar.gz` with a `<suffix>.json` member per
+    extract or a `.jsonl.gz` with one extract per line. Both include a
+    manifest of the suffix, key, hash and date of each extract.
+    """
+    fmt = extract_snapshot.snapshot_format(key)
+    util = Utilities()
+    util.hub_root = hub_root
+    suffixes = [
+        util.get_suffix(yaml_file)
+        for yaml_file in _sdk_variant_paths(
+            util, variant_path_list, all_sdk=not variant_path_list
+        )
+    ]
+    s3 = S3()
+    bucket = os.environ.get("AWS_S3_BUCKET")
+    extracts = extract_snapshot.collect_latest(s3, bucket, suffixes, workers=workers)
+    data = extract_snapshot.pack_snapshot(extracts, fmt)
+    print(f"Uploading {len(extracts)} extracts to {key}")
+    s3.upload_bytes(bucket, key, data, content_type="application/gzip")
 
 
 # GITHUB ACTIONS
@@ -375,21 +839,24 @@ def merge_metadata(
     [AUTOMATION](https://github.com/meltano/hub/tree/main/.github/workflows) ONLY
 
     Merge the latest SDK metadata from S3 with the existing hub
+
+    `--variant-path-list` also accepts `@path` or `-` (stdin), see
+    `extract-sdk-metadata-to-s3`.
     """
-    if not variant_path_list:
-        variant_path_list = ",".join(
-            [f"{hub_root}/_data/meltano/{suffix}.yml" for suffix in SDK_SUFFIX_LIST]
-        )
     util = Utilities()
     util.hub_root = hub_root
     if all_sdk:
-        variant_path_list = ",".join(
-            [
-                f"{hub_root}/_data/meltano/{i['plugin-name']}"
-                for i in util.get_variant_names(None, "sdk")
-            ]
+        variant_paths = (
+            f"{hub_root}/_data/meltano/{i['plugin-name']}"
+            for i in util.get_variant_names(None, "sdk")
+        )
+    elif variant_path_list:
+        variant_paths = iter_variant_paths(variant_path_list)
+    else:
+        variant_paths = (
+            f"{hub_root}/_data/meltano/{suffix}.yml" for suffix in SDK_SUFFIX_LIST
         )
-    for yaml_file in variant_path_list.split(","):
+    for yaml_file in variant_paths:
         suffix = util.get_suffix(yaml_file)
         local_file_path = f"{local_path}/{suffix}.json"
         if not os.path.exists(local_file_path):
@@ -414,3 +881,85 @@ def merge_metadata(
             )
         except Exception as e:
             print(f"Error merging {suffix}: {e}")
+
+
+# GITHUB ACTIONS
+@app.command()
+def sync_sdk_metadata(
+    hub_root: str,
+    variant_path_list: str = None,
+    ignore_list_str: str = "",
+    workers: int = 8,
+    queue_size: int = 16,
+    summary_path: str = None,
+):
+    """
+    NOTE: USED FOR
+    [AUTOMATION](https://github.com/meltano/hub/tree/main/.github/workflows) ONLY
+
+    Merge the latest SDK metadata from S3 into the hub in a single command,
+    replacing `get-variant-names`, `download-metadata` and `merge-metadata`.
+
+    The hub is scanned once and extracts are downloaded into memory, parsed and
+    merged as pipeline stages connected by queues of at most `--queue-size`
+    items, with S3 requests running on `--workers` threads. Defaults to every
+    SDK variant in the hub, `--variant-path-list` accepts the same values as
+    `extract-sdk-metadata-to-s3`.
+
+    A JSON summary of merged, missing and failed suffixes is written to
+    `--summary-path` and the command exits non-zero if any merge failed.
+    """
+    util = Utilities()
+    util.hub_root = hub_root
+    summary = sync.sync_sdk_metadata(
+        util,
+        S3(),
+        os.environ.get("AWS_S3_BUCKET"),
+        yaml_files=(
+            iter_variant_paths(variant_path_list) if variant_path_list else None
+        ),
+        ignore_list=set(filter(None, ignore_list_str.split(","))),
+        workers=workers,
+        queue_size=queue_size,
+    )
+    if summary_path:
+        util._write_dict(summary_path, summary)
+    print(
+        f"Merged: {len(summary['merged'])}, "
+        f"Missing: {len(summary['missing'])}, "
+        f"Failed: {len(summary['failed'])}"
+    )
+    if summary["failed"]:
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def history(
+    suffix: str,
+    diff: Tuple[str, str] = typer.Option((None, None)),
+    show: str = None,
+):
+    """
+    List the stored versions of a plugin's extracts, e.g.
+    `extractors/tap-github/meltanolabs`, from a single S3 listing.
+
+    `--diff FROM TO` prints the JSON patch between two versions and `--show`
+    prints a version's full extract. Versions are referenced by hash prefix,
+    date or `latest`, deltas are rebuilt from their keyframe.
+    """
+    history = extract_history.ExtractHistory(
+        S3(), os.environ.get("AWS_S3_BUCKET"), suffix
+    )
+    if show:
+        print(json.dumps(history.read(show), indent=2))
+    elif diff[0]:
+        old, new = (history.read(ref) for ref in diff)
+        print(json.dumps(extract_history.diff(old, new), indent=2))
+    else:
+        print(f"{'date':<12}{'hash':<34}{'kind':<10}{'bytes':>10}")
+        for version in history.versions:
+            kind = "delta" if version["delta"] else "keyframe"
+            print(
+                f"{version['date']:<12}{version['hash']:<34}{kind:<10}"
+                f"{version['size']:>10}"
+            )
@@ -0,0 +1,222 @@
+import csv
+import traceback
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from ruamel.yaml import YAML
+
+from hub_utils.meltano_util import MeltanoUtil
+from hub_utils.yaml_lint import fix_yaml, run_yamllint
+
+# Definition attributes a manifest row can override as is
+DEFINITION_OVERRIDES = (
+    "label",
+    "description",
+    "domain_url",
+    "logo_url",
+    "maintenance_status",
+    "quality",
+)
+
+
+def _parse_list(value):
+    if isinstance(value, list):
+        return value
+    return [item.strip() for item in (value or "").split(";") if item.strip()]
+
+
+def _parse_bool(value, default=True):
+    if value in (None, ""):
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("true", "yes", "1")
+
+
+def read_manifest(path):
+    """
+    Read manifest rows from a CSV with a header row, or a YAML list of mappings
+    (optionally under a `plugins` key). Every row needs a `repo_url`, list
+    columns are `;` separated in CSV.
+    """
+    with open(path, "r") as f:
+        if path.endswith(".csv"):
+            rows = list(csv.DictReader(f))
+        else:
+            rows = YAML(typ="safe").load(f) or []
+            if isinstance(rows, dict):
+                rows = rows.get("plugins", [])
+    for index, row in enumerate(rows):
+        if not row.get("repo_url"):
+            raise ValueError(f"Manifest row {index + 1} has no repo_url")
+    return rows
+
+
+def plan_entry(util, row):
+    """
+    Fill in a manifest row with the same defaults `add` suggests in its
+    prompts.
+    """
+    repo_url = row["repo_url"].rstrip("/")
+    name = row.get("name") or util._get_plugin_name(repo_url)
+    plugin_type = row.get("plugin_type") or util.get_plugin_type(repo_url)
+    if not plugin_type:
+        raise ValueError(f"Can't tell the plugin type of {repo_url}, set plugin_type")
+    is_meltano_sdk = _parse_bool(row.get("is_meltano_sdk"))
+    entry = {
+        "repo_url": repo_url,
+        "name": name,
+        "plugin_type": plugin_type,
+        "variant": row.get("variant") or util._get_plugin_variant(repo_url),
+        "pip_url": row.get("pip_url") or f"git+{repo_url}.git",
+        "namespace": row.get("namespace") or name.replace("-", "_"),
+        "executable": row.get("executable") or name,
+        "is_meltano_sdk": is_meltano_sdk,
+        "keywords": (
+            _parse_list(row["keywords"])
+            if row.get("keywords") not in (None, "")
+            else util._string_to_literal(util._scrape_keywords(is_meltano_sdk))
+        ),
+        "capabilities": _parse_list(row.get("capabilities")) or None,
+        "overrides": {
+            field: row[field] for field in DEFINITION_OVERRIDES if row.get(field)
+        },
+    }
+    entry["suffix"] = f"{plugin_type}/{name}/{entry['variant']}"
+    return entry
+
+
+def _probe(entry):
+    """
+    Install test and, for SDK plugins, scrape `--about`.
+    """
+    MeltanoUtil.add(
+        entry["name"],
+        entry["namespace"],
+        entry["executable"],
+        entry["pip_url"],
+        entry["plugin_type"],
+    )
+    MeltanoUtil.help_test(entry["executable"])
+    if entry["is_meltano_sdk"]:
+        return MeltanoUtil.sdk_about(entry["executable"])
+    return None
+
+
+def _probe_group(group):
+    results = []
+    for entry in group:
+        try:
+            results.append((entry, _probe(entry), None))
+        except Exception as e:
+            print(f"Failed {entry['suffix']}: {e}")
+            traceback.print_exc()
+            results.append((entry, None, repr(e)))
+    return results
+
+
+def probe_entries(entries, workers=4):
+    """
+    Run the install tests and scrapes concurrently. Entries sharing an
+    executable run one after the other since each install replaces the
+    previous one. Returns `(entry, about, error)` in input order.
+    """
+    groups = OrderedDict()
+    for entry in entries:
+        groups.setdefault(entry["executable"], []).append(entry)
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        results = [
+            result
+            for group_results in pool.map(_probe_group, groups.values())
+            for result in group_results
+        ]
+    order = {id(entry): index for index, entry in enumerate(entries)}
+    return sorted(results, key=lambda result: order[id(result[0])])
+
+
+def build_definition(util, entry, about):
+    if about:
+        settings, settings_group_validation, capabilities = (
+            MeltanoUtil._parse_sdk_about_settings(about, enforce_desc=False)
+        )
+    else:
+        settings, settings_group_validation = [], [[]]
+        capabilities = util._boilerplate_capabilities(entry["plugin_type"])
+    definition = util._boilerplate_definition(
+        entry["repo_url"],
+        entry["plugin_type"],
+        settings,
+        settings_group_validation,
+        entry["name"],
+        entry["namespace"],
+        entry["pip_url"],
+        entry["keywords"],
+        entry["capabilities"] or capabilities,
+        entry["executable"],
+        entry["variant"],
+    )
+    definition.update(entry["overrides"])
+    return definition
+
+
+def apply_registry_changes(util, entries):
+    """
+    Add default variants for new plugins and maintainers for new variants,
+    flushing the registry once for the whole batch. Returns the rewritten
+    paths.
+    """
+    for entry in entries:
+        util.registry.set_default_variant(
+            entry["plugin_type"], entry["name"], entry["variant"]
+        )
+        util.registry.add_maintainer(entry["variant"], entry["repo_url"])
+    return util.registry.flush()
+
+
+def _definition_exists(util, entry):
+    return Path(
+        util.hub_root,
+        "_data",
+        "meltano",
+        entry["plugin_type"],
+        entry["name"],
+        f"{entry['variant']}.yml",
+    ).exists()
+
+
+def add_from_manifest(util, manifest_path, workers=4):
+    """
+    Add every plugin in the manifest without prompting.
+
+    Plugins that already have a definition are skipped. Installs and scrapes
+    run concurrently, then definitions are written, the default variant and
+    maintainer registries are updated once for the batch and all changed
+    files are fixed and linted in a single yamllint run. Returns a summary with
+    the added, skipped and failed suffixes.
+    """
+    summary = {"added": [], "skipped": [], "failed": []}
+    entries = []
+    for entry in (plan_entry(util, row) for row in read_manifest(manifest_path)):
+        if _definition_exists(util, entry):
+            print(f"Definition exists, skipping: {entry['suffix']}")
+            summary["skipped"].append({"suffix": entry["suffix"]})
+        else:
+            entries.append(entry)
+    written = []
+    added = []
+    for entry, about, error in probe_entries(entries, workers=workers):
+        if error:
+            summary["failed"].append({"suffix": entry["suffix"], "error": error})
+            continue
+        definition = build_definition(util, entry, about)
+        written.append(util._write_definition(definition, entry["plugin_type"]))
+        added.append(entry)
+        summary["added"].append({"suffix": entry["suffix"]})
+    for path in written:
+        fix_yaml(path)
+    # The registry files are formatted when they're flushed
+    written.extend(apply_registry_changes(util, added))
+    if written:
+        run_yamllint(written)
+    return summary
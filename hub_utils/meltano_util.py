@@ -1,10 +1,24 @@
+import functools
+import hashlib
 import json
 import pathlib
+import re
 import subprocess
 import tempfile
 
 import typer
 
+from hub_utils import probe
+from hub_utils.tracing import span
+
+DESCRIPTION_CACHE_SIZE = 8192
+SCHEMA_MAX_DEPTH = None
+_MAX_REF_HOPS = 32
+# Words containing these are left alone when splitting sentence ending periods
+_PROTECTED_WORD = re.compile(r'http|ssh|ssl|e\.g\.|["`]|\(\)|\.com')
+_ABBREVIATION_ENDINGS = ("e.g", "i.e")
+_KEEP_CASE_PREFIXES = ("tap-", "target-", "http")
+
 
 class MeltanoUtil:
     def __init__(self):
@@ -15,66 +29,89 @@ class MeltanoUtil:
         return pathlib.Path(__file__).parent.resolve()
 
     @staticmethod
-    def add(plugin_name, namespace, executable, pip_url, plugin_type):
+    def add(
+        plugin_name, namespace, executable, pip_url, plugin_type, capture_stderr=False
+    ):
+        with span(f"install {plugin_name}", "meltano", pip_url=pip_url):
+            return MeltanoUtil._add(plugin_name, pip_url, capture_stderr)
+
+    @staticmethod
+    def _add(plugin_name, pip_url, capture_stderr=False):
+        """
+        Reinstall the plugin with pipx. With `capture_stderr` the pipx output is
+        returned instead of written to the terminal.
+        """
+        stderr = subprocess.PIPE if capture_stderr else None
         python_version = subprocess.run(
             "which python".split(" "), stdout=subprocess.PIPE, universal_newlines=True
         ).stdout.replace("\n", "")
-        subprocess.run(
+        uninstall = subprocess.run(
             f"pipx uninstall {plugin_name}".split(" "),
             stdout=subprocess.PIPE,
+            stderr=stderr,
             universal_newlines=True,
         )
-        subprocess.run(
+        install = subprocess.run(
             f"pipx install {pip_url} --python {python_version}".split(" "),
             stdout=subprocess.PIPE,
+            stderr=stderr,
             universal_newlines=True,
             check=True,
         )
+        if capture_stderr:
+            return (uninstall.stderr or "") + (install.stderr or "")
 
     @staticmethod
     def help_test(plugin_name, config=None):
+        with span(f"help {plugin_name}", "meltano"):
+            MeltanoUtil._help_test(plugin_name, config)
+
+    @staticmethod
+    def _help_test(plugin_name, config=None):
         if config:
             with tempfile.NamedTemporaryFile(mode="w+") as tmp:
                 json.dump(config, tmp)
                 tmp.flush()
-                subprocess.run(
+                probe.run_probe(
                     f"{plugin_name} --help --config {tmp.name}".split(" "),
-                    stdout=subprocess.PIPE,
-                    universal_newlines=True,
-                    check=True,
+                    **probe.default_limits(),
                 )
         else:
-            subprocess.run(
-                f"{plugin_name} --help".split(" "),
-                stdout=subprocess.PIPE,
-                universal_newlines=True,
-                check=True,
+            probe.run_probe(
+                f"{plugin_name} --help".split(" "), **probe.default_limits()
             )
 
     @staticmethod
     def sdk_about(plugin_name, config=None):
+        with span(f"about {plugin_name}", "meltano"):
+            return MeltanoUtil._sdk_about(plugin_name, config)
+
+    @staticmethod
+    def _sdk_about(plugin_name, config=None):
         if config:
             with tempfile.NamedTemporaryFile(mode="w+") as tmp:
                 json.dump(config, tmp)
                 tmp.flush()
-                about_content = subprocess.run(
+                return MeltanoUtil._capture_about(
                     f"{plugin_name} --about --format=json --config {tmp.name}".split(
                         " "
-                    ),
-                    stdout=subprocess.PIPE,
-                    universal_newlines=True,
-                    check=True,
+                    )
                 )
-                about_json_str = about_content.stdout.split("Setup Instructions:")[0]
-                return json.loads(about_json_str)
         else:
-            about_content = subprocess.run(
-                f"{plugin_name} --about --format=json".split(" "),
-                stdout=subprocess.PIPE,
-                universal_newlines=True,
-                check=True,
+            return MeltanoUtil._capture_about(
+                f"{plugin_name} --about --format=json".split(" ")
             )
-            return json.loads(about_content.stdout)
+
+    @staticmethod
+    def _capture_about(args):
+        about_content = probe.run_probe(
+            args,
+            stdout_reader=probe.JsonDocumentReader(max_bytes=probe.about_max_bytes()),
+            **probe.default_limits(),
+        )
+        if about_content.document is None:
+            raise ValueError(f"No JSON document found in `{' '.join(args)}` output")
+        return about_content.document
 
     @staticmethod
     def _get_maintainer(
@@ -311,119 +348,47 @@ class MeltanoUtil:
         )
 
     @staticmethod
-    def _traverse_schema_properties(schema, field_sep="."):
-        fields = []
-        for key, value in schema.get("properties", {}).items():
-            val_type = value.get("type", "string")
-            if (val_type == "object" or "object" in val_type) and (
-                value.get("properties") or value.get("oneOf")
-            ):
-                for subfield in MeltanoUtil._traverse_schema_properties(value):
-                    sub_name = subfield.get("name")
-                    full_name = f"{key}{field_sep}{sub_name}"
-                    reqs = value.get("required", [])
-                    field = {
-                        "name": full_name,
-                        "description": MeltanoUtil._clean_description(
-                            subfield.get("description")
-                        ),
-                        "default": subfield.get("default"),
-                        "type": subfield.get("type"),
-                        "title": subfield.get("title"),
-                        "const": subfield.get("const"),
-                        "items": subfield.get("items"),
-                        "enum": subfield.get("enum"),
-                    }
-                    if "required" in subfield:
-                        # accept parent if it was set already
-                        field["required"] = subfield["required"]
-                    else:
-                        field["required"] = sub_name in reqs
-
-                    fields.append(field)
-            else:
-                fields.append(
-                    {
-                        "name": key,
-                        "description": MeltanoUtil._clean_description(
-                            value.get("description")
-                        ),
-                        "default": value.get("default"),
-                        "type": value.get("type"),
-                        "title": value.get("title"),
-                        "const": value.get("const"),
-                        "items": value.get("items"),
-                        "enum": value.get("enum"),
-                    }
-                )
-        for item in schema.get("oneOf", []):
-            for i in MeltanoUtil._traverse_schema_properties(item):
-                if i.get("const"):
-                    i["description"] = i.get("const") or item.get("title")
-                fields.append(i)
-        return fields
+    def _traverse_schema_properties(schema, field_sep=".", max_depth=SCHEMA_MAX_DEPTH):
+        return _SchemaFlattener(schema, field_sep, max_depth).flatten()
 
     @staticmethod
     def _split_sentence_endings(word_list):
         desc_list_clean = []
         for word in word_list:
-            if any(i in word for i in ["i.e.", "e.g."]):
+            if (
+                "." not in word
+                or word.startswith(".")
+                or "i.e." in word
+                or "e.g." in word
+            ):
                 desc_list_clean.append(word)
                 continue
-            elif len(word.split(".")) > 1 and not word.startswith("."):
-                if (
-                    word.split(".")[0][-1].isnumeric()
-                    and word.split(".")[1]
-                    and word.split(".")[1][0].isnumeric()
-                ):
-                    # its numeric
-                    desc_list_clean.append(word)
-                    continue
-                if not any(
-                    keyword in word
-                    for keyword in (
-                        "http",
-                        "ssh",
-                        "ssl",
-                        "e.g.",
-                        '"',
-                        "`",
-                        "()",
-                        ".com",
-                    )
-                ):
-                    desc_list_clean.extend(word.replace(".", ". ").split())
-                    continue
-            desc_list_clean.append(word)
+            head, _, rest = word.partition(".")
+            if head[-1].isnumeric() and rest[:1].isnumeric():
+                # its numeric
+                desc_list_clean.append(word)
+            elif _PROTECTED_WORD.search(word):
+                desc_list_clean.append(word)
+            else:
+                desc_list_clean.extend(word.replace(".", ". ").split())
         return " ".join(desc_list_clean)
 
-    @staticmethod
-    def _last_element(lst):
-        if lst:
-            return lst[-1]
-        else:
-            return ""
-
     @staticmethod
     def _capitalize(cleaned_sentence):
-        capital_list = cleaned_sentence.split(". ")
         clean_capital_list = []
-        for elem in capital_list:
+        last_elem = ""
+        for elem in cleaned_sentence.split(". "):
             sentence_list = elem.split()
-            last_elem = MeltanoUtil._last_element(clean_capital_list)
-            if (
-                sentence_list[0][0].isupper()
-                or sentence_list[0][0] == "'"
-                or last_elem.endswith("e.g")
-                or last_elem.endswith("i.e")
-                or sentence_list[0].startswith("tap-")
-                or sentence_list[0].startswith("target-")
-                or sentence_list[0].startswith("http")
+            first_word = sentence_list[0]
+            if not (
+                first_word[0].isupper()
+                or first_word[0] == "'"
+                or last_elem.endswith(_ABBREVIATION_ENDINGS)
+                or first_word.startswith(_KEEP_CASE_PREFIXES)
             ):
-                clean_capital_list.append(" ".join(sentence_list))
-            else:
-                sentence_list[0] = sentence_list[0].capitalize()
-                clean_capital_list.append(" ".join(sentence_list))
+                sentence_list[0] = first_word.capitalize()
+            last_elem = " ".join(sentence_list)
+            clean_capital_list.append(last_elem)
 
         return ". ".join(clean_capital_list)
 
@@ -433,10 +398,201 @@ class MeltanoUtil:
             return description
         if not isinstance(description, str):
             return ""
+        return _clean_description_text(description)
 
-        # Add a space after sentence ending periods
-        desc_list = description.split()
-        cleaned_sentence = MeltanoUtil._split_sentence_endings(desc_list)
-        cleaned_description = MeltanoUtil._capitalize(cleaned_sentence)
-        cleaned_description = cleaned_description.replace("Dbt", "dbt")
-        return cleaned_description
+
+@functools.lru_cache(maxsize=DESCRIPTION_CACHE_SIZE)
+def _clean_description_text(description):
+    # The same descriptions (stream maps, flattening, batch config...) show up
+    # in nearly every SDK plugin so the cleaned text is memoized.
+    # Add a space after sentence ending periods
+    cleaned_sentence = MeltanoUtil._split_sentence_endings(description.split())
+    cleaned_description = MeltanoUtil._capitalize(cleaned_sentence)
+    return cleaned_description.replace("Dbt", "dbt")
+
+
+def _is_expandable(value):
+    val_type = value.get("type", "string")
+    return (val_type == "object" or "object" in val_type) and bool(
+        value.get("properties") or value.get("oneOf")
+    )
+
+
+def _leaf_field(name, value):
+    return {
+        "name": name,
+        "description": MeltanoUtil._clean_description(value.get("description")),
+        "default": value.get("default"),
+        "type": value.get("type"),
+        "title": value.get("title"),
+        "const": value.get("const"),
+        "items": value.get("items"),
+        "enum": value.get("enum"),
+    }
+
+
+def _exhausted(remaining):
+    return remaining is not None and remaining <= 0
+
+
+def _deeper(remaining):
+    return None if remaining is None else remaining - 1
+
+
+class _SchemaFlattener:
+    """
+    Flattens a settings JSON schema into dotted setting fields.
+
+    Local `$ref`s are resolved against the root schema. Sub-schemas are
+    memoized by content so repeated definitions and `oneOf` branches are only
+    flattened once and identical `oneOf` branches are skipped. Objects nested
+    deeper than `max_depth`, if set, are kept as a single setting. Without a
+    limit a `$ref` back to an enclosing schema is kept as a single setting, so
+    recursive schemas still end.
+    """
+
+    def __init__(self, root, field_sep=".", max_depth=SCHEMA_MAX_DEPTH):
+        self.root = root
+        self.field_sep = field_sep
+        self.max_depth = max_depth
+        self._resolved = {}
+        self._content_keys = {}
+        self._memo = {}
+
+    def _pointer(self, ref):
+        target = self.root
+        for part in ref.lstrip("#").split("/"):
+            if not part:
+                continue
+            part = part.replace("~1", "/").replace("~0", "~")
+            target = target[int(part)] if isinstance(target, list) else target[part]
+        return target
+
+    def resolve(self, node):
+        cached = self._resolved.get(id(node))
+        if cached:
+            return cached[1]
+        resolved = node
+        for _ in range(_MAX_REF_HOPS):
+            ref = resolved.get("$ref") if isinstance(resolved, dict) else None
+            if not isinstance(ref, str):
+                break
+            siblings = {k: v for k, v in resolved.items() if k != "$ref"}
+            try:
+                target = self._pointer(ref) if ref.startswith("#") else {}
+            except (KeyError, IndexError, ValueError, TypeError):
+                target = {}
+            resolved = {**target, **siblings}
+        if not isinstance(resolved, dict):
+            resolved = {}
+        # Keep a reference to `node` so its id can't be reused while cached
+        self._resolved[id(node)] = (node, resolved)
+        return resolved
+
+    def _content_key(self, node):
+        """
+        Content hash of a JSON value, computed bottom-up without recursion so
+        each nested container is only hashed once.
+        """
+        keys = self._content_keys
+        stack = [(node, False)]
+        while stack:
+            obj, children_done = stack.pop()
+            if id(obj) in keys:
+                continue
+            values = obj.values() if isinstance(obj, dict) else obj
+            if not children_done:
+                stack.append((obj, True))
+                for value in values:
+                    if isinstance(value, (dict, list)) and id(value) not in keys:
+                        stack.append((value, False))
+                continue
+            parts = [
+                keys[id(value)][1] if isinstance(value, (dict, list)) else repr(value)
+                for value in values
+            ]
+            if isinstance(obj, dict):
+                parts = sorted(zip(obj.keys(), parts))
+            digest = hashlib.md5(repr((type(obj).__name__, parts)).encode("utf-8"))
+            # Keep a reference to `obj` so its id can't be reused while cached
+            keys[id(obj)] = (obj, digest.hexdigest())
+        return keys[id(node)][1]
+
+    def _children(self, node, remaining):
+        if _exhausted(remaining):
+            return []
+        children = []
+        for value in node.get("properties", {}).values():
+            value = self.resolve(value)
+            if _is_expandable(value):
+                children.append(value)
+        for item in node.get("oneOf", []):
+            children.append(self.resolve(item))
+        return children
+
+    def _subfields(self, value, remaining):
+        # None if `value` is kept as a single setting, because it's too deep,
+        # not an object or a recursive $ref back to an enclosing schema
+        if _exhausted(remaining) or not _is_expandable(value):
+            return None
+        return self._memo.get((self._content_key(value), _deeper(remaining)))
+
+    def _combine(self, node, remaining):
+        fields = []
+        for key, value in node.get("properties", {}).items():
+            value = self.resolve(value)
+            subfields = self._subfields(value, remaining)
+            if subfields is None:
+                fields.append(_leaf_field(key, value))
+                continue
+            reqs = value.get("required", [])
+            for subfield in subfields:
+                sub_name = subfield.get("name")
+                field = _leaf_field(f"{key}{self.field_sep}{sub_name}", subfield)
+                if "required" in subfield:
+                    # accept parent if it was set already
+                    field["required"] = subfield["required"]
+                else:
+                    field["required"] = sub_name in reqs
+                fields.append(field)
+        if _exhausted(remaining):
+            return fields
+        seen_branches = set()
+        for item in node.get("oneOf", []):
+            item = self.resolve(item)
+            item_key = self._content_key(item)
+            if item_key in seen_branches:
+                continue
+            seen_branches.add(item_key)
+            for field in self._memo.get((item_key, _deeper(remaining)), []):
+                if field.get("const"):
+                    field = dict(field, description=field.get("const"))
+                fields.append(field)
+        return fields
+
+    def flatten(self):
+        root = self.resolve(self.root)
+        # Iterative post-order walk so deep schemas can't hit the recursion limit
+        stack = [(root, self.max_depth, False, frozenset())]
+        while stack:
+            node, remaining, expanded, ancestors = stack.pop()
+            node_key = self._content_key(node)
+            memo_key = (node_key, remaining)
+            if memo_key in self._memo:
+                continue
+            if expanded:
+                self._memo[memo_key] = self._combine(node, remaining)
+                continue
+            stack.append((node, remaining, True, ancestors))
+            if remaining is None:
+                ancestors = ancestors | {node_key}
+            for child in self._children(node, remaining):
+                child_key = self._content_key(child)
+                if child_key in ancestors:
+                    continue
+                if (child_key, _deeper(remaining)) not in self._memo:
+                    stack.append((child, _deeper(remaining), False, ancestors))
+        return [
+            dict(field)
+            for field in self._memo[(self._content_key(root), self.max_depth)]
+        ]
@@ -0,0 +1,101 @@
+import threading
+
+from hub_utils.meltano_util import MeltanoUtil
+
+
+class BackgroundInstall:
+    """
+    Runs the install test, `--help` and a speculative `--about` scrape for a
+    plugin on a background thread, so they overlap with the remaining prompts.
+
+    A replacement started with `previous` waits for that one to finish first,
+    since both installs would otherwise race on the same pipx environment.
+
+    The pipx output is captured so it doesn't interleave with the prompts, and
+    is printed once the install result is collected.
+    """
+
+    def __init__(
+        self, plugin_name, plugin_type, pip_url, namespace, executable, previous=None
+    ):
+        self.plugin_name = plugin_name
+        self.plugin_type = plugin_type
+        self.pip_url = pip_url
+        self.namespace = namespace
+        self.executable = executable
+        self.previous = previous
+        self.about = None
+        self.output = None
+        self.install_error = None
+        self.about_error = None
+        self._thread = threading.Thread(
+            target=self._run, name=f"preinstall-{plugin_name}", daemon=True
+        )
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        if self.previous:
+            self.previous.join()
+        try:
+            self.output = MeltanoUtil.add(
+                self.plugin_name,
+                self.namespace,
+                self.executable,
+                self.pip_url,
+                self.plugin_type,
+                capture_stderr=True,
+            )
+            MeltanoUtil.help_test(self.executable)
+        except Exception as e:
+            self.install_error = e
+            return
+        try:
+            self.about = MeltanoUtil.sdk_about(self.executable)
+        except Exception as e:
+            self.about_error = e
+
+    def join(self):
+        self._thread.join()
+
+    def matches(self, pip_url, executable):
+        return (self.pip_url, self.executable) == (pip_url, executable)
+
+    def restart_if_changed(
+        self, plugin_name, plugin_type, pip_url, namespace, executable
+    ):
+        """
+        Return this install if it's for the same pip_url and executable,
+        otherwise start and return a replacement.
+        """
+        if self.matches(pip_url, executable):
+            return self
+        print("pip_url or executable changed, restarting the background install")
+        return BackgroundInstall(
+            plugin_name, plugin_type, pip_url, namespace, executable, previous=self
+        ).start()
+
+    def install_result(self):
+        """
+        Wait for the install test and print its output, raising its error if it
+        failed.
+        """
+        self.join()
+        if self.output:
+            print(self.output, end="")
+            # Only shown once, about_result collects the install result too
+            self.output = None
+        if self.install_error:
+            raise self.install_error
+
+    def about_result(self):
+        """
+        Wait for the `--about` scrape and return it, raising the install or
+        scrape error if either failed.
+        """
+        self.install_result()
+        if self.about_error:
+            raise self.about_error
+        return self.about
@@ -0,0 +1,367 @@
+import json
+import os
+import re
+import signal
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, List, Optional
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+DEFAULT_TIMEOUT = 300
+DEFAULT_MAX_OUTPUT_BYTES = 64 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+
+
+@dataclass
+class ProbeResult:
+    args: List[str]
+    returncode: int
+    stdout: str
+    stderr: str
+    wall_time: float
+    cpu_time: float
+    max_rss_kb: int
+    timed_out: bool = False
+    stopped_early: bool = False
+    document: Any = None
+
+
+class ProbeOutputTooLarge(ValueError):
+    pass
+
+
+class OutputReader:
+    """
+    Default stdout reader that keeps everything the child writes, up to
+    `max_bytes`.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_OUTPUT_BYTES):
+        self.max_bytes = max_bytes
+        self._buffer = bytearray()
+
+    def _append(self, chunk):
+        self._buffer += chunk
+        if len(self._buffer) > self.max_bytes:
+            raise ProbeOutputTooLarge(
+                f"Probe output exceeded the maximum size of {self.max_bytes} bytes"
+            )
+
+    def feed(self, chunk):
+        """
+        Consume a chunk of stdout, return True once nothing more is needed.
+        """
+        self._append(chunk)
+        return False
+
+    def output(self):
+        return self._buffer.decode("utf-8", errors="replace")
+
+
+_DOCUMENT_START = re.compile(rb"^[ \t]*\{", re.MULTILINE)
+_STRUCTURAL = re.compile(rb'[{}\[\]"]')
+_STRING_SPECIAL = re.compile(rb'["\\]')
+
+
+class JsonDocumentReader(OutputReader):
+    """
+    Incrementally scans stdout for the first JSON object that starts on its own
+    line and has all of `required_keys`, skipping any log lines printed before
+    it. Reading stops as soon as the object is balanced, which is then decoded
+    once with a raw decoder so any trailing output (e.g. "Setup Instructions:")
+    is never read. Objects that don't decode or lack a required key, like JSON
+    log lines, are discarded and scanning carries on after them.
+    """
+
+    def __init__(
+        self, max_bytes=DEFAULT_MAX_OUTPUT_BYTES, required_keys=("name", "settings")
+    ):
+        super().__init__(max_bytes)
+        self.required_keys = required_keys
+        self.document = None
+        self._start = None
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+
+    def _find_start(self):
+        match = _DOCUMENT_START.search(self._buffer)
+        if match:
+            self._start = match.end() - 1
+            self._pos = match.end()
+            self._depth = 1
+            return True
+        # Drop complete log lines, keeping a partial last line for the next chunk
+        last_newline = self._buffer.rfind(b"\n")
+        if last_newline >= 0:
+            del self._buffer[: last_newline + 1]
+        return False
+
+    def _scan(self):
+        buffer = self._buffer
+        while True:
+            if self._in_string:
+                match = _STRING_SPECIAL.search(buffer, self._pos)
+                if not match:
+                    self._pos = len(buffer)
+                    return False
+                if match.group() == b"\\":
+                    if match.end() == len(buffer):
+                        # Escape split across chunks, rescan it with more data
+                        self._pos = match.start()
+                        return False
+                    self._pos = match.end() + 1
+                    continue
+                self._in_string = False
+                self._pos = match.end()
+                continue
+            match = _STRUCTURAL.search(buffer, self._pos)
+            if not match:
+                self._pos = len(buffer)
+                return False
+            self._pos = match.end()
+            char = match.group()
+            if char == b'"':
+                self._in_string = True
+            elif char in (b"{", b"["):
+                self._depth += 1
+            else:
+                self._depth -= 1
+                if self._depth == 0:
+                    return True
+
+    def _decode(self):
+        start, end = self._start, self._pos
+        try:
+            document, _ = json.JSONDecoder().raw_decode(
+                self._buffer[start:end].decode("utf-8")
+            )
+        except ValueError:
+            return False
+        if not isinstance(document, dict) or any(
+            key not in document for key in self.required_keys
+        ):
+            return False
+        self.document = document
+        return True
+
+    def feed(self, chunk):
+        self._append(chunk)
+        while True:
+            if self._start is None and not self._find_start():
+                return False
+            if not self._scan():
+                return False
+            if self._decode():
+                return True
+            # Not the document, look for the next one after it
+            del self._buffer[: self._pos]
+            self._start = None
+            self._pos = 0
+
+    def output(self):
+        if self._start is None:
+            return ""
+        start, end = self._start, self._pos
+        return self._buffer[start:end].decode("utf-8", errors="replace")
+
+
+RESULTS: List[ProbeResult] = []
+_results_lock = threading.Lock()
+
+
+def _env_number(name):
+    value = os.environ.get(name)
+    return float(value) if value else None
+
+
+def default_limits():
+    """
+    Read the probe limits from the environment so CI can tune them without
+    changing the commands.
+    """
+    timeout = _env_number("HUB_UTILS_PROBE_TIMEOUT")
+    return {
+        "timeout": DEFAULT_TIMEOUT if timeout is None else timeout,
+        "memory_limit_mb": _env_number("HUB_UTILS_PROBE_MEMORY_MB"),
+        "cpu_limit_s": _env_number("HUB_UTILS_PROBE_CPU_SECONDS"),
+    }
+
+
+def about_max_bytes():
+    max_mb = _env_number("HUB_UTILS_ABOUT_MAX_MB")
+    if max_mb is None:
+        return DEFAULT_MAX_OUTPUT_BYTES
+    return int(max_mb * 1024 * 1024)
+
+
+def _apply_rlimits(pid, memory_limit_mb, cpu_limit_s):
+    # Set from the parent right after spawning, a preexec_fn isn't safe once
+    # other threads are running
+    limits = []
+    if memory_limit_mb:
+        limits.append((resource.RLIMIT_AS, int(memory_limit_mb * 1024 * 1024)))
+    if cpu_limit_s:
+        limits.append((resource.RLIMIT_CPU, int(cpu_limit_s)))
+    for which, limit in limits:
+        try:
+            resource.prlimit(pid, which, (limit, limit))
+        except ProcessLookupError:
+            # Already exited
+            return
+
+
+def _kill_group(pid):
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def _exit_code(status):
+    if os.WIFSIGNALED(status):
+        return -os.WTERMSIG(status)
+    return os.WEXITSTATUS(status)
+
+
+def _max_rss_kb(rusage):
+    # ru_maxrss is reported in bytes on macOS and kilobytes on Linux
+    if sys.platform == "darwin":
+        return rusage.ru_maxrss // 1024
+    return rusage.ru_maxrss
+
+
+def _pump(stream, reader):
+    fd = stream.fileno()
+    while True:
+        chunk = os.read(fd, CHUNK_SIZE)
+        if not chunk:
+            return False
+        if reader.feed(chunk):
+            return True
+
+
+def run_probe(
+    args: List[str],
+    timeout: Optional[float] = None,
+    memory_limit_mb: Optional[float] = None,
+    cpu_limit_s: Optional[float] = None,
+    check: bool = True,
+    stdout_reader: Optional[OutputReader] = None,
+) -> ProbeResult:
+    """
+    Run a plugin command in its own process group with stdin closed.
+
+    The whole group is killed once `timeout` seconds have passed. Wall time,
+    CPU time and max RSS of the child are recorded on the returned result and
+    in `RESULTS`. Like `subprocess.run(check=True)` a non-zero exit raises
+    `CalledProcessError` and a timeout raises `TimeoutExpired`.
+
+    Stdout is consumed in chunks by `stdout_reader`. If the reader reports that
+    it has everything it needs the child is killed and the probe counts as
+    successful.
+    """
+    reader = stdout_reader or OutputReader()
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        args,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        start_new_session=True,
+    )
+    if hasattr(resource, "prlimit"):
+        _apply_rlimits(proc.pid, memory_limit_mb, cpu_limit_s)
+    timed_out = threading.Event()
+
+    def on_timeout():
+        timed_out.set()
+        _kill_group(proc.pid)
+
+    timer = threading.Timer(timeout, on_timeout) if timeout else None
+    if timer:
+        timer.daemon = True
+        timer.start()
+    stderr_chunks = []
+    stderr_reader = threading.Thread(
+        target=lambda: stderr_chunks.append(proc.stderr.read()), daemon=True
+    )
+    stderr_reader.start()
+    stopped_early = False
+    try:
+        stopped_early = _pump(proc.stdout, reader)
+    except BaseException:
+        _kill_group(proc.pid)
+        raise
+    finally:
+        if stopped_early:
+            _kill_group(proc.pid)
+        stderr_reader.join()
+        _, status, rusage = os.wait4(proc.pid, 0)
+        if timer:
+            timer.cancel()
+        proc.stdout.close()
+        proc.stderr.close()
+    proc.returncode = _exit_code(status)
+    result = ProbeResult(
+        args=list(args),
+        returncode=proc.returncode,
+        stdout=reader.output(),
+        stderr=b"".join(stderr_chunks).decode("utf-8", errors="replace"),
+        wall_time=time.perf_counter() - start,
+        cpu_time=rusage.ru_utime + rusage.ru_stime,
+        max_rss_kb=_max_rss_kb(rusage),
+        timed_out=timed_out.is_set(),
+        stopped_early=stopped_early,
+        document=getattr(reader, "document", None),
+    )
+    with _results_lock:
+        RESULTS.append(result)
+    if result.timed_out:
+        raise subprocess.TimeoutExpired(
+            result.args, timeout, output=result.stdout, stderr=result.stderr
+        )
+    if check and result.returncode != 0 and not result.stopped_early:
+        raise subprocess.CalledProcessError(
+            result.returncode, result.args, output=result.stdout, stderr=result.stderr
+        )
+    return result
+
+
+def describe_error(error):
+    """
+    Describe a failed probe or install, followed by the command's stderr if it
+    was captured.
+    """
+    stderr = getattr(error, "stderr", None)
+    if isinstance(stderr, bytes):
+        stderr = stderr.decode("utf-8", errors="replace")
+    if stderr and stderr.strip():
+        return f"{error}\n{stderr.rstrip()}"
+    return str(error)
+
+
+def report(results=None):
+    """
+    Return a summary of all probes sorted by wall time, slowest first.
+    """
+    with _results_lock:
+        results = list(RESULTS if results is None else results)
+    return [
+        {
+            "command": " ".join(result.args),
+            "returncode": result.returncode,
+            "timed_out": result.timed_out,
+            "wall_time": round(result.wall_time, 3),
+            "cpu_time": round(result.cpu_time, 3),
+            "max_rss_kb": result.max_rss_kb,
+        }
+        for result in sorted(results, key=lambda r: r.wall_time, reverse=True)
+    ]
@@ -0,0 +1,161 @@
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from ruamel.yaml import YAML
+from ruamel.yaml import events as yaml_events
+
+from hub_utils.catalog import scan_catalog
+from hub_utils.meltano_util import MeltanoUtil
+from hub_utils.yaml_lint import fix_yaml, run_yamllint, yaml
+
+QUALITY_FIELDS = ("variant", "keywords", "repo", "quality")
+QUALITY_PLUGIN_TYPES = ("extractors", "loaders")
+
+
+def _skip_value(event, events):
+    if not isinstance(event, yaml_events.CollectionStartEvent):
+        return
+    depth = 1
+    for event in events:
+        if isinstance(event, yaml_events.CollectionStartEvent):
+            depth += 1
+        elif isinstance(event, yaml_events.CollectionEndEvent):
+            depth -= 1
+            if depth == 0:
+                return
+
+
+def _mapping_items(events):
+    """
+    Yield `(key, first value event)` for the mapping whose start event was just
+    consumed. The caller must consume or skip each value before resuming.
+    """
+    for event in events:
+        if isinstance(event, yaml_events.MappingEndEvent):
+            return
+        key = event.value if isinstance(event, yaml_events.ScalarEvent) else None
+        yield key, next(events)
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def read_usage_metrics(path, repos=None):
+    """
+    Stream `variant_metrics.yml` and return `{repo: all_projects}`, keeping only
+    the repos in `repos` if given. Parser events for everything else are
+    skipped without building objects, so memory scales with the hub rather
+    than the metrics file.
+    """
+    usage_counts = {}
+    with open(path, "r") as f:
+        events = iter(YAML(typ="safe").parse(f))
+        for event in events:
+            if isinstance(event, yaml_events.MappingStartEvent):
+                break
+        else:
+            return usage_counts
+        for key, value_event in _mapping_items(events):
+            if key != "metrics" or not isinstance(
+                value_event, yaml_events.MappingStartEvent
+            ):
+                _skip_value(value_event, events)
+                continue
+            for repo, repo_event in _mapping_items(events):
+                if (repos is not None and repo not in repos) or not isinstance(
+                    repo_event, yaml_events.MappingStartEvent
+                ):
+                    _skip_value(repo_event, events)
+                    continue
+                for field, field_event in _mapping_items(events):
+                    if field == "all_projects" and isinstance(
+                        field_event, yaml_events.ScalarEvent
+                    ):
+                        usage_counts[repo] = _to_int(field_event.value)
+                    else:
+                        _skip_value(field_event, events)
+    return usage_counts
+
+
+@lru_cache(maxsize=None)
+def _quality(variant, is_sdk_based, usage_count, responsiveness):
+    return MeltanoUtil.get_quality(variant, is_sdk_based, usage_count, responsiveness)
+
+
+def plan_quality_updates(entries, usage_counts, responsiveness=None):
+    """
+    Evaluate the quality rules for every catalog entry and return the ones
+    whose quality would change.
+
+    `usage_counts` maps repo URL to its `all_projects` count and
+    `responsiveness` maps repo URL to a responsiveness class, defaulting to
+    "high".
+    """
+    responsiveness = responsiveness or {}
+    changes = []
+    for entry in entries:
+        is_sdk_based = "meltano_sdk" in (entry.get("keywords") or [])
+        repo = entry.get("repo")
+        usage_count = usage_counts.get(repo, 0)
+        quality = _quality(
+            entry["variant"],
+            is_sdk_based,
+            usage_count,
+            responsiveness.get(repo, "high"),
+        )
+        if quality != entry.get("quality"):
+            changes.append(
+                {
+                    "path": entry["path"],
+                    "suffix": entry["suffix"],
+                    "old": entry.get("quality"),
+                    "new": quality,
+                }
+            )
+    return changes
+
+
+def format_plan(changes):
+    return [f"{c['suffix']}: {c['old']} -> {c['new']}" for c in changes]
+
+
+def _apply_quality(path, quality):
+    with open(path, "r") as f:
+        data = yaml.load(f)
+    data["quality"] = quality
+    with open(path, "w") as f:
+        yaml.dump(data, f)
+    fix_yaml(path)
+    return path
+
+
+def apply_quality_updates(changes, workers=None):
+    """
+    Write the changed qualities in parallel, then lint all changed files in a
+    single yamllint run.
+    """
+    if not changes:
+        return []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        paths = list(
+            pool.map(
+                _apply_quality,
+                [c["path"] for c in changes],
+                [c["new"] for c in changes],
+            )
+        )
+    run_yamllint(paths)
+    return paths
+
+
+def load_quality_table(hub_root, workers=None):
+    return scan_catalog(
+        hub_root,
+        fields=QUALITY_FIELDS,
+        plugin_types=QUALITY_PLUGIN_TYPES,
+        workers=workers,
+    )
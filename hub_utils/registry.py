@@ -0,0 +1,160 @@
+import fcntl
+import hashlib
+import os
+import tempfile
+from contextlib import contextmanager
+
+from hub_utils.yaml_lint import fix_yaml_dict_format, yaml
+
+
+def _lock_path(path):
+    # Kept outside the hub so it never shows up as an untracked file there. The
+    # registry files themselves can't be locked as they're replaced on write.
+    key = hashlib.md5(os.path.dirname(os.path.abspath(path)).encode()).hexdigest()
+    return os.path.join(tempfile.gettempdir(), f"hub-utils-registry-{key}.lock")
+
+
+def _read(path):
+    with open(path, "r") as f:
+        return yaml.load(f) or {}
+
+
+def _atomic_write(path, data):
+    """
+    Write the formatted data to a temp file next to `path` and rename it over
+    the original, so readers never see a partial file.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(
+        dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "w") as f:
+            yaml.dump(fix_yaml_dict_format(data), f)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(path):
+            os.chmod(tmp_path, os.stat(path).st_mode & 0o777)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class Registry:
+    """
+    Batches changes to the shared `default_variants.yml` and `maintainers.yml`
+    files.
+
+    Changes are recorded in memory and `flush` applies them in one go: under
+    an exclusive advisory lock each file is re-read, the recorded changes are
+    replayed on top of what's there now and the result replaces the file
+    atomically. Concurrent runs therefore don't lose each other's updates and
+    each file is rewritten at most once per flush.
+    """
+
+    def __init__(self, default_variants_path, maintainers_path):
+        self.default_variants_path = default_variants_path
+        self.maintainers_path = maintainers_path
+        self.lock_path = _lock_path(default_variants_path)
+        self._default_changes = []
+        self._maintainer_changes = []
+        self._defaults = None
+
+    def _current_defaults(self):
+        if self._defaults is None:
+            self._defaults = _read(self.default_variants_path)
+        return self._defaults
+
+    def default_variant(self, plugin_type, plugin_name):
+        """
+        The default variant including pending changes, None if not set.
+        """
+        for p_type, p_name, variant, _ in reversed(self._default_changes):
+            if (p_type, p_name) == (plugin_type, plugin_name):
+                return variant
+        return self._current_defaults().get(plugin_type, {}).get(plugin_name)
+
+    def set_default_variant(self, plugin_type, plugin_name, variant, overwrite=False):
+        """
+        Record a default variant. Without `overwrite` it's only applied if the
+        plugin has no default at flush time.
+        """
+        self._default_changes.append((plugin_type, plugin_name, variant, overwrite))
+
+    def has_maintainer(self, variant):
+        if any(name == variant for name, _ in self._maintainer_changes):
+            return True
+        return variant in _read(self.maintainers_path)
+
+    def add_maintainer(self, variant, repo_url):
+        """
+        Record a maintainer for the variant, applied if it doesn't exist yet at
+        flush time.
+        """
+        self._maintainer_changes.append(
+            (
+                variant,
+                {
+                    "label": variant,
+                    "url": "/".join(repo_url.split("/")[:-1]),
+                    "name": variant,
+                },
+            )
+        )
+
+    @property
+    def pending(self):
+        return bool(self._default_changes or self._maintainer_changes)
+
+    @contextmanager
+    def _locked(self):
+        with open(self.lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _apply_defaults(self, defaults):
+        changed = False
+        for plugin_type, plugin_name, variant, overwrite in self._default_changes:
+            type_defaults = defaults.setdefault(plugin_type, {})
+            if plugin_name in type_defaults and not overwrite:
+                continue
+            if type_defaults.get(plugin_name) != variant:
+                type_defaults[plugin_name] = variant
+                changed = True
+        return changed
+
+    def _apply_maintainers(self, maintainers):
+        changed = False
+        for variant, maintainer in self._maintainer_changes:
+            if variant not in maintainers:
+                maintainers[variant] = maintainer
+                changed = True
+        return changed
+
+    def flush(self):
+        """
+        Apply the pending changes and return the paths that were rewritten.
+        """
+        written = []
+        if not self.pending:
+            return written
+        with self._locked():
+            if self._default_changes:
+                defaults = _read(self.default_variants_path)
+                if self._apply_defaults(defaults):
+                    _atomic_write(self.default_variants_path, defaults)
+                    written.append(self.default_variants_path)
+            if self._maintainer_changes:
+                maintainers = _read(self.maintainers_path)
+                if self._apply_maintainers(maintainers):
+                    _atomic_write(self.maintainers_path, maintainers)
+                    written.append(self.maintainers_path)
+        self._default_changes = []
+        self._maintainer_changes = []
+        self._defaults = None
+        return written
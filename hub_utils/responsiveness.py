@@ -0,0 +1,124 @@
+import csv
+import json
+import os
+import statistics
+
+from hub_utils.cache import cache_dir, file_fingerprint
+
+# Median hours to first maintainer response on issues and PRs
+HIGH_MAX_HOURS = 72
+MEDIUM_MAX_HOURS = 24 * 14
+# Share of issues/PRs that never got a response before a repo is "low"
+MAX_UNANSWERED_SHARE = 0.5
+DEFAULT_RESPONSIVENESS = "high"
+
+
+def normalize_repo_url(url):
+    url = (url or "").strip().lower().rstrip("/")
+    if url.endswith(".git"):
+        url = url[:-4]
+    url = url.replace("http://", "https://").replace("://www.", "://")
+    return url
+
+
+def _read_records(path):
+    if path.endswith(".csv"):
+        with open(path, "r", newline="") as f:
+            return list(csv.DictReader(f))
+    with open(path, "r") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        # {repo: [records]} or {repo: {aggregates}}
+        records = []
+        for repo, value in data.items():
+            for record in value if isinstance(value, list) else [value]:
+                records.append({"repo": repo, **record})
+        return records
+    return data
+
+
+def _hours(value):
+    if value in (None, ""):
+        return None
+    return float(value)
+
+
+def classify(median_hours, unanswered_share):
+    if median_hours is None or unanswered_share > MAX_UNANSWERED_SHARE:
+        return "low"
+    if median_hours <= HIGH_MAX_HOURS:
+        return "high"
+    if median_hours <= MEDIUM_MAX_HOURS:
+        return "medium"
+    return "low"
+
+
+def _rules():
+    # Part of the cache key, so changing a threshold re-classifies the export
+    return (HIGH_MAX_HOURS, MEDIUM_MAX_HOURS, MAX_UNANSWERED_SHARE)
+
+
+def build_index(records):
+    """
+    Compute `{normalized repo url: responsiveness}` from activity records.
+
+    A record is either one issue/PR with `response_hours` (empty when it never
+    got a response) or a per-repo aggregate with `median_response_hours` and an
+    optional `unanswered_share`.
+    """
+    per_repo = {}
+    aggregates = {}
+    for record in records:
+        repo = normalize_repo_url(record.get("repo"))
+        if not repo:
+            continue
+        if record.get("median_response_hours") not in (None, ""):
+            aggregates[repo] = (
+                _hours(record["median_response_hours"]),
+                float(record.get("unanswered_share") or 0),
+            )
+            continue
+        per_repo.setdefault(repo, []).append(_hours(record.get("response_hours")))
+    index = {}
+    for repo, hours in per_repo.items():
+        answered = [h for h in hours if h is not None]
+        median = statistics.median(answered) if answered else None
+        index[repo] = classify(median, 1 - len(answered) / len(hours))
+    for repo, (median, unanswered_share) in aggregates.items():
+        index[repo] = classify(median, unanswered_share)
+    return index
+
+
+class Responsiveness:
+    """
+    Responsiveness classes for every repo in an offline activity export (JSON or
+    CSV), indexed once and cached on disk keyed by the export's content hash and
+    the classification thresholds.
+    """
+
+    def __init__(self, index, default=DEFAULT_RESPONSIVENESS):
+        self.index = index
+        self.default = default
+
+    @classmethod
+    def from_export(cls, path, use_cache=True, default=DEFAULT_RESPONSIVENESS):
+        cache_path = None
+        if use_cache:
+            fingerprint = file_fingerprint(path, _rules())
+            cache_path = cache_dir("responsiveness") / f"{fingerprint}.json"
+            if cache_path.exists():
+                with open(cache_path, "r") as f:
+                    return cls(json.load(f), default)
+        index = build_index(_read_records(path))
+        if cache_path:
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(index, f)
+            os.replace(tmp_path, cache_path)
+        return cls(index, default)
+
+    def get(self, repo_url):
+        return self.index.get(normalize_repo_url(repo_url), self.default)
+
+    def for_repos(self, repo_urls):
+        return {repo: self.get(repo) for repo in repo_urls}
@@ -1,8 +1,39 @@
+import base64
+import gzip
+import hashlib
+import json
 import os
 from pathlib import Path
 
 import boto3
 
+from hub_utils.tracing import span
+
+GZIP_MAGIC = b"\x1f\x8b"
+DELTA_EXTENSION = ".delta.json"
+
+
+def decode_body(data):
+    """
+    Decompress a gzip encoded extract, other bodies are returned as is so
+    objects uploaded before compression stay readable.
+    """
+    if data[:2] == GZIP_MAGIC:
+        return gzip.decompress(data)
+    return data
+
+
+def parse_extract_name(key):
+    """
+    Split a `<hash>--<date>.json` or `<hash>--<date>.delta.json` key into
+    `(hash, date, is_delta)`.
+    """
+    name = os.path.basename(key)
+    is_delta = name.endswith(DELTA_EXTENSION)
+    stem = name[: -len(DELTA_EXTENSION)] if is_delta else name.replace(".json", "")
+    hash_id, date = stem.split("--")[:2]
+    return hash_id, date, is_delta
+
 
 class S3:
     def __init__(self):
@@ -27,34 +58,84 @@ class S3:
         s3 = aws_session.client("s3")
         return s3
 
+    def list_objects(self, bucket, prefix):
+        with span("s3 list", "s3", prefix=prefix):
+            return self._client.list_objects_v2(Bucket=bucket, Prefix=prefix).get(
+                "Contents", []
+            )
+
     def hash_exists(self, s3_bucket, s3_file_path):
         components = s3_file_path.split("/")
         prefix = "/".join(components[:-1])
         file_name = components[-1]
         hash_id = file_name.split("--")[0]
-        objs = self._client.list_objects_v2(Bucket=s3_bucket, Prefix=prefix).get(
-            "Contents", []
-        )
+        objs = self.list_objects(s3_bucket, prefix)
         existing_hashes = [os.path.basename(obj["Key"]).split("--")[0] for obj in objs]
         return hash_id in existing_hashes
 
-    def upload(self, bucket, prefix, local_file_path):
-        self._client.upload_file(local_file_path, bucket, prefix)
+    def latest_key(self, bucket, prefix):
+        """
+        The key of the most recent extract under the prefix, None if there's
+        none.
+        """
+        objs = self.list_objects(bucket, prefix)
+        if not objs:
+            return None
+        latest = max(
+            objs,
+            key=lambda obj: (parse_extract_name(obj["Key"])[1], obj["LastModified"]),
+        )
+        return latest["Key"]
+
+    def upload_bytes(
+        self, bucket, key, data, content_type="application/json", compress=False
+    ):
+        """
+        Upload bytes, or a binary buffer, straight from memory. `compress` gzips
+        the body and sets `Content-Encoding: gzip`. The body's MD5 is sent as
+        `Content-MD5` so S3 rejects a corrupted upload.
+        """
+        if hasattr(data, "read"):
+            data = data.read()
+        extra_args = {"ContentType": content_type}
+        if compress:
+            # A fixed mtime keeps the bytes identical for identical content
+            data = gzip.compress(data, mtime=0)
+            extra_args["ContentEncoding"] = "gzip"
+        content_md5 = base64.b64encode(hashlib.md5(data).digest()).decode("ascii")
+        with span("s3 upload", "s3", key=key, bytes=len(data)):
+            self._client.put_object(
+                Bucket=bucket, Key=key, Body=data, ContentMD5=content_md5, **extra_args
+            )
+
+    def read_object(self, bucket, key):
+        """
+        Return the object's body, decompressed if it was stored gzip encoded.
+        """
+        with span("s3 download", "s3", key=key):
+            body = self._client.get_object(Bucket=bucket, Key=key)["Body"].read()
+        return decode_body(body)
 
     def download_latest(self, bucket, prefix, local_file_path):
-        objs = self._client.list_objects_v2(Bucket=bucket, Prefix=prefix).get(
-            "Contents"
-        )
-        if not objs:
+        latest_name, content = self.read_latest(bucket, prefix)
+        if not latest_name:
             return
-        latest = sorted(
-            [
-                os.path.basename(obj["Key"]).replace(".json", "").split("--")[1]
-                for obj in objs
-            ]
-        )[-1]
-        latest_name = [
-            obj["Key"] for obj in objs if obj["Key"].endswith(f"{latest}.json")
-        ][0]
         Path(os.path.dirname(local_file_path)).mkdir(parents=True, exist_ok=True)
-        self._client.download_file(bucket, latest_name, local_file_path)
+        with open(local_file_path, "wb") as f:
+            f.write(content)
+
+    def read_latest(self, bucket, prefix):
+        """
+        Return the key and body of the most recent extract under the prefix
+        without touching disk, `(None, None)` if there's none. A delta is
+        rebuilt into the full extract.
+        """
+        latest_name = self.latest_key(bucket, prefix)
+        if not latest_name:
+            return None, None
+        if parse_extract_name(latest_name)[2]:
+            from hub_utils.history import ExtractHistory
+
+            history = ExtractHistory(self, bucket, os.path.dirname(latest_name))
+            return latest_name, json.dumps(history.read(latest_name)).encode("utf-8")
+        return latest_name, self.read_object(bucket, latest_name)
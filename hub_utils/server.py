@@ -0,0 +1,204 @@
+import json
+import os
+import socket
+import socketserver
+import threading
+
+from ruamel.yaml import YAML
+
+from hub_utils.catalog import suffix_parts
+from hub_utils.utilities import Utilities
+from hub_utils.watch import DefinitionPoller
+
+DEFAULT_POLL_INTERVAL = 1.0
+
+
+def _load_definition(path):
+    with open(path, "r") as f:
+        return YAML(typ="safe").load(f) or {}
+
+
+def _load_definitions(paths):
+    """
+    Load each definition on its own. One that can't be parsed or isn't a
+    mapping, e.g. a save in the middle of an edit, is logged and left out.
+    """
+    loaded = {}
+    for path in paths:
+        try:
+            data = _load_definition(path)
+        except Exception as e:
+            print(f"Skipping invalid definition {path}: {e}")
+            continue
+        if not isinstance(data, dict):
+            print(f"Skipping invalid definition {path}: not a YAML mapping")
+            continue
+        loaded[path] = data
+    return loaded
+
+
+class CatalogIndex:
+    """
+    In-memory copy of every plugin definition, refreshed from the files that
+    changed since the last poll.
+    """
+
+    def __init__(self, hub_root):
+        self.hub_root = hub_root
+        self.poller = DefinitionPoller(f"{hub_root}/_data/meltano/")
+        self._lock = threading.Lock()
+        self._definitions = _load_definitions(self.poller.stats)
+
+    def refresh(self):
+        """
+        Reload changed definitions, returning the number of paths updated. A
+        changed file that fails to load keeps its last good definition until
+        it's saved again.
+        """
+        changed, deleted = self.poller.poll()
+        if not changed and not deleted:
+            return 0
+        loaded = _load_definitions(changed)
+        with self._lock:
+            definitions = {**self._definitions, **loaded}
+            # Keep the scan order of the hub so listings match a fresh scan
+            self._definitions = {
+                path: definitions[path]
+                for path in self.poller.stats
+                if path in definitions
+            }
+        return len(changed) + len(deleted)
+
+    def definitions(self):
+        with self._lock:
+            return list(self._definitions.items())
+
+    def variant_names(self, plugin_type=None, metadata_type="sdk", skip=0, limit=10000):
+        return Utilities.select_variant_names(
+            self.definitions(), plugin_type, metadata_type, skip, limit
+        )
+
+    def list(self, plugin_type=None, keyword=None, quality=None, fields=None):
+        """
+        Suffixes of matching variants, plus the requested definition fields.
+        """
+        plugin_types = plugin_type.split(",") if plugin_type else None
+        results = []
+        for path, data in self.definitions():
+            p_type, p_name, p_variant = suffix_parts(path)
+            if plugin_types and p_type not in plugin_types:
+                continue
+            if keyword and keyword not in (data.get("keywords") or []):
+                continue
+            if quality and data.get("quality") != quality:
+                continue
+            entry = {"suffix": f"{p_type}/{p_name}/{p_variant}"}
+            entry.update({field: data.get(field) for field in fields or []})
+            results.append(entry)
+        return results
+
+    def lookup(self, plugin_type, name, variant=None):
+        """
+        Full definitions of a plugin, keyed by suffix, optionally limited to a
+        single variant.
+        """
+        results = {}
+        for path, data in self.definitions():
+            p_type, p_name, p_variant = suffix_parts(path)
+            if (p_type, p_name) != (plugin_type, name):
+                continue
+            if variant and p_variant != variant:
+                continue
+            results[f"{p_type}/{p_name}/{p_variant}"] = data
+        return results
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            response = self.server.dispatch(line)
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class ServerAlreadyRunning(RuntimeError):
+    pass
+
+
+def _remove_stale_socket(socket_path):
+    """
+    Remove a socket left behind by a server that's gone, refusing to take over
+    one that still accepts connections.
+    """
+    if not os.path.exists(socket_path):
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(socket_path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            os.remove(socket_path)
+            return
+    raise ServerAlreadyRunning(f"A server is already listening on {socket_path}")
+
+
+class HubServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Answers JSON-lines requests over a Unix socket. Each request is an object
+    with an `op` and its keyword arguments, e.g.
+    `{"op": "variant_names", "plugin_type": "extractors"}`. Each response is
+    `{"ok": true, "result": ...}` or `{"ok": false, "error": "..."}`.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, socket_path, index, poll_interval=DEFAULT_POLL_INTERVAL):
+        _remove_stale_socket(socket_path)
+        super().__init__(socket_path, _RequestHandler)
+        self.socket_path = socket_path
+        self.index = index
+        self.poll_interval = poll_interval
+        self._stopped = threading.Event()
+        self.ops = {
+            "ping": lambda: "pong",
+            "variant_names": index.variant_names,
+            "list": index.list,
+            "lookup": index.lookup,
+            "refresh": index.refresh,
+        }
+
+    def dispatch(self, line):
+        try:
+            request = json.loads(line)
+            op = self.ops.get(request.pop("op", None))
+            if op is None:
+                return {"ok": False, "error": "Unknown or missing op"}
+            return {"ok": True, "result": op(**request)}
+        except Exception as e:
+            return {"ok": False, "error": repr(e)}
+
+    def _watch(self):
+        while not self._stopped.wait(self.poll_interval):
+            try:
+                updated = self.index.refresh()
+            except Exception as e:
+                # Keep watching, an error here would otherwise stop all reloads
+                print(f"Refreshing the catalog failed: {e}")
+                continue
+            if updated:
+                print(f"Reloaded {updated} definition(s)")
+
+    def serve_forever(self, poll_interval=0.5):
+        watcher = threading.Thread(target=self._watch, daemon=True)
+        watcher.start()
+        try:
+            super().serve_forever(poll_interval)
+        finally:
+            self._stopped.set()
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
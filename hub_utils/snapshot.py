@@ -0,0 +1,135 @@
+import gzip
+import io
+import json
+import os
+import tarfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from hub_utils.s3 import decode_body, parse_extract_name
+
+SNAPSHOT_KEY = "snapshots/latest.tar.gz"
+MANIFEST_NAME = "manifest.json"
+FORMATS = ("tar.gz", "jsonl.gz")
+
+
+def snapshot_format(key):
+    for fmt in FORMATS:
+        if key.endswith(f".{fmt}"):
+            return fmt
+    raise ValueError(f"Unknown snapshot format for {key}, use .tar.gz or .jsonl.gz")
+
+
+def manifest_entry(suffix, key):
+    hash_id, date, _ = parse_extract_name(key)
+    return {"suffix": suffix, "key": key, "hash": hash_id, "date": date}
+
+
+def collect_latest(s3, bucket, suffixes, workers=8):
+    """
+    Read the latest extract of every suffix concurrently. Returns
+    `(manifest_entry, body)` pairs sorted by suffix, suffixes without an
+    extract are left out.
+    """
+
+    def fetch(suffix):
+        key, body = s3.read_latest(bucket, f"{suffix}/")
+        if key is None:
+            print(f"Skipping {suffix} as it has no extract in S3")
+            return None
+        return manifest_entry(suffix, key), body
+
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        extracts = [extract for extract in pool.map(fetch, suffixes) if extract]
+    return sorted(extracts, key=lambda extract: extract[0]["suffix"])
+
+
+def _manifest(extracts, fmt):
+    return {
+        "created": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "format": fmt,
+        "extracts": [entry for entry, _ in extracts],
+    }
+
+
+def _add_member(tar, name, data):
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    tar.addfile(info, io.BytesIO(data))
+
+
+def _pack_tar(extracts, manifest):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as tar:
+        _add_member(tar, MANIFEST_NAME, json.dumps(manifest, indent=2).encode())
+        for entry, body in extracts:
+            _add_member(tar, f"{entry['suffix']}.json", body)
+    return buffer.getvalue()
+
+
+def _pack_jsonl(extracts, manifest):
+    # The manifest is the first line, then one extract per line
+    lines = [json.dumps({"manifest": manifest})]
+    lines.extend(
+        json.dumps({"suffix": entry["suffix"], "extract": json.loads(body)})
+        for entry, body in extracts
+    )
+    return gzip.compress("\n".join(lines).encode("utf-8") + b"\n", mtime=0)
+
+
+def pack_snapshot(extracts, fmt):
+    """
+    Bundle the extracts and their manifest into one gzipped archive, a tarball
+    with a `<suffix>.json` member per extract or JSON lines.
+    """
+    manifest = _manifest(extracts, fmt)
+    if fmt == "tar.gz":
+        return _pack_tar(extracts, manifest)
+    return _pack_jsonl(extracts, manifest)
+
+
+def unpack_snapshot(data, fmt):
+    """
+    Return the manifest and `{suffix: extract_bytes}` of a snapshot, which may
+    already have been decompressed.
+    """
+    if fmt == "tar.gz":
+        extracts = {}
+        manifest = None
+        with tarfile.open(fileobj=io.BytesIO(data), mode="r:*") as tar:
+            for member in tar.getmembers():
+                content = tar.extractfile(member).read()
+                if member.name == MANIFEST_NAME:
+                    manifest = json.loads(content)
+                else:
+                    extracts[member.name[: -len(".json")]] = content
+        return manifest, extracts
+    lines = decode_body(data).decode("utf-8").splitlines()
+    manifest = json.loads(lines[0])["manifest"]
+    extracts = {}
+    for line in lines[1:]:
+        row = json.loads(line)
+        extracts[row["suffix"]] = json.dumps(row["extract"]).encode("utf-8")
+    return manifest, extracts
+
+
+def write_snapshot(data, fmt, local_path, suffixes=None):
+    """
+    Write `<local_path>/<suffix>.json` for every extract in the snapshot, or
+    only for `suffixes` if given. Returns the number of files written.
+    """
+    _, extracts = unpack_snapshot(data, fmt)
+    if suffixes is None:
+        suffixes = extracts.keys()
+    written = 0
+    for suffix in suffixes:
+        if suffix not in extracts:
+            print(f"Skipping {suffix} as it's not in the snapshot")
+            continue
+        local_file_path = f"{local_path}/{suffix}.json"
+        Path(os.path.dirname(local_file_path)).mkdir(parents=True, exist_ok=True)
+        with open(local_file_path, "wb") as f:
+            f.write(extracts[suffix])
+        written += 1
+    return written
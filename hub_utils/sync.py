@@ -0,0 +1,187 @@
+import json
+import queue
+import threading
+import traceback
+from functools import partial
+
+from ruamel.yaml import YAML
+
+from hub_utils.meltano_util import MeltanoUtil
+from hub_utils.utilities import Utilities
+from hub_utils.yaml_lint import find_all_yamls, fix_yaml, run_yamllint
+
+_DONE = object()
+
+
+class _Stage:
+    """
+    Runs `func` over the items of `inbox` on `workers` threads and puts the
+    results on `outbox`. The end marker is passed on once every worker has
+    seen it, so each stage drains completely before the next one stops.
+    Items that already have a `status` skip `func` and are passed on as is.
+    """
+
+    def __init__(self, name, func, inbox, outbox, workers=1):
+        self.func = func
+        self.inbox = inbox
+        self.outbox = outbox
+        self._running = workers
+        self._lock = threading.Lock()
+        self._threads = [
+            threading.Thread(target=self._work, name=f"{name}-{i}", daemon=True)
+            for i in range(workers)
+        ]
+
+    def start(self):
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def _work(self):
+        while True:
+            item = self.inbox.get()
+            if item is _DONE:
+                # Leave the marker for the other workers of this stage
+                self.inbox.put(_DONE)
+                break
+            if not item.get("status"):
+                _guard(self.func, item)
+            self.outbox.put(item)
+        with self._lock:
+            self._running -= 1
+            last = self._running == 0
+        if last:
+            self.outbox.put(_DONE)
+
+
+def _guard(func, item):
+    try:
+        func(item)
+    except Exception as e:
+        print(f"Error syncing {item['suffix']}: {e}")
+        traceback.print_exc()
+        item["status"] = "failed"
+        item["error"] = repr(e)
+
+
+def _is_sdk_definition(yaml_file, data):
+    # Same filter as `get-variant-names --metadata-type sdk`
+    return bool(Utilities.select_variant_names([(yaml_file, data)], None, "sdk"))
+
+
+def discover(util, yaml_files=None, ignore_list=()):
+    """
+    Yield a pipeline item per SDK definition, reading each definition once with
+    the round trip loader so it can be merged and written back as is. Defaults
+    to every definition in the hub.
+    """
+    # A loader of its own, YAML instances aren't safe to share across threads
+    loader = YAML()
+    if yaml_files is None:
+        yaml_files = find_all_yamls(f_path=f"{util.hub_root}/_data/meltano/")
+    for yaml_file in yaml_files:
+        suffix = util.get_suffix(yaml_file)
+        if suffix in ignore_list:
+            continue
+        item = {"yaml_file": yaml_file, "suffix": suffix}
+        _guard(partial(_read_definition, loader), item)
+        if item.get("status") or _is_sdk_definition(yaml_file, item["definition"]):
+            yield item
+
+
+def _read_definition(loader, item):
+    with open(item["yaml_file"], "r") as f:
+        item["definition"] = loader.load(f) or {}
+
+
+def _fetch(s3, bucket, item):
+    # The trailing slash keeps e.g. `meltanolabs` from matching `meltanolabs-x`
+    key, body = s3.read_latest(bucket, f"{item['suffix']}/")
+    if key is None:
+        print(f"Skipping {item['suffix']} as it has no extract in S3")
+        item["status"] = "missing"
+        return
+    item["key"] = key
+    item["body"] = body
+
+
+def _parse(item):
+    about = json.loads(item.pop("body"))
+    item["name"] = about.get("name")
+    item["parsed"] = MeltanoUtil._parse_sdk_about_settings(about)
+
+
+def _merge(util, item):
+    suffix = item["suffix"]
+    settings, settings_group_validation, capabilities = item.pop("parsed")
+    item["path"] = util.merge_and_update(
+        item.pop("definition"),
+        item["name"],
+        util.get_plugin_type_from_suffix(suffix),
+        util.get_plugin_variant_from_suffix(suffix),
+        settings,
+        capabilities,
+        settings_group_validation,
+        reformat=False,
+    )
+    item["status"] = "merged"
+
+
+def _produce(items, outbox, errors):
+    try:
+        for item in items:
+            outbox.put(item)
+    except Exception as e:
+        errors.append(e)
+    finally:
+        outbox.put(_DONE)
+
+
+def sync_sdk_metadata(
+    util, s3, bucket, yaml_files=None, ignore_list=(), workers=8, queue_size=16
+):
+    """
+    Merge the latest S3 extract of every SDK definition into the hub in one
+    pass, without intermediate files.
+
+    Discovery, S3 lookup and download, parsing and merging run as pipeline
+    stages connected by queues of at most `queue_size` items, so downloads on
+    `workers` threads overlap with parsing and writing while memory stays
+    bounded. Merged definitions are fixed as they're written and linted in a
+    single yamllint run at the end. Returns a summary with the merged, missing
+    and failed suffixes.
+    """
+    fetch_queue, parse_queue, merge_queue = (
+        queue.Queue(maxsize=queue_size) for _ in range(3)
+    )
+    errors = []
+    threading.Thread(
+        target=_produce,
+        args=(discover(util, yaml_files, ignore_list), fetch_queue, errors),
+        name="sync-discover",
+        daemon=True,
+    ).start()
+    fetch = partial(_fetch, s3, bucket)
+    _Stage("sync-fetch", fetch, fetch_queue, parse_queue, workers).start()
+    _Stage("sync-parse", _parse, parse_queue, merge_queue).start()
+    summary = {"merged": [], "missing": [], "failed": []}
+    written = []
+    # Writes stay on this thread, one definition at a time
+    while True:
+        item = merge_queue.get()
+        if item is _DONE:
+            break
+        if not item.get("status"):
+            _guard(partial(_merge, util), item)
+        if item["status"] == "merged":
+            fix_yaml(item["path"])
+            written.append(item["path"])
+        entry = {"suffix": item["suffix"]}
+        if item.get("error"):
+            entry["error"] = item["error"]
+        summary[item["status"]].append(entry)
+    if written:
+        run_yamllint(written)
+    if errors:
+        raise errors[0]
+    return summary
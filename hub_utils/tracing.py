@@ -0,0 +1,97 @@
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+
+class Tracer:
+    """
+    Collects spans in memory and exports them as Chrome trace-event JSON
+    which can be loaded in Perfetto (https://ui.perfetto.dev) or about:tracing.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._events = []
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self._pid = os.getpid()
+
+    def enable(self):
+        self.enabled = True
+
+    def _now_us(self):
+        return (time.perf_counter() - self._origin) * 1_000_000
+
+    @contextmanager
+    def span(self, name, category="hub_utils", **args):
+        if not self.enabled:
+            yield
+            return
+        start = self._now_us()
+        try:
+            yield
+        except BaseException as e:
+            args["error"] = repr(e)
+            raise
+        finally:
+            event = {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": start,
+                "dur": self._now_us() - start,
+                "pid": self._pid,
+                "tid": threading.get_ident(),
+            }
+            if args:
+                event["args"] = {key: str(value) for key, value in args.items()}
+            with self._lock:
+                self._events.append(event)
+
+    def _thread_name_events(self):
+        thread_names = {t.ident: t.name for t in threading.enumerate()}
+        tids = {event["tid"] for event in self._events}
+        return [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": self._pid,
+                "tid": tid,
+                "args": {"name": thread_names.get(tid, f"thread-{tid}")},
+            }
+            for tid in sorted(tids)
+        ]
+
+    def export(self, path):
+        with self._lock:
+            events = self._thread_name_events() + list(self._events)
+        Path(os.path.dirname(os.path.abspath(path))).mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+TRACER = Tracer()
+
+
+def span(name, category="hub_utils", **args):
+    return TRACER.span(name, category, **args)
+
+
+def traced(category):
+    """
+    Decorator that wraps the function call in a span named after the function.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with TRACER.span(func.__qualname__, category):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -3,14 +3,17 @@ import csv
 import json
 import os
 import shutil
-from collections import OrderedDict
 from enum import Enum
 from pathlib import Path
 
 import typer
 from ruamel.yaml import YAML
 
+from hub_utils import probe
 from hub_utils.meltano_util import MeltanoUtil
+from hub_utils.preinstall import BackgroundInstall
+from hub_utils.registry import Registry
+from hub_utils.tracing import traced
 
 from hub_utils.yaml_lint import (  # isort:skip
     fix_arrays,
@@ -63,24 +66,43 @@ class Utilities:
         self.hub_root = os.getenv("HUB_ROOT_PATH", ".")
         self.default_variants_path = f"{self.hub_root}/_data/default_variants.yml"
         self.maintainers_path = f"{self.hub_root}/_data/maintainers.yml"
+        self._registry = None
 
     def get_variant_names(self, plugin_type, metadata_type, skip=0, limit=10000):
         from hub_utils.yaml_lint import find_all_yamls
 
+        definitions = (
+            (yaml_file, self._read_yaml(yaml_file))
+            for yaml_file in find_all_yamls(f_path=f"{self.hub_root}/_data/meltano/")
+        )
+        return self.select_variant_names(
+            definitions, plugin_type, metadata_type, skip, limit
+        )
+
+    @staticmethod
+    def select_variant_names(
+        definitions, plugin_type, metadata_type, skip=0, limit=10000
+    ):
+        """
+        Apply the `get_variant_names` filters and pagination to an iterable of
+        `(yaml_file, data)` pairs, so an in-memory catalog gives the same
+        answer as a scan of the hub.
+        """
         formatted_output = []
-        for yaml_file in find_all_yamls(f_path=f"{self.hub_root}/_data/meltano/"):
+        for yaml_file, data in definitions:
             # Pagination mechanism
             if len(formatted_output) == skip:
                 # Clear list and continue iterating
                 formatted_output = []
             if len(formatted_output) == limit:
                 break
-            data = self._read_yaml(yaml_file)
             if plugin_type and yaml_file.split("/")[-3] not in plugin_type.split(","):
                 continue
 
             if metadata_type == "sdk":
-                if "meltano_sdk" not in data.get("keywords", []) or "airbyte_protocol" in data.get("keywords", []):
+                if "meltano_sdk" not in data.get(
+                    "keywords", []
+                ) or "airbyte_protocol" in data.get("keywords", []):
                     continue
                 suffix = "/".join(yaml_file.split("/")[-3:])
                 formatted_output.append({"plugin-name": suffix})
@@ -112,25 +134,32 @@ class Utilities:
         else:
             return typer.prompt(question, type=type)
 
+    @traced("utilities")
     def _write_yaml(self, path, content, reformat=False):
         with open(path, "w") as f:
             self.yaml.dump(content, f)
             if reformat:
                 self._reformat(path)
 
+    @traced("utilities")
     def _write_dict(self, path, content):
         Path(os.path.dirname(path)).mkdir(parents=True, exist_ok=True)
         with open(path, "w") as f:
             json.dump(content, f)
 
+    @traced("utilities")
     def _read_yaml(self, path):
         with open(path, "r") as f:
             data = self.yaml.load(f)
         return data
 
+    @traced("utilities")
     def _read_json(self, path):
-        with open(path, "r") as f:
-            data = json.load(f)
+        from hub_utils.s3 import decode_body
+
+        # Extracts copied from S3 as is may still be gzip encoded
+        with open(path, "rb") as f:
+            data = json.loads(decode_body(f.read()))
         return data
 
     @staticmethod
@@ -158,6 +187,19 @@ class Utilities:
     def get_plugin_variant_from_suffix(suffix: str):
         return suffix.split("/")[2]
 
+    @staticmethod
+    def get_probe_config(data):
+        if "airbyte_protocol" not in data.get("keywords", []):
+            return None
+        image_name = [
+            setting.get("value")
+            for setting in data.get("settings", [])
+            if setting.get("name") == "airbyte_spec.image"
+        ]
+        if not image_name or not image_name[0]:
+            return None
+        return {"airbyte_spec": {"image": image_name[0], "tag": "latest"}}
+
     @staticmethod
     def _boilerplate_capabilities(plugin_type):
         if plugin_type == "extractors":
@@ -303,50 +345,34 @@ class Utilities:
                 print("Definition: Skipping")
         return str(yaml_path)
 
-    def _update_variant_file(
-        self, plugin_type_defaults, plugin_name, plugin_variant, defaults, plugin_type
-    ):
-        plugin_type_defaults[plugin_name] = plugin_variant
-        defaults[plugin_type] = plugin_type_defaults
-        self._write_yaml(self.default_variants_path, defaults)
-        print("Default: Updated")
+    @property
+    def registry(self):
+        if self._registry is None:
+            self._registry = Registry(self.default_variants_path, self.maintainers_path)
+        return self._registry
 
     def _handle_default_variant(self, plugin_name, plugin_variant, plugin_type):
-        defaults = self._read_yaml(self.default_variants_path)
-        plugin_type_defaults = defaults[plugin_type]
-        if plugin_name not in plugin_type_defaults:
-            self._update_variant_file(
-                plugin_type_defaults, plugin_name, plugin_variant, defaults, plugin_type
-            )
+        current_default = self.registry.default_variant(plugin_type, plugin_name)
+        if current_default is None:
+            self.registry.set_default_variant(plugin_type, plugin_name, plugin_variant)
+            print("Default: Updated")
         else:
-            current_default = plugin_type_defaults[plugin_name]
             overwrite = self._prompt(
                 f"Default variant already exists [{current_default}], overwrite it?",
                 default_val=False,
                 type=bool,
             )
             if overwrite:
-                self._update_variant_file(
-                    plugin_type_defaults,
-                    plugin_name,
-                    plugin_variant,
-                    defaults,
-                    plugin_type,
+                self.registry.set_default_variant(
+                    plugin_type, plugin_name, plugin_variant, overwrite=True
                 )
+                print("Default: Updated")
             return True
 
     def _handle_maintainer(self, plugin_variant, repo_url):
-        updated_maintainers = self._read_yaml(self.maintainers_path)
-        if plugin_variant not in updated_maintainers:
-            maintainer_name = plugin_variant
-            updated_maintainers[plugin_variant] = {
-                "label": maintainer_name,
-                "url": "/".join(repo_url.split("/")[:-1]),
-                "name": maintainer_name,
-            }
+        if not self.registry.has_maintainer(plugin_variant):
+            self.registry.add_maintainer(plugin_variant, repo_url)
             print("Maintainer: Updated")
-            updated_maintainers = dict(OrderedDict(sorted(updated_maintainers.items())))
-            self._write_yaml(self.maintainers_path, updated_maintainers)
         else:
             print("Maintainer: Skipping")
 
@@ -375,12 +401,14 @@ class Utilities:
         run_yamllint(file_path)
 
     def _reformat_all(self, plugin_type, plugin_name, variant):
-        for file_path in [
-            "_data/default_variants.yml",
-            "_data/maintainers.yml",
-            f"_data/meltano/{plugin_type}/{plugin_name}/{variant}.yml",
-        ]:
-            self._reformat(f"{self.hub_root}/{file_path}")
+        definition_path = (
+            f"{self.hub_root}/_data/meltano/{plugin_type}/{plugin_name}/{variant}.yml"
+        )
+        fix_yaml(definition_path)
+        # The registry files are already formatted when the registry is flushed
+        run_yamllint(
+            [definition_path, self.default_variants_path, self.maintainers_path]
+        )
 
     @staticmethod
     def _install_test(plugin_name, plugin_type, pip_url, namespace, executable):
@@ -388,15 +416,39 @@ class Utilities:
         MeltanoUtil.help_test(executable)
 
     def add(self, repo_url: str = None, definition_seed: dict = None):
-        plugin_name = self._prompt("plugin name", self._get_plugin_name(repo_url))
-        plugin_type = self._prompt("plugin type", self.get_plugin_type(repo_url))
+        default_name = self._get_plugin_name(repo_url)
+        default_type = self.get_plugin_type(repo_url)
+        run_install = self._prompt("Run install test?", True, type=bool)
+        preinstall = None
+        if run_install:
+            # Install with the default answers while the prompts are being answered
+            preinstall = BackgroundInstall(
+                default_name,
+                default_type,
+                f"git+{repo_url}.git",
+                default_name.replace("-", "_"),
+                default_name,
+            ).start()
+        plugin_name = self._prompt("plugin name", default_name)
+        plugin_type = self._prompt("plugin type", default_type)
         pip_url = self._prompt("pip_url", f"git+{repo_url}.git")
         namespace = self._prompt("namespace", plugin_name.replace("-", "_"))
         executable = self._prompt("executable", plugin_name)
+        if preinstall:
+            preinstall = preinstall.restart_if_changed(
+                plugin_name, plugin_type, pip_url, namespace, executable
+            )
         is_meltano_sdk = self._prompt("is_meltano_sdk", True, type=bool)
         sdk_about_dict = None
         sdk_about_dict = self._test(
-            plugin_name, plugin_type, pip_url, namespace, executable, is_meltano_sdk
+            plugin_name,
+            plugin_type,
+            pip_url,
+            namespace,
+            executable,
+            is_meltano_sdk,
+            preinstall=preinstall,
+            run_install=run_install,
         )
         if sdk_about_dict:
             (
@@ -435,6 +487,7 @@ class Utilities:
         )
         self._handle_maintainer(variant, repo_url)
         self._handle_logo(definition, plugin_type, variant_exists)
+        self.registry.flush()
         self._reformat_all(plugin_type, plugin_name, variant)
         print(definition_path)
         print(f"Adds {plugin_type} {plugin_name} ({variant})\n\n")
@@ -490,6 +543,7 @@ class Utilities:
         variant_exists = self._handle_default_variant(plugin_name, variant, plugin_type)
         self._handle_maintainer(variant, repo_url)
         self._handle_logo(definition, plugin_type, variant_exists)
+        self.registry.flush()
         self._reformat_all(plugin_type, plugin_name, variant)
         print(definition_path)
         print(f"Adds {plugin_type} {plugin_name} ({variant})\n\n")
@@ -509,12 +563,15 @@ class Utilities:
         )
         return self._read_yaml(def_path)
 
-    def _write_updated_def(self, plugin_name, plugin_variant, plugin_type, definition):
+    def _write_updated_def(
+        self, plugin_name, plugin_variant, plugin_type, definition, reformat=True
+    ):
         def_path = (
             f"{self.hub_root}/_data/meltano/{plugin_type}/"
             f"{plugin_name}/{plugin_variant}.yml"
         )
-        self._write_yaml(def_path, definition, reformat=True)
+        self._write_yaml(def_path, definition, reformat=reformat)
+        return def_path
 
     def _iterate_existing_settings(self, plugin_name, plugin_variant, plugin_type):
         def_path = (
@@ -566,6 +623,7 @@ class Utilities:
             new_settings.append(setting)
         return settings
 
+    @traced("utilities")
     def _merge_definitions(self, existing_def, settings, keywords, m_status, caps, sgv):
         new_def = existing_def.copy()
         new_def["settings"] = self._merge_settings(
@@ -582,27 +640,60 @@ class Utilities:
         return new_def
 
     def _test_exception(
-        self, plugin_name, plugin_type, pip_url, namespace, executable, is_meltano_sdk
+        self,
+        plugin_name,
+        plugin_type,
+        pip_url,
+        namespace,
+        executable,
+        is_meltano_sdk,
+        preinstall=None,
+        run_install=None,
     ):
-        if self._prompt("Run install test?", True, type=bool):
-            self._install_test(plugin_name, plugin_type, pip_url, namespace, executable)
+        if run_install is None:
+            run_install = self._prompt("Run install test?", True, type=bool)
+        if run_install:
+            if preinstall:
+                preinstall.install_result()
+            else:
+                self._install_test(
+                    plugin_name, plugin_type, pip_url, namespace, executable
+                )
         if is_meltano_sdk:
             if self._prompt("Scrape SDK --about settings?", True, type=bool):
                 try:
+                    if preinstall:
+                        return preinstall.about_result()
                     return MeltanoUtil.sdk_about(executable)
-                except Exception:
+                except Exception as e:
+                    print(probe.describe_error(e))
                     if self._prompt("Scrape failed! Provide as json?", True, type=bool):
                         return json.loads(self._prompt("Provide --about output"))
 
     def _test(
-        self, plugin_name, plugin_type, pip_url, namespace, executable, is_meltano_sdk
+        self,
+        plugin_name,
+        plugin_type,
+        pip_url,
+        namespace,
+        executable,
+        is_meltano_sdk,
+        preinstall=None,
+        run_install=None,
     ):
         try:
             return self._test_exception(
-                plugin_name, plugin_type, pip_url, namespace, executable, is_meltano_sdk
+                plugin_name,
+                plugin_type,
+                pip_url,
+                namespace,
+                executable,
+                is_meltano_sdk,
+                preinstall=preinstall,
+                run_install=run_install,
             )
         except Exception as e:
-            print(e)
+            print(probe.describe_error(e))
 
     def _test_airbyte(self, plugin_name, plugin_type, pip_url, namespace, executable):
         try:
@@ -615,11 +706,11 @@ class Utilities:
             try:
                 return MeltanoUtil.sdk_about(executable, config=airbyte_config)
             except Exception as e:
-                print(e)
+                print(probe.describe_error(e))
                 if self._prompt("Scrape failed! Provide as json?", True, type=bool):
                     return json.loads(self._prompt("Provide --about output"))
         except Exception as e:
-            print(e)
+            print(probe.describe_error(e))
 
     def _update_base(self, repo_url, plugin_name, is_meltano_sdk=False):
         if not repo_url:
@@ -707,6 +798,7 @@ class Utilities:
             f"\nUpdates {plugin_type} {plugin_name} (SDK based - {plugin_variant})\n\n"
         )
 
+    @traced("utilities")
     def merge_and_update(
         self,
         existing_def,
@@ -716,7 +808,12 @@ class Utilities:
         new_settings,
         new_capabilities,
         new_settings_group_validation,
+        reformat=True,
     ):
+        """
+        Merge the new settings into the existing definition and write it. With
+        `reformat=False` the caller fixes and lints the returned path.
+        """
         merged_def = self._merge_definitions(
             existing_def,
             new_settings,
@@ -726,8 +823,8 @@ class Utilities:
             new_settings_group_validation,
         )
         merged_def_formatted = fix_arrays(fix_yaml_dict_format(merged_def))
-        self._write_updated_def(
-            plugin_name, plugin_variant, plugin_type, merged_def_formatted
+        return self._write_updated_def(
+            plugin_name, plugin_variant, plugin_type, merged_def_formatted, reformat
         )
 
     @staticmethod
@@ -0,0 +1,45 @@
+import json
+import sys
+
+# Keys holding the variant path when a line is a JSON object, e.g. the
+# `get-variant-names --ndjson` output
+_PATH_KEYS = ("plugin-name", "path", "suffix")
+
+
+def _parse_line(line):
+    line = line.strip()
+    if not line:
+        return []
+    if line[0] in '{"':
+        value = json.loads(line)
+        if isinstance(value, dict):
+            value = next((value[key] for key in _PATH_KEYS if key in value), None)
+            if value is None:
+                raise ValueError(f"No variant path in line: {line}")
+        return [value]
+    return [item for item in line.split(",") if item]
+
+
+def _iter_lines(lines):
+    for line in lines:
+        yield from _parse_line(line)
+
+
+def iter_variant_paths(value, stdin=None):
+    """
+    Yield the variant paths given to a command as a comma separated list,
+    `@path` to read them from a file or `-` to read them from stdin.
+
+    Files and stdin are streamed line by line. Each line is a path, a comma
+    separated list of paths, a JSON string or a JSON object with a
+    `plugin-name`, `path` or `suffix` key (NDJSON).
+    """
+    if not value:
+        return
+    if value == "-":
+        yield from _iter_lines(stdin or sys.stdin)
+    elif value.startswith("@"):
+        with open(value[1:], "r") as f:
+            yield from _iter_lines(f)
+    else:
+        yield from (item for item in value.split(",") if item)
@@ -0,0 +1,190 @@
+import hashlib
+import os
+import time
+
+from yamllint import linter
+from yamllint.config import YamlLintConfig
+
+from hub_utils.yaml_lint import find_all_yamls, fixed_yaml, yaml
+
+DEFAULT_INTERVAL = 0.2
+DEFAULT_DEBOUNCE = 0.3
+
+
+def _stat_key(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class DefinitionPoller:
+    """
+    Tracks the mtime and size of every yaml file under `root` and reports which
+    ones changed since the last poll.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.stats = self._scan()
+
+    def _scan(self):
+        return {path: _stat_key(path) for path in find_all_yamls(f_path=self.root)}
+
+    def poll(self):
+        """
+        Return `(changed, deleted)` path sets since the previous poll.
+        """
+        current = self._scan()
+        changed = {path for path, key in current.items() if self.stats.get(path) != key}
+        deleted = set(self.stats) - set(current)
+        self.stats = current
+        return changed, deleted
+
+    def acknowledge(self, path):
+        """
+        Record the current state of a path we wrote ourselves so the write
+        isn't reported as a change on the next poll.
+        """
+        key = _stat_key(path)
+        if key is None:
+            self.stats.pop(path, None)
+        else:
+            self.stats[path] = key
+
+
+def load_lint_config(config_path=".yamllint.yaml"):
+    if config_path and os.path.exists(config_path):
+        return YamlLintConfig(file=config_path)
+    return YamlLintConfig("extends: default")
+
+
+def lint_file(path, config):
+    """
+    Lint one file in process, returning yamllint problems formatted like its
+    `parsable` output.
+    """
+    with open(path, "r") as f:
+        content = f.read()
+    return [
+        f"{path}:{p.line}:{p.column}: [{p.level}] {p.message}"
+        for p in linter.run(content, config, path)
+    ]
+
+
+class Watcher:
+    """
+    Re-formats and lints definitions as they're edited.
+
+    The poller, the lint config and a content hash per file stay in memory
+    between edits, so each batch of changes only costs the fix and lint of the
+    changed files. Files whose content didn't change (e.g. only touched) are
+    skipped and our own writes are ignored.
+    """
+
+    def __init__(
+        self,
+        root,
+        config_path=".yamllint.yaml",
+        interval=DEFAULT_INTERVAL,
+        debounce=DEFAULT_DEBOUNCE,
+        fix=True,
+    ):
+        self.poller = DefinitionPoller(root)
+        self.config = load_lint_config(config_path)
+        self.interval = interval
+        self.debounce = debounce
+        self.fix = fix
+        self._hashes = {}
+        self._pending = set()
+        self._last_change = None
+
+    def _content_hash(self, path):
+        with open(path, "rb") as f:
+            return hashlib.md5(f.read()).hexdigest()
+
+    def _fix(self, path):
+        """
+        Re-format a definition in place. The fixed content is built in memory
+        and swapped in atomically, and a file that doesn't parse to a mapping,
+        e.g. a save with a missing colon, is left untouched.
+        """
+        with open(path, "r") as f:
+            data = yaml.load(f)
+        if not isinstance(data, dict):
+            raise ValueError("not a YAML mapping, left as is")
+        content = fixed_yaml(path, data)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+        self.poller.acknowledge(path)
+
+    def process(self, path):
+        """
+        Fix and lint a single file, returning its lint problems or None if the
+        content is unchanged since it was last processed.
+        """
+        if not os.path.exists(path):
+            return None
+        content_hash = self._content_hash(path)
+        if self._hashes.get(path) == content_hash:
+            return None
+        problems = []
+        if self.fix:
+            try:
+                self._fix(path)
+            except Exception as e:
+                problems.append(f"{path}: fix failed: {e}")
+        problems.extend(lint_file(path, self.config))
+        self._hashes[path] = self._content_hash(path)
+        return problems
+
+    def tick(self, now=None):
+        """
+        Poll once and process the pending files once no change has been seen
+        for `debounce` seconds. Returns `{path: problems}` for the files
+        processed.
+        """
+        now = time.monotonic() if now is None else now
+        changed, deleted = self.poller.poll()
+        for path in deleted:
+            self._hashes.pop(path, None)
+        self._pending -= deleted
+        if changed:
+            self._pending |= changed
+            self._last_change = now
+        if not self._pending or now - self._last_change < self.debounce:
+            return {}
+        results = {}
+        for path in sorted(self._pending):
+            problems = self.process(path)
+            if problems is not None:
+                results[path] = problems
+        self._pending.clear()
+        return results
+
+    def run(self, on_results=None):
+        """
+        Poll until interrupted, passing each batch of results to `on_results`.
+        """
+        on_results = on_results or print_results
+        try:
+            while True:
+                start = time.monotonic()
+                results = self.tick(start)
+                if results:
+                    on_results(results, time.monotonic() - start)
+                time.sleep(self.interval)
+        except KeyboardInterrupt:
+            pass
+
+
+def print_results(results, elapsed):
+    for path, problems in results.items():
+        for problem in problems:
+            print(problem)
+        if not problems:
+            print(f"OK: {path}")
+    print(f"Checked {len(results)} file(s) in {elapsed * 1000:.0f}ms")
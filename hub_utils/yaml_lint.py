@@ -1,5 +1,6 @@
 import collections
 import copy
+import io
 import os
 import subprocess
 import sys
@@ -73,6 +74,23 @@ def fix_arrays(yml_dict):
     return new_dict
 
 
+def fixed_yaml(yml_path, plugin_data):
+    """
+    Returns the fixed contents of a yaml file as a string, built in memory so
+    a failure can't leave the file half written.
+    """
+    updated_dict = plugin_data
+    if os.path.basename(yml_path) not in (
+        "maintainers.yml",
+        "default_variants.yml",
+    ):
+        updated_dict = fix_arrays(updated_dict)
+    updated_dict = fix_yaml_dict_format(updated_dict)
+    stream = io.StringIO()
+    yaml.dump(updated_dict, stream)
+    return stream.getvalue()
+
+
 def fix_yaml(yml_path):
     """
     Reads in the yaml file and attempts to fix it before
@@ -81,21 +99,20 @@ def fix_yaml(yml_path):
     print(f"Fixing: {yml_path}")
     with open(yml_path, "r") as plugin_file:
         plugin_data = yaml.load(plugin_file)
+    content = fixed_yaml(yml_path, plugin_data)
     with open(yml_path, "w") as plugin_file:
-        updated_dict = plugin_data
-        if os.path.basename(yml_path) not in (
-            "maintainers.yml",
-            "default_variants.yml",
-        ):
-            updated_dict = fix_arrays(updated_dict)
-        updated_dict = fix_yaml_dict_format(updated_dict)
-        yaml.dump(updated_dict, plugin_file)
+        plugin_file.write(content)
 
 
 def run_yamllint(path, error_if_fail=False):
-    print(f"Linting: {path}")
+    """
+    Lint a yaml path, or a list of paths in a single yamllint run.
+    """
+    paths = path if isinstance(path, list) else [path]
+    print(f"Linting: {' '.join(paths)}")
     subprocess.run(
-        f"pipx run yamllint {path} -c .yamllint.yaml".split(" "), check=error_if_fail
+        ["pipx", "run", "yamllint", *paths, "-c", ".yamllint.yaml"],
+        check=error_if_fail,
     )
 
 
@@ -0,0 +1,219 @@
+import copy
+import glob
+import json
+import os
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import List
+
+import typer
+
+from hub_utils.meltano_util import MeltanoUtil, _clean_description_text
+
+PATH = os.path.dirname(__file__)
+DEFAULT_CORPUS_DIRS = [
+    f"{PATH}/data",
+    f"{PATH}/data/benchmark",
+]
+DEFAULT_SNAPSHOT_DIR = f"{PATH}/data/benchmark/snapshots"
+
+
+def load_corpus(corpus_dirs=None):
+    """
+    Return `{name: about_dict}` for every `--about` JSON output in the corpus
+    directories.
+    """
+    corpus = {}
+    for corpus_dir in corpus_dirs or DEFAULT_CORPUS_DIRS:
+        for path in sorted(glob.glob(f"{corpus_dir}/*.json")):
+            with open(path, "r") as f:
+                data = json.load(f)
+            if isinstance(data, dict) and isinstance(data.get("settings"), dict):
+                corpus[Path(path).stem] = data
+    return corpus
+
+
+def _raw_fields(about):
+    return MeltanoUtil._traverse_schema_properties(about["settings"])
+
+
+def _workloads(corpus):
+    """
+    Build the per-function inputs from the corpus. Each workload is a
+    `(setting_count, callable)` pair that processes the whole corpus once.
+    """
+    abouts = list(corpus.values())
+    fields = [field for about in abouts for field in _raw_fields(about)]
+    descriptions = [f["description"] for f in fields if f["description"]]
+    names = [f["name"] for f in fields]
+    kinds = [
+        (MeltanoUtil._get_kind_from_type(f["type"], f["name"], False), f)
+        for f in fields
+    ]
+    pre_dedup = [
+        [{"name": f["name"], "description": f["description"] or ""} for f in fields]
+        for fields in (_raw_fields(about) for about in abouts)
+    ]
+
+    def clean_uncached():
+        _clean_description_text.cache_clear()
+        for description in descriptions:
+            MeltanoUtil._clean_description(description)
+
+    def clean_cached():
+        for description in descriptions:
+            MeltanoUtil._clean_description(description)
+
+    return {
+        "_parse_sdk_about_settings": (
+            len(fields),
+            lambda: [MeltanoUtil._parse_sdk_about_settings(about) for about in abouts],
+        ),
+        "_clean_description (cold)": (len(descriptions), clean_uncached),
+        "_clean_description (warm)": (len(descriptions), clean_cached),
+        "_parse_kind": (
+            len(kinds),
+            lambda: [MeltanoUtil._parse_kind(kind, field) for kind, field in kinds],
+        ),
+        "_get_label": (
+            len(names),
+            lambda: [MeltanoUtil._get_label(name) for name in names],
+        ),
+        "_dedup_settings": (
+            len(fields),
+            lambda: [
+                MeltanoUtil._dedup_settings(copy.deepcopy(settings))
+                for settings in pre_dedup
+            ],
+        ),
+    }
+
+
+def _measure(func, min_time):
+    iterations = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_time or iterations < 3:
+        func()
+        iterations += 1
+        elapsed = time.perf_counter() - start
+    return iterations, elapsed
+
+
+def _allocations(func):
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        func()
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    return {
+        "allocated_bytes": sum(s.size_diff for s in stats if s.size_diff > 0),
+        "allocations": sum(s.count_diff for s in stats if s.count_diff > 0),
+        "peak_bytes": peak,
+    }
+
+
+def run_benchmarks(corpus, min_time=0.5):
+    results = []
+    for name, (setting_count, func) in _workloads(corpus).items():
+        # Silence the "No type found" notices printed while parsing
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            func()
+            iterations, elapsed = _measure(func, min_time)
+        result = {
+            "function": name,
+            "settings_per_run": setting_count,
+            "settings_per_sec": round(setting_count * iterations / elapsed),
+            "usec_per_setting": round(elapsed / iterations / setting_count * 1e6, 2),
+        }
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            result.update(_allocations(func))
+        results.append(result)
+    return results
+
+
+def snapshot(about):
+    """
+    Output of the benchmarked functions for one extract, used to prove that
+    optimizations don't change results.
+    """
+    settings, settings_group_validation, capabilities = (
+        MeltanoUtil._parse_sdk_about_settings(copy.deepcopy(about))
+    )
+    fields = _raw_fields(about)
+    return {
+        "settings": settings,
+        "settings_group_validation": [sorted(settings_group_validation[0])],
+        "capabilities": capabilities,
+        "clean_description": {
+            f["description"]: MeltanoUtil._clean_description(f["description"])
+            for f in fields
+            if isinstance(f["description"], str) and f["description"]
+        },
+        "labels": {f["name"]: MeltanoUtil._get_label(f["name"]) for f in fields},
+    }
+
+
+def write_snapshots(corpus, snapshot_dir=DEFAULT_SNAPSHOT_DIR):
+    Path(snapshot_dir).mkdir(parents=True, exist_ok=True)
+    for name, about in corpus.items():
+        with open(f"{snapshot_dir}/{name}.json", "w") as f:
+            json.dump(snapshot(about), f, indent=2, sort_keys=True)
+            f.write("\n")
+
+
+def check_snapshots(corpus, snapshot_dir=DEFAULT_SNAPSHOT_DIR):
+    """
+    Return the names of corpus entries whose output differs from the snapshot.
+    """
+    mismatches = []
+    for name, about in corpus.items():
+        with open(f"{snapshot_dir}/{name}.json", "r") as f:
+            expected = json.load(f)
+        if json.loads(json.dumps(snapshot(about), sort_keys=True)) != expected:
+            mismatches.append(name)
+    return mismatches
+
+
+def main(
+    corpus_dirs: List[str] = typer.Argument(None),
+    min_time: float = 0.5,
+    output_path: str = None,
+    update_snapshots: bool = typer.Option(False),
+):
+    """
+    Benchmark the MeltanoUtil parsing functions over a corpus of `--about`
+    outputs, reporting settings/sec and tracemalloc allocations per function.
+    Outputs are checked against the snapshots first so a faster version is only
+    reported if it's also output-identical.
+    """
+    corpus = load_corpus(corpus_dirs)
+    if update_snapshots:
+        write_snapshots(corpus)
+    mismatches = check_snapshots(corpus)
+    if mismatches:
+        print(f"Snapshot mismatch: {', '.join(mismatches)}")
+        raise typer.Exit(code=1)
+    results = run_benchmarks(corpus, min_time)
+    print(f"{'function':<30}{'settings/sec':>14}{'us/setting':>12}{'alloc KB':>10}")
+    for result in results:
+        print(
+            f"{result['function']:<30}{result['settings_per_sec']:>14}"
+            f"{result['usec_per_setting']:>12}"
+            f"{result['allocated_bytes'] / 1024:>10.1f}"
+        )
+    if output_path:
+        with open(output_path, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    # Run with `poetry run python -m tests.benchmark`, pass `--update-snapshots`
+    # after an intentional output change.
+    typer.run(main)
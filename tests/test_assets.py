@@ -0,0 +1,84 @@
+import os
+import shutil
+
+import pytest
+
+from hub_utils.assets import audit_logos, format_report
+
+DATA_PATH = f"{os.path.dirname(__file__)}/_data"
+
+
+@pytest.fixture
+def hub_root(tmp_path):
+    shutil.copytree(DATA_PATH, tmp_path / "_data")
+    logos = tmp_path / "static/assets/logos"
+    (logos / "extractors").mkdir(parents=True)
+    (logos / "loaders").mkdir(parents=True)
+    (logos / "extractors/github.png").write_bytes(b"github")
+    (logos / "extractors/hubspot.png").write_bytes(b"hubspot")
+    (logos / "loaders/hubspot.png").write_bytes(b"hubspot")
+    (logos / "loaders/big.png").write_bytes(b"x" * 3 * 1024)
+    return str(tmp_path)
+
+
+def test_audit_logos(hub_root):
+    report = audit_logos(hub_root, max_kb=2, workers=1)
+    assert report["files"] == 4
+    assert report["duplicates"] == [
+        {
+            "hash": report["duplicates"][0]["hash"],
+            "size": 7,
+            "paths": [
+                "static/assets/logos/extractors/hubspot.png",
+                "static/assets/logos/loaders/hubspot.png",
+            ],
+        }
+    ]
+    assert report["wasted_bytes"] == 7
+    assert report["oversized"] == [
+        {"path": "static/assets/logos/loaders/big.png", "size": 3 * 1024}
+    ]
+    assert report["missing"] == []
+    assert sorted(report["unreferenced"]) == [
+        "static/assets/logos/loaders/big.png",
+        "static/assets/logos/loaders/hubspot.png",
+    ]
+    assert format_report(report, max_kb=2)[-1] == (
+        "4 logos, 3KB total, 1 duplicate groups (0KB duplicated), "
+        "1 over budget, 0 missing, 2 unreferenced"
+    )
+
+
+def test_audit_logos_missing_reference(hub_root):
+    os.remove(f"{hub_root}/static/assets/logos/extractors/github.png")
+    report = audit_logos(hub_root, workers=1)
+    assert report["missing"] == [
+        {
+            "suffix": "extractors/tap-github/meltanolabs",
+            "logo_url": "/assets/logos/extractors/github.png",
+        }
+    ]
+
+
+def test_audit_logos_skips_absolute_urls(hub_root):
+    yaml_file = f"{hub_root}/_data/meltano/extractors/tap-github/meltanolabs.yml"
+    with open(yaml_file) as f:
+        content = f.read()
+    with open(yaml_file, "w") as f:
+        f.write(
+            content.replace(
+                "/assets/logos/extractors/github.png",
+                "https://example.com/logos/github.png",
+            )
+        )
+    report = audit_logos(hub_root, workers=1)
+    assert report["missing"] == []
+    assert "static/assets/logos/extractors/github.png" in report["unreferenced"]
+
+
+@pytest.mark.parametrize("root", [".", "./", "{hub_root}/"])
+def test_audit_logos_normalizes_root(hub_root, root, monkeypatch):
+    monkeypatch.chdir(hub_root)
+    report = audit_logos(root.format(hub_root=hub_root), workers=1)
+    assert report["missing"] == []
+    assert "static/assets/logos/extractors/github.png" not in report["unreferenced"]
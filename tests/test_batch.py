@@ -0,0 +1,60 @@
+import json
+
+from hub_utils.batch import Checkpoint, run_batch
+
+
+def _fail_on(bad):
+    def func(item):
+        if item == bad:
+            raise ValueError(f"broken {item}")
+        return f"hash-{item}"
+
+    return func
+
+
+def test_run_batch_continues_after_failure(tmp_path):
+    checkpoint = Checkpoint(str(tmp_path / "journal.jsonl"))
+    summary = run_batch(
+        ["a", "b", "c"], _fail_on("b"), key=lambda i: i, checkpoint=checkpoint
+    )
+    assert summary["succeeded"] == [
+        {"suffix": "a", "hash": "hash-a"},
+        {"suffix": "c", "hash": "hash-c"},
+    ]
+    assert summary["failed"][0]["suffix"] == "b"
+    assert "broken b" in summary["failed"][0]["error"]
+    assert summary["skipped"] == []
+
+
+def test_run_batch_resume(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    run_batch(["a", "b"], _fail_on("b"), key=lambda i: i, checkpoint=Checkpoint(path))
+
+    calls = []
+
+    def func(item):
+        calls.append(item)
+        return f"hash-{item}"
+
+    summary = run_batch(
+        ["a", "b"], func, key=lambda i: i, checkpoint=Checkpoint(path), resume=True
+    )
+    assert calls == ["b"]
+    assert summary["skipped"] == [{"suffix": "a", "hash": "hash-a"}]
+    assert summary["succeeded"] == [{"suffix": "b", "hash": "hash-b"}]
+
+
+def test_checkpoint_ignores_truncated_line_and_later_failure(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    path.write_text(
+        "\n".join(
+            [
+                json.dumps({"suffix": "a", "status": "success", "hash": "1"}),
+                json.dumps({"suffix": "b", "status": "success", "hash": "2"}),
+                json.dumps({"suffix": "b", "status": "failed", "hash": None}),
+                '{"suffix": "c", "sta',
+            ]
+        )
+    )
+    checkpoint = Checkpoint(str(path))
+    assert checkpoint.completed == {"a": "1"}
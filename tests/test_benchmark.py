@@ -0,0 +1,24 @@
+from tests.benchmark import check_snapshots, load_corpus, run_benchmarks
+
+
+def test_corpus_matches_snapshots():
+    corpus = load_corpus()
+    assert "tap_github_about" in corpus
+    assert "airbyte_s3_about" in corpus
+    assert check_snapshots(corpus) == []
+
+
+def test_run_benchmarks_reports_every_function():
+    corpus = load_corpus()
+    results = run_benchmarks({"tap_github_about": corpus["tap_github_about"]}, 0)
+    assert [r["function"] for r in results] == [
+        "_parse_sdk_about_settings",
+        "_clean_description (cold)",
+        "_clean_description (warm)",
+        "_parse_kind",
+        "_get_label",
+        "_dedup_settings",
+    ]
+    for result in results:
+        assert result["settings_per_sec"] > 0
+        assert result["peak_bytes"] >= 0
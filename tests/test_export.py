@@ -0,0 +1,61 @@
+import csv
+import io
+import json
+import os
+
+import pytest
+import typer
+from typer.testing import CliRunner
+
+from hub_utils.export import export_catalog
+from hub_utils.main import app
+
+HUB_ROOT = os.path.dirname(__file__)
+
+
+def test_export_csv_columns():
+    f = io.StringIO()
+    count = export_catalog(
+        HUB_ROOT,
+        f,
+        fmt="csv",
+        columns=["name", "variant", "keywords", "setting_count"],
+        plugin_types=["extractors"],
+        workers=1,
+    )
+    rows = list(csv.DictReader(io.StringIO(f.getvalue())))
+    assert count == len(rows) > 0
+    github = [row for row in rows if row["name"] == "tap-github"][0]
+    assert github["variant"] == "meltanolabs"
+    assert "meltano_sdk" in github["keywords"].split(";")
+    assert int(github["setting_count"]) > 0
+
+
+@pytest.mark.parametrize("fmt", ["json", "jsonl"])
+def test_export_json_formats_match(fmt):
+    f = io.StringIO()
+    export_catalog(HUB_ROOT, f, fmt=fmt, columns=["plugin_type", "name"], workers=2)
+    if fmt == "json":
+        rows = json.loads(f.getvalue())
+    else:
+        rows = [json.loads(line) for line in f.getvalue().splitlines()]
+    assert len(rows) == 3
+    assert {row["plugin_type"] for row in rows} == {"extractors"}
+    assert all(set(row) == {"plugin_type", "name"} for row in rows)
+
+
+def test_export_unknown_column():
+    with pytest.raises(typer.BadParameter, match="Unknown columns: foo"):
+        export_catalog(HUB_ROOT, io.StringIO(), columns=["name", "foo"])
+
+
+def test_export_command_unknown_column(tmp_path, monkeypatch):
+    monkeypatch.setenv("HUB_ROOT_PATH", HUB_ROOT)
+    output_path = tmp_path / "catalog.csv"
+    result = CliRunner().invoke(
+        app, ["export", "--columns", "name,foo", "--output-path", str(output_path)]
+    )
+    assert result.exit_code == 2
+    assert "Unknown columns: foo" in result.output
+    assert "setting_count" in result.output
+    assert not output_path.exists()
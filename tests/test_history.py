@@ -0,0 +1,116 @@
+import json
+import os
+
+import boto3
+import pytest
+from moto import mock_s3
+from typer.testing import CliRunner
+
+from hub_utils.history import ExtractHistory, apply_patch, diff
+from hub_utils.main import app
+from hub_utils.s3 import S3
+
+PREFIX = "extractors/tap-github/meltanolabs"
+
+
+def _about(description, extra=None):
+    settings = {
+        "properties": {
+            "auth_token": {"type": ["string"], "description": description},
+            "repositories": {"type": ["array"], "items": {"type": ["string"]}},
+        }
+    }
+    settings["properties"].update(extra or {})
+    return {
+        "name": "tap-github",
+        "capabilities": ["catalog", "state"],
+        "settings": settings,
+    }
+
+
+@pytest.mark.parametrize(
+    "old, new",
+    [
+        (_about("Token"), _about("GitHub token")),
+        (_about("Token"), _about("Token", {"a/b~c": {"type": ["integer"]}})),
+        ({"capabilities": ["a", "b", "c"]}, {"capabilities": ["b"]}),
+        ({"capabilities": ["a"]}, {"capabilities": ["a", "b", "c"]}),
+        ({"value": 1}, {"value": "1"}),
+        ([1, 2], {"a": 1}),
+    ],
+)
+def test_diff_apply_round_trip(old, new):
+    patch = diff(old, new)
+    assert apply_patch(old, patch) == new
+    assert diff(new, new) == []
+
+
+def _put_version(history, date, data, interval=3):
+    content = json.dumps(data).encode("utf-8")
+    hash_id = f"{len(history.versions)}" * 32
+    return history.write(
+        f"{PREFIX}/{hash_id}--{date}.json", data, content, interval=interval
+    )
+
+
+@mock_s3
+def test_extract_history_keyframes_and_deltas():
+    boto3.resource("s3", region_name="us-east-1").create_bucket(Bucket="mybucket")
+    s3 = S3()
+    versions = [_about(f"Token v{i}") for i in range(4)]
+    keys = []
+    for index, data in enumerate(versions):
+        # A fresh listing per write, like separate extract runs
+        keys.append(
+            _put_version(
+                ExtractHistory(s3, "mybucket", PREFIX), f"2023-03-0{index + 1}", data
+            )
+        )
+
+    assert [key.endswith(".delta.json") for key in keys] == [False, True, True, False]
+    history = ExtractHistory(s3, "mybucket", PREFIX)
+    assert [history.read(key) for key in keys] == versions
+    assert history.read("2023-03-03") == versions[2]
+    assert history.read("latest") == versions[3]
+    assert history.has_hash("1" * 32)
+    with pytest.raises(ValueError):
+        history.find("2023-04-01")
+
+    key, content = s3.read_latest("mybucket", PREFIX)
+    assert key == keys[3]
+    # The newest version being a delta is rebuilt transparently
+    s3.upload_bytes(
+        "mybucket",
+        f"{PREFIX}/{'9' * 32}--2023-03-05.delta.json",
+        json.dumps({"base": keys[3], "patch": diff(versions[3], versions[0])}).encode(
+            "utf-8"
+        ),
+    )
+    key, content = s3.read_latest("mybucket", PREFIX)
+    assert key.endswith("--2023-03-05.delta.json")
+    assert json.loads(content) == versions[0]
+
+
+@mock_s3
+def test_history_command():
+    os.environ["AWS_S3_BUCKET"] = "mybucket"
+    boto3.resource("s3", region_name="us-east-1").create_bucket(Bucket="mybucket")
+    s3 = S3()
+    _put_version(ExtractHistory(s3, "mybucket", PREFIX), "2023-03-01", _about("Token"))
+    _put_version(ExtractHistory(s3, "mybucket", PREFIX), "2023-03-02", _about("New"))
+
+    runner = CliRunner()
+    listing = runner.invoke(app, ["history", PREFIX])
+    assert listing.exit_code == 0
+    assert "keyframe" in listing.output and "delta" in listing.output
+
+    result = runner.invoke(app, ["history", PREFIX, "--diff", "2023-03-01", "latest"])
+    assert json.loads(result.output) == [
+        {
+            "op": "replace",
+            "path": "/settings/properties/auth_token/description",
+            "value": "New",
+        }
+    ]
+    shown = runner.invoke(app, ["history", PREFIX, "--show", "0000"])
+    assert json.loads(shown.output) == _about("Token")
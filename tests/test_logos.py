@@ -0,0 +1,110 @@
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+from hub_utils.logos import LogoResolver, ProbeCache, hotglue_candidates
+
+
+class FakeSession:
+    def __init__(self, existing, head_status=None):
+        self.existing = existing
+        self.head_status = head_status
+        self.heads = []
+        self.gets = []
+        self._lock = threading.Lock()
+
+    def _response(self, url):
+        resp = MagicMock()
+        resp.status_code = 200 if url in self.existing else 404
+        resp.content = self.existing.get(url)
+        resp.__enter__.return_value = resp
+        return resp
+
+    def head(self, url, timeout, allow_redirects):
+        assert timeout
+        with self._lock:
+            self.heads.append(url)
+        if self.head_status:
+            resp = MagicMock()
+            resp.status_code = self.head_status
+            return resp
+        return self._response(url)
+
+    def get(self, url, timeout, stream=False):
+        assert timeout
+        with self._lock:
+            self.gets.append(url)
+        return self._response(url)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ProbeCache(str(tmp_path / "probes.json"))
+
+
+def test_resolve_prefers_first_existing_and_fetches_only_winner(cache):
+    svg, png, jpeg, webp = hotglue_candidates("foo")
+    session = FakeSession({jpeg: b"jpeg", webp: b"webp"})
+    resolver = LogoResolver(session=session, cache=cache)
+    assert resolver.resolve([svg, png, jpeg, webp]) == (jpeg, b"jpeg")
+    assert sorted(session.heads) == sorted([svg, png, jpeg, webp])
+    assert session.gets == [jpeg]
+
+
+def test_results_are_cached_on_disk(cache):
+    urls = hotglue_candidates("foo")
+    LogoResolver(session=FakeSession({urls[1]: b"png"}), cache=cache).resolve(urls)
+
+    session = FakeSession({urls[1]: b"png"})
+    reloaded = ProbeCache(cache.path)
+    assert LogoResolver(session=session, cache=reloaded).resolve(urls) == (
+        urls[1],
+        b"png",
+    )
+    assert session.heads == []
+
+
+def test_negative_results_expire(cache):
+    urls = hotglue_candidates("foo")
+    LogoResolver(session=FakeSession({}), cache=cache).resolve(urls)
+    cache.negative_ttl = -1
+    session = FakeSession({urls[0]: b"svg"})
+    assert LogoResolver(session=session, cache=cache).resolve(urls) == (
+        urls[0],
+        b"svg",
+    )
+
+
+def test_falls_back_to_get_when_head_not_allowed(cache):
+    urls = hotglue_candidates("foo")
+    session = FakeSession({urls[2]: b"jpeg"}, head_status=405)
+    assert LogoResolver(session=session, cache=cache).resolve(urls) == (
+        urls[2],
+        b"jpeg",
+    )
+
+
+def test_network_errors_are_not_cached(cache):
+    urls = hotglue_candidates("foo")
+    session = FakeSession({})
+    session.head = MagicMock(side_effect=requests.ConnectionError("down"))
+    assert LogoResolver(session=session, cache=cache).resolve(urls) is None
+    assert all(cache.get(url) is None for url in urls)
+
+
+def test_download_error_falls_through_to_next_candidate(cache):
+    svg, png, jpeg, webp = hotglue_candidates("foo")
+    session = FakeSession({svg: b"svg", png: b"png"})
+    fake_get = session.get
+
+    def get(url, timeout, stream=False):
+        if url == svg:
+            raise requests.ReadTimeout("slow")
+        return fake_get(url, timeout, stream)
+
+    session.get = get
+    resolver = LogoResolver(session=session, cache=cache)
+    assert resolver.resolve([svg, png, jpeg, webp]) == (png, b"png")
+    assert cache.get(svg) is True
@@ -1,6 +1,11 @@
+import json
 import os
 from unittest.mock import patch, call
-from hub_utils.main import download_metadata, S3
+
+import pytest
+import typer
+
+from hub_utils.main import download_metadata, extract_sdk_metadata_to_s3, S3
 
 
 PATH = os.path.dirname(__file__)
@@ -84,3 +89,196 @@ def test_download_metadata_list(patch):
             f"{local_path}/extractors/tap-cloudwatch/meltanolabs.json"
         )
     ])
+
+
+@patch("hub_utils.main._extract_sdk_metadata")
+def test_extract_sdk_metadata_resume(patch, tmp_path):
+    variant_path_list = ",".join([
+        f"{PATH}/_data/meltano/extractors/tap-github/meltanolabs.yml",
+        f"{PATH}/_data/meltano/extractors/tap-hubspot/meltanolabs.yml",
+    ])
+    checkpoint_path = str(tmp_path / "journal.jsonl")
+    summary_path = str(tmp_path / "summary.json")
+
+    def extract(util, variant, output_dir, install, **kwargs):
+        if "tap-hubspot" in variant["suffix"]:
+            raise Exception("install failed")
+        return "abc"
+
+    patch.side_effect = extract
+    with pytest.raises(typer.Exit):
+        extract_sdk_metadata_to_s3(
+            variant_path_list,
+            str(tmp_path),
+            checkpoint_path=checkpoint_path,
+            summary_path=summary_path,
+        )
+    with open(summary_path) as f:
+        summary = json.load(f)
+    assert summary["succeeded"] == [
+        {"suffix": "extractors/tap-github/meltanolabs", "hash": "abc"}
+    ]
+    assert summary["failed"][0]["suffix"] == "extractors/tap-hubspot/meltanolabs"
+
+    patch.side_effect = None
+    patch.return_value = "def"
+    extract_sdk_metadata_to_s3(
+        variant_path_list,
+        str(tmp_path),
+        checkpoint_path=checkpoint_path,
+        resume=True,
+        summary_path=summary_path,
+    )
+    assert patch.call_count == 3
+    assert patch.call_args[0][1]["suffix"] == "extractors/tap-hubspot/meltanolabs"
+
+
+@patch("hub_utils.main._extract_sdk_metadata", return_value="abc")
+def test_extract_sdk_metadata_unreadable_path_fails_alone(patch, tmp_path):
+    variant_path_list = ",".join([
+        f"{PATH}/_data/meltano/extractors/tap-github/meltanolabs.yml",
+        "/nope/extractors/tap-x/variant.yml",
+    ])
+    checkpoint_path = str(tmp_path / "journal.jsonl")
+    summary_path = str(tmp_path / "summary.json")
+    with pytest.raises(typer.Exit):
+        extract_sdk_metadata_to_s3(
+            variant_path_list,
+            str(tmp_path),
+            checkpoint_path=checkpoint_path,
+            summary_path=summary_path,
+        )
+    patch.assert_called_once()
+    with open(summary_path) as f:
+        summary = json.load(f)
+    assert summary["succeeded"] == [
+        {"suffix": "extractors/tap-github/meltanolabs", "hash": "abc"}
+    ]
+    assert summary["failed"][0]["suffix"] == "extractors/tap-x/variant"
+    assert "FileNotFoundError" in summary["failed"][0]["error"]
+    with open(checkpoint_path) as f:
+        statuses = {
+            entry["suffix"]: entry["status"] for entry in map(json.loads, f)
+        }
+    assert statuses["extractors/tap-x/variant"] == "failed"
+
+
+def _write_airbyte_def(root, name, image):
+    path = root / "extractors" / name / "airbyte.yml"
+    path.parent.mkdir(parents=True)
+    path.write_text(
+        f"name: {name}\n"
+        "namespace: tap_airbyte\n"
+        "executable: tap-airbyte\n"
+        "keywords:\n- airbyte_protocol\n"
+        "pip_url: git+https://github.com/meltanolabs/tap-airbyte-wrapper.git\n"
+        "repo: https://github.com/meltanolabs/tap-airbyte-wrapper\n"
+        "settings:\n"
+        f"- name: airbyte_spec.image\n  value: {image}\n"
+    )
+    return str(path)
+
+
+@patch.object(S3, "__init__", return_value=None)
+@patch.object(S3, "hash_exists", return_value=True)
+@patch("hub_utils.main.MeltanoUtil")
+def test_extract_sdk_metadata_installs_once_per_pip_url(
+    meltano_util, hash_exists, s3_init, tmp_path
+):
+    variant_path_list = ",".join([
+        _write_airbyte_def(tmp_path, "tap-s3", "airbyte/source-s3"),
+        _write_airbyte_def(tmp_path, "tap-pokeapi", "airbyte/source-pokeapi"),
+    ])
+    meltano_util.sdk_about.side_effect = lambda executable, config: config
+    extract_sdk_metadata_to_s3(variant_path_list, str(tmp_path / "output"))
+
+    meltano_util.add.assert_called_once()
+    assert meltano_util.sdk_about.call_count == 2
+    meltano_util.sdk_about.assert_has_calls(
+        [
+            call(
+                "tap-airbyte",
+                config={"airbyte_spec": {"image": "airbyte/source-s3", "tag": "latest"}},
+            ),
+            call(
+                "tap-airbyte",
+                config={
+                    "airbyte_spec": {"image": "airbyte/source-pokeapi", "tag": "latest"}
+                },
+            ),
+        ],
+        any_order=True,
+    )
+
+
+@patch.object(S3, "__init__", return_value=None)
+@patch.object(S3, "hash_exists", return_value=False)
+@patch.object(S3, "upload_bytes")
+@patch("hub_utils.main.MeltanoUtil")
+def test_extract_sdk_metadata_uploads_from_memory(
+    meltano_util, upload_bytes, hash_exists, s3_init, tmp_path
+):
+    os.environ["AWS_S3_BUCKET"] = "TEST_BUCKET"
+    yaml_file = _write_airbyte_def(tmp_path / "hub", "tap-s3", "airbyte/source-s3")
+    meltano_util.sdk_about.return_value = {"name": "tap-s3"}
+    extract_sdk_metadata_to_s3(yaml_file, None, compress=False)
+
+    bucket, key, content = upload_bytes.call_args[0]
+    assert bucket == "TEST_BUCKET"
+    assert key.startswith("extractors/tap-s3/airbyte/")
+    assert content == b'{"name": "tap-s3"}'
+
+    output_dir = tmp_path / "output"
+    extract_sdk_metadata_to_s3(yaml_file, str(output_dir), compress=False)
+    local_files = list(output_dir.glob("extractors/tap-s3/*.json"))
+    assert [f.read_bytes() for f in local_files] == [content]
+
+    extract_sdk_metadata_to_s3(yaml_file, None, compress=True)
+    compressed_key, compact = upload_bytes.call_args[0][1:]
+    # The hash is unaffected by the storage format
+    assert compressed_key.split("--")[0] == key.split("--")[0]
+    assert compact == b'{"name":"tap-s3"}'
+    assert upload_bytes.call_args[1] == {"compress": True}
+
+
+@patch("hub_utils.main.MeltanoUtil")
+def test_extract_sdk_metadata_install_failure_fails_group(meltano_util, tmp_path):
+    variant_path_list = ",".join([
+        _write_airbyte_def(tmp_path, "tap-s3", "airbyte/source-s3"),
+        _write_airbyte_def(tmp_path, "tap-pokeapi", "airbyte/source-pokeapi"),
+    ])
+    summary_path = str(tmp_path / "summary.json")
+    meltano_util.add.side_effect = Exception("pipx failed")
+    with pytest.raises(typer.Exit):
+        extract_sdk_metadata_to_s3(
+            variant_path_list, str(tmp_path / "output"), summary_path=summary_path
+        )
+    meltano_util.add.assert_called_once()
+    meltano_util.sdk_about.assert_not_called()
+    with open(summary_path) as f:
+        assert len(json.load(f)["failed"]) == 2
+
+
+@patch.object(S3, "download_latest")
+def test_download_metadata_from_file(patch, tmp_path):
+    os.environ["AWS_S3_BUCKET"] = "TEST_BUCKET"
+    variants = tmp_path / "variants.ndjson"
+    variants.write_text(
+        '{"plugin-name": "extractors/tap-csv/meltanolabs.yml"}\n'
+        '{"plugin-name": "loaders/target-csv/meltanolabs.yml"}\n'
+    )
+    download_metadata(
+        "out", variant_path_list=f"@{variants}", all_sdk=False, ignore_list_str=""
+    )
+    assert patch.call_args_list == [
+        call(
+            "TEST_BUCKET",
+            "extractors/tap-csv/meltanolabs",
+            "out/extractors/tap-csv/meltanolabs.json",
+        ),
+        call(
+            "TEST_BUCKET",
+            "loaders/target-csv/meltanolabs",
+            "out/loaders/target-csv/meltanolabs.json",
+        ),
+    ]
@@ -0,0 +1,131 @@
+import json
+import os
+import shutil
+import time
+from unittest.mock import patch
+
+import pytest
+from ruamel.yaml import YAML
+
+from hub_utils import manifest
+from hub_utils.meltano_util import MeltanoUtil
+from hub_utils.utilities import Utilities
+
+PATH = os.path.dirname(__file__)
+
+
+@pytest.fixture
+def util(tmp_path):
+    shutil.copytree(f"{PATH}/_data", tmp_path / "_data")
+    (tmp_path / "_data/default_variants.yml").write_text(
+        "extractors:\n  tap-github: meltanolabs\nloaders: {}\n"
+    )
+    (tmp_path / "_data/maintainers.yml").write_text(
+        "meltanolabs:\n  label: Meltano Labs\n  name: meltanolabs\n"
+        "  url: https://github.com/MeltanoLabs\n"
+    )
+    util = Utilities(True)
+    util.hub_root = str(tmp_path)
+    util.default_variants_path = f"{tmp_path}/_data/default_variants.yml"
+    util.maintainers_path = f"{tmp_path}/_data/maintainers.yml"
+    return util
+
+
+def _read(path):
+    with open(path) as f:
+        return YAML(typ="safe").load(f)
+
+
+@patch("hub_utils.manifest.run_yamllint")
+@patch.object(MeltanoUtil, "help_test")
+@patch.object(MeltanoUtil, "add")
+def test_add_from_manifest(add, help_test, run_yamllint, util, tmp_path):
+    with open(f"{PATH}/data/tap_apaleo_about.json") as f:
+        about = json.load(f)
+    manifest_path = tmp_path / "plugins.csv"
+    manifest_path.write_text(
+        "repo_url,variant,keywords,is_meltano_sdk,quality\n"
+        "https://github.com/someone/tap-apaleo,,,,silver\n"
+        "https://github.com/someone/target-foo,other,api;free,false,\n"
+        "https://github.com/MeltanoLabs/tap-github,,,,\n"
+        "https://github.com/someone/tap-broken,,,,\n"
+    )
+
+    def sdk_about(executable, config=None):
+        if executable == "tap-broken":
+            raise ValueError("no about")
+        return about
+
+    with patch.object(MeltanoUtil, "sdk_about", side_effect=sdk_about):
+        summary = manifest.add_from_manifest(util, str(manifest_path), workers=2)
+
+    assert summary == {
+        "added": [
+            {"suffix": "extractors/tap-apaleo/someone"},
+            {"suffix": "loaders/target-foo/other"},
+        ],
+        "skipped": [{"suffix": "extractors/tap-github/meltanolabs"}],
+        "failed": [
+            {
+                "suffix": "extractors/tap-broken/someone",
+                "error": "ValueError('no about')",
+            }
+        ],
+    }
+    assert sorted(call.args[0] for call in add.call_args_list) == [
+        "tap-apaleo",
+        "tap-broken",
+        "target-foo",
+    ]
+    apaleo = _read(f"{util.hub_root}/_data/meltano/extractors/tap-apaleo/someone.yml")
+    assert apaleo["quality"] == "silver"
+    assert apaleo["keywords"] == ["meltano_sdk"]
+    assert apaleo["settings"]
+    foo = _read(f"{util.hub_root}/_data/meltano/loaders/target-foo/other.yml")
+    assert foo["keywords"] == ["api", "free"]
+    assert foo["settings"] == []
+
+    assert _read(util.default_variants_path) == {
+        "extractors": {"tap-apaleo": "someone", "tap-github": "meltanolabs"},
+        "loaders": {"target-foo": "other"},
+    }
+    assert sorted(_read(util.maintainers_path)) == ["meltanolabs", "other", "someone"]
+    # One lint run for every written file
+    run_yamllint.assert_called_once()
+    assert len(run_yamllint.call_args.args[0]) == 4
+
+
+def test_read_manifest_yaml(tmp_path):
+    path = tmp_path / "plugins.yml"
+    path.write_text(
+        "plugins:\n"
+        "- repo_url: https://github.com/someone/tap-foo\n"
+        "  keywords: [api]\n"
+        "- name: missing-url\n"
+    )
+    with pytest.raises(ValueError, match="row 2 has no repo_url"):
+        manifest.read_manifest(str(path))
+
+
+def test_probe_entries_serializes_shared_executables():
+    util = Utilities(True)
+    entries = [
+        manifest.plan_entry(util, {"repo_url": url})
+        for url in (
+            "https://github.com/a/tap-foo",
+            "https://github.com/b/tap-bar",
+            "https://github.com/c/tap-foo",
+        )
+    ]
+    running = set()
+
+    def probe(entry):
+        assert entry["executable"] not in running
+        running.add(entry["executable"])
+        time.sleep(0.05)
+        running.discard(entry["executable"])
+        return entry["suffix"]
+
+    with patch.object(manifest, "_probe", side_effect=probe):
+        results = manifest.probe_entries(entries, workers=3)
+    assert [result[1] for result in results] == [e["suffix"] for e in entries]
@@ -564,3 +564,126 @@ def test_sdk_about_parsing_faker_configs():
             "kind": "array"
         }
     ]
+
+
+def test_sdk_about_streaming_capture(tmp_path):
+    about = _read_data('tap_apaleo_about.json')
+    executable = tmp_path / "tap-fake"
+    executable.write_text(
+        "#!/bin/sh\n"
+        "echo 'INFO Loading config'\n"
+        f"cat {os.path.dirname(__file__)}/data/tap_apaleo_about.json\n"
+        "echo\n"
+        "echo 'Setup Instructions:'\n"
+    )
+    executable.chmod(0o755)
+    assert MeltanoUtil.sdk_about(str(executable)) == about
+    assert MeltanoUtil.sdk_about(str(executable), config={"a": 1}) == about
+
+
+def test_clean_description_golden_corpus():
+    corpus = _read_data('description_corpus.json')
+    for raw, expected in corpus:
+        assert MeltanoUtil._clean_description(raw) == expected, raw
+
+
+def test_clean_description_memoized():
+    from hub_utils.meltano_util import _clean_description_text
+
+    description = "config object for stream maps capability.see docs."
+    first = MeltanoUtil._clean_description(description)
+    hits = _clean_description_text.cache_info().hits
+    assert MeltanoUtil._clean_description(description) == first
+    assert _clean_description_text.cache_info().hits == hits + 1
+    assert MeltanoUtil._clean_description(None) is None
+    assert MeltanoUtil._clean_description(["not", "a", "string"]) == ""
+
+
+def test_traverse_schema_resolves_refs():
+    schema = {
+        "definitions": {
+            "auth": {
+                "type": "object",
+                "properties": {
+                    "username": {"type": "string", "description": "the user"},
+                    "password": {"$ref": "#/definitions/secret"},
+                },
+                "required": ["username"],
+            },
+            "secret": {"type": "string", "description": "A secret"},
+        },
+        "properties": {
+            "source": {"$ref": "#/definitions/auth"},
+            "target": {"$ref": "#/definitions/auth", "description": "Override"},
+        },
+    }
+    fields = MeltanoUtil._traverse_schema_properties(schema)
+    assert [(f["name"], f["description"], f["required"]) for f in fields] == [
+        ("source.username", "The user", True),
+        ("source.password", "A secret", False),
+        ("target.username", "The user", True),
+        ("target.password", "A secret", False),
+    ]
+
+
+def test_traverse_schema_dedups_identical_one_of_branches():
+    branch = {
+        "title": "Basic",
+        "properties": {"method": {"type": "string", "const": "basic"}},
+    }
+    schema = {
+        "properties": {
+            "auth": {"type": "object", "oneOf": [branch, dict(branch), {
+                "title": "Token",
+                "properties": {"method": {"type": "string", "const": "token"}},
+            }]},
+        },
+    }
+    settings, _, _ = MeltanoUtil._parse_sdk_about_settings({"settings": schema})
+    assert settings == [
+        {
+            "name": "auth.method",
+            "label": "Auth Method",
+            "description": "Basic, Token",
+            "kind": "string",
+        }
+    ]
+
+
+def test_traverse_schema_depth_limit():
+    schema = {"type": "string"}
+    for level in range(2000):
+        schema = {"type": "object", "properties": {f"l{level}": schema}}
+    fields = MeltanoUtil._traverse_schema_properties(schema, max_depth=3)
+    assert [f["name"] for f in fields] == ["l1999.l1998.l1997.l1996"]
+    assert fields[0]["type"] == "object"
+    deep = MeltanoUtil._traverse_schema_properties(schema, max_depth=5000)
+    assert deep[0]["name"].count(".") == 1999
+    # No depth limit by default
+    unlimited = MeltanoUtil._traverse_schema_properties(schema)
+    assert unlimited == deep
+
+
+def test_traverse_schema_recursive_ref():
+    schema = {
+        "definitions": {
+            "node": {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string"},
+                    "child": {"$ref": "#/definitions/node"},
+                },
+            }
+        },
+        "properties": {"tree": {"$ref": "#/definitions/node"}},
+    }
+    fields = MeltanoUtil._traverse_schema_properties(schema, max_depth=2)
+    assert [f["name"] for f in fields] == [
+        "tree.name",
+        "tree.child.name",
+        "tree.child.child",
+    ]
+    # Without a limit the recursion ends at the $ref back to `node`
+    fields = MeltanoUtil._traverse_schema_properties(schema)
+    assert [f["name"] for f in fields] == ["tree.name", "tree.child"]
+    assert fields[1]["type"] == "object"
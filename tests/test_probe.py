@@ -0,0 +1,160 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+from hub_utils import probe
+
+
+def _python(code):
+    return [sys.executable, "-c", code]
+
+
+def test_run_probe_captures_output_and_usage():
+    result = probe.run_probe(
+        _python("import sys; print('out'); print('err', file=sys.stderr)")
+    )
+    assert result.returncode == 0
+    assert result.stdout == "out\n"
+    assert result.stderr == "err\n"
+    assert result.wall_time > 0
+    assert result.max_rss_kb > 0
+    assert not result.timed_out
+    assert result in probe.RESULTS
+
+
+def test_run_probe_stdin_closed():
+    result = probe.run_probe(_python("import sys; print(repr(sys.stdin.read()))"))
+    assert result.stdout == "''\n"
+
+
+def test_run_probe_timeout_kills_group():
+    with pytest.raises(subprocess.TimeoutExpired):
+        probe.run_probe(
+            _python(
+                "import subprocess, sys, time;"
+                "subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)']);"
+                "time.sleep(30)"
+            ),
+            timeout=0.5,
+        )
+    assert probe.RESULTS[-1].timed_out
+    assert probe.RESULTS[-1].wall_time < 10
+
+
+def test_run_probe_check():
+    with pytest.raises(subprocess.CalledProcessError):
+        probe.run_probe(_python("import sys; sys.exit(3)"))
+    result = probe.run_probe(_python("import sys; sys.exit(3)"), check=False)
+    assert result.returncode == 3
+
+
+def test_describe_error_includes_stderr():
+    with pytest.raises(subprocess.CalledProcessError) as excinfo:
+        probe.run_probe(_python("raise RuntimeError('boom')"))
+    message = probe.describe_error(excinfo.value)
+    assert "returned non-zero exit status 1" in message
+    assert "RuntimeError: boom" in message
+    assert probe.describe_error(ValueError("plain")) == "plain"
+
+
+def test_run_probe_memory_limit():
+    result = probe.run_probe(
+        _python("x = bytearray(512 * 1024 * 1024)"), memory_limit_mb=256, check=False
+    )
+    assert result.returncode != 0
+    assert "MemoryError" in result.stderr
+
+
+def test_run_probe_cpu_limit():
+    result = probe.run_probe(_python("while True: pass"), cpu_limit_s=1, check=False)
+    assert result.returncode < 0
+    assert result.cpu_time < 10
+
+
+def test_default_limits(monkeypatch):
+    monkeypatch.setenv("HUB_UTILS_PROBE_TIMEOUT", "5")
+    monkeypatch.setenv("HUB_UTILS_PROBE_MEMORY_MB", "1024")
+    monkeypatch.delenv("HUB_UTILS_PROBE_CPU_SECONDS", raising=False)
+    assert probe.default_limits() == {
+        "timeout": 5.0,
+        "memory_limit_mb": 1024.0,
+        "cpu_limit_s": None,
+    }
+
+
+def test_report_sorted_by_wall_time():
+    results = [
+        probe.ProbeResult(["a"], 0, "", "", 1.0, 0.5, 100),
+        probe.ProbeResult(["b"], 1, "", "", 2.0, 0.5, 200),
+    ]
+    assert [r["command"] for r in probe.report(results)] == ["b", "a"]
+
+
+def _feed_all(reader, data, chunk_size):
+    for i in range(0, len(data), chunk_size):
+        if reader.feed(data[i : i + chunk_size]):
+            return True
+    return False
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 4096])
+def test_json_document_reader_skips_logs_and_trailer(chunk_size):
+    document = {
+        "name": "tap-x",
+        "settings": {"properties": {"a": {"description": 'a "quoted" {brace} \\\\'}}},
+        "capabilities": ["about", "catalog"],
+        "unicode": "café ☃",
+    }
+    data = (
+        b"2024-01-01 INFO starting {not json}\n"
+        + json.dumps(document, indent=2, ensure_ascii=False).encode("utf-8")
+        + b"\nSetup Instructions:\n{ignored}"
+    )
+    reader = probe.JsonDocumentReader()
+    assert _feed_all(reader, data, chunk_size)
+    assert reader.document == document
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 4096])
+def test_json_document_reader_skips_json_log_lines(chunk_size):
+    document = {"name": "tap-x", "settings": {"properties": {}}}
+    data = (
+        b'{"level": "info", "message": "Starting tap-x"}\n'
+        + b"{not json}\n"
+        + json.dumps(document, indent=2).encode("utf-8")
+        + b"\n"
+    )
+    reader = probe.JsonDocumentReader()
+    assert _feed_all(reader, data, chunk_size)
+    assert reader.document == document
+
+
+def test_json_document_reader_incomplete():
+    reader = probe.JsonDocumentReader()
+    assert not _feed_all(reader, b'log line\n{"a": [1, 2', 4)
+    assert reader.document is None
+
+
+def test_json_document_reader_max_bytes():
+    reader = probe.JsonDocumentReader(max_bytes=16)
+    with pytest.raises(probe.ProbeOutputTooLarge):
+        _feed_all(reader, b'{"a": "' + b"x" * 64 + b'"}', 8)
+
+
+def test_run_probe_stops_after_document():
+    result = probe.run_probe(
+        _python(
+            "import json, sys, time;"
+            "print('log line');"
+            "print(json.dumps({'name': 'tap-x', 'settings': {}}), flush=True);"
+            "print('Setup Instructions:', flush=True);"
+            "time.sleep(30)"
+        ),
+        timeout=20,
+        stdout_reader=probe.JsonDocumentReader(),
+    )
+    assert result.stopped_early
+    assert result.document == {"name": "tap-x", "settings": {}}
+    assert result.wall_time < 10
@@ -0,0 +1,107 @@
+import os
+import shutil
+from unittest.mock import patch
+
+import pytest
+from ruamel.yaml import YAML
+
+from hub_utils import quality
+
+DATA_PATH = f"{os.path.dirname(__file__)}/_data"
+
+
+@pytest.fixture
+def hub_root(tmp_path):
+    shutil.copytree(DATA_PATH, tmp_path / "_data")
+    github = tmp_path / "_data/meltano/extractors/tap-github/meltanolabs.yml"
+    github.write_text(github.read_text().replace("quality: gold", "quality: silver"))
+    community = tmp_path / "_data/meltano/loaders/target-foo/someone.yml"
+    community.parent.mkdir(parents=True)
+    community.write_text(
+        "name: target-foo\n"
+        "variant: someone\n"
+        "quality: unknown\n"
+        "repo: https://github.com/someone/target-foo\n"
+        "keywords: []\n"
+    )
+    return str(tmp_path)
+
+
+def test_load_quality_table_projection(hub_root):
+    table = quality.load_quality_table(hub_root, workers=1)
+    assert len(table) == 4
+    github = [e for e in table if e["suffix"] == "extractors/tap-github/meltanolabs"][0]
+    assert set(github) == {
+        "path",
+        "suffix",
+        "plugin_type",
+        "plugin_name",
+        "plugin_variant",
+        *quality.QUALITY_FIELDS,
+    }
+
+
+def test_plan_quality_updates(hub_root):
+    table = quality.load_quality_table(hub_root, workers=1)
+    usage = {"https://github.com/someone/target-foo": 2}
+    changes = quality.plan_quality_updates(table, usage)
+    assert sorted(quality.format_plan(changes)) == [
+        "extractors/tap-github/meltanolabs: silver -> gold",
+        "loaders/target-foo/someone: unknown -> silver",
+    ]
+    changes = quality.plan_quality_updates(
+        table, usage, {"https://github.com/someone/target-foo": "low"}
+    )
+    assert "loaders/target-foo/someone: unknown -> bronze" in quality.format_plan(
+        changes
+    )
+
+
+@patch("hub_utils.quality.run_yamllint")
+def test_apply_quality_updates_lints_once(run_yamllint, hub_root):
+    table = quality.load_quality_table(hub_root, workers=1)
+    changes = quality.plan_quality_updates(table, {})
+    paths = quality.apply_quality_updates(changes, workers=2)
+    run_yamllint.assert_called_once_with(paths)
+    assert paths == [c["path"] for c in changes]
+    for change in changes:
+        with open(change["path"]) as f:
+            assert YAML().load(f)["quality"] == change["new"]
+    assert quality.plan_quality_updates(
+        quality.load_quality_table(hub_root, workers=2), {}
+    ) == []
+
+
+def test_read_usage_metrics_projection(tmp_path):
+    metrics_path = tmp_path / "variant_metrics.yml"
+    metrics_path.write_text(
+        "generated_at: 2024-01-01\n"
+        "metrics:\n"
+        "  https://github.com/MeltanoLabs/tap-github:\n"
+        "    all_projects: 42\n"
+        "    success_projects: 40\n"
+        "    by_month: [{month: 1, count: 3}, {month: 2, count: 5}]\n"
+        "  https://github.com/not/in-hub:\n"
+        "    all_projects: 7\n"
+        "  https://github.com/someone/target-foo:\n"
+        "    by_month: {a: [1, [2, 3]]}\n"
+        "    all_projects: 3\n"
+        "  https://github.com/broken/entry: null\n"
+        "other:\n"
+        "  metrics: ignored\n"
+    )
+    assert quality.read_usage_metrics(str(metrics_path)) == {
+        "https://github.com/MeltanoLabs/tap-github": 42,
+        "https://github.com/not/in-hub": 7,
+        "https://github.com/someone/target-foo": 3,
+    }
+    assert quality.read_usage_metrics(
+        str(metrics_path),
+        repos={
+            "https://github.com/MeltanoLabs/tap-github",
+            "https://github.com/someone/target-foo",
+        },
+    ) == {
+        "https://github.com/MeltanoLabs/tap-github": 42,
+        "https://github.com/someone/target-foo": 3,
+    }
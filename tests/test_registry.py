@@ -0,0 +1,89 @@
+import multiprocessing
+import os
+
+import pytest
+from ruamel.yaml import YAML
+
+from hub_utils.registry import Registry
+
+
+@pytest.fixture
+def paths(tmp_path):
+    defaults = tmp_path / "default_variants.yml"
+    defaults.write_text("extractors:\n  tap-github: meltanolabs\nloaders: {}\n")
+    maintainers = tmp_path / "maintainers.yml"
+    maintainers.write_text(
+        "meltanolabs:\n  label: Meltano Labs\n  name: meltanolabs\n"
+        "  url: https://github.com/MeltanoLabs\n"
+    )
+    return str(defaults), str(maintainers)
+
+
+def _read(path):
+    with open(path) as f:
+        return YAML(typ="safe").load(f)
+
+
+def test_flush_batches_changes(paths):
+    registry = Registry(*paths)
+    registry.set_default_variant("extractors", "tap-foo", "someone")
+    registry.set_default_variant("loaders", "target-foo", "someone")
+    registry.set_default_variant("extractors", "tap-github", "other")
+    registry.add_maintainer("someone", "https://github.com/someone/tap-foo")
+    registry.add_maintainer("meltanolabs", "https://github.com/x/tap-foo")
+    assert registry.default_variant("extractors", "tap-foo") == "someone"
+    assert registry.has_maintainer("someone")
+    # Nothing is written until flushed
+    assert "tap-foo" not in _read(paths[0])["extractors"]
+
+    assert registry.flush() == list(paths)
+    assert _read(paths[0]) == {
+        "extractors": {"tap-foo": "someone", "tap-github": "meltanolabs"},
+        "loaders": {"target-foo": "someone"},
+    }
+    assert _read(paths[1])["someone"] == {
+        "label": "someone",
+        "name": "someone",
+        "url": "https://github.com/someone",
+    }
+    assert _read(paths[1])["meltanolabs"]["label"] == "Meltano Labs"
+    assert not registry.pending
+    assert registry.flush() == []
+
+
+def test_overwrite_default_variant(paths):
+    registry = Registry(*paths)
+    registry.set_default_variant("extractors", "tap-github", "other", overwrite=True)
+    assert registry.flush() == [paths[0]]
+    assert _read(paths[0])["extractors"]["tap-github"] == "other"
+
+
+def test_flush_keeps_concurrent_changes(paths):
+    first = Registry(*paths)
+    second = Registry(*paths)
+    first.set_default_variant("extractors", "tap-a", "someone")
+    second.set_default_variant("extractors", "tap-b", "someone")
+    second.flush()
+    first.flush()
+    assert _read(paths[0])["extractors"] == {
+        "tap-a": "someone",
+        "tap-b": "someone",
+        "tap-github": "meltanolabs",
+    }
+    assert not [
+        name for name in os.listdir(os.path.dirname(paths[0])) if name.endswith(".tmp")
+    ]
+
+
+def _add_maintainers(args):
+    paths, worker = args
+    for index in range(5):
+        registry = Registry(*paths)
+        registry.add_maintainer(f"m{worker}-{index}", "https://github.com/x/tap-x")
+        registry.flush()
+
+
+def test_flush_across_processes(paths):
+    with multiprocessing.get_context("fork").Pool(4) as pool:
+        pool.map(_add_maintainers, [(paths, worker) for worker in range(4)])
+    assert len(_read(paths[1])) == 21
@@ -0,0 +1,76 @@
+import json
+
+import pytest
+
+from hub_utils import responsiveness
+from hub_utils.responsiveness import Responsiveness
+
+
+@pytest.fixture(autouse=True)
+def cache_root(tmp_path, monkeypatch):
+    monkeypatch.setenv("HUB_UTILS_CACHE_DIR", str(tmp_path / "cache"))
+    return tmp_path / "cache"
+
+
+def test_normalize_repo_url():
+    assert (
+        responsiveness.normalize_repo_url(
+            "http://www.GitHub.com/MeltanoLabs/tap-x.git/"
+        )
+        == "https://github.com/meltanolabs/tap-x"
+    )
+
+
+def test_build_index_from_issue_records():
+    records = [
+        {"repo": "https://github.com/a/fast", "response_hours": 2},
+        {"repo": "https://github.com/a/fast", "response_hours": 30},
+        {"repo": "https://github.com/a/fast", "response_hours": None},
+        {"repo": "https://github.com/a/slow", "response_hours": 100},
+        {"repo": "https://github.com/a/slow", "response_hours": 200},
+        {"repo": "https://github.com/a/silent", "response_hours": None},
+        {"repo": "https://github.com/a/silent", "response_hours": ""},
+        {"repo": "https://github.com/a/agg", "median_response_hours": 1000},
+    ]
+    assert responsiveness.build_index(records) == {
+        "https://github.com/a/fast": "high",
+        "https://github.com/a/slow": "medium",
+        "https://github.com/a/silent": "low",
+        "https://github.com/a/agg": "low",
+    }
+
+
+def test_from_csv_export(tmp_path):
+    path = tmp_path / "activity.csv"
+    path.write_text(
+        "repo,response_hours\n"
+        "https://github.com/a/fast,1\n"
+        "https://github.com/a/slow,500\n"
+    )
+    index = Responsiveness.from_export(str(path))
+    assert index.get("https://github.com/a/fast/") == "high"
+    assert index.get("https://github.com/a/slow") == "low"
+    assert index.get("https://github.com/a/unknown") == "high"
+
+
+def test_from_export_uses_cache(tmp_path, cache_root, monkeypatch):
+    path = tmp_path / "activity.json"
+    path.write_text(json.dumps({"https://github.com/a/b": [{"response_hours": 200}]}))
+    assert Responsiveness.from_export(str(path)).for_repos(
+        ["https://github.com/a/b"]
+    ) == {"https://github.com/a/b": "medium"}
+    assert len(list((cache_root / "responsiveness").iterdir())) == 1
+
+    def fail(_):
+        raise AssertionError("export re-read despite cache")
+
+    read_records = responsiveness._read_records
+    monkeypatch.setattr(responsiveness, "_read_records", fail)
+    index = Responsiveness.from_export(str(path))
+    assert index.get("https://github.com/a/b") == "medium"
+
+    # A threshold change isn't served from the old cache entry
+    monkeypatch.setattr(responsiveness, "_read_records", read_records)
+    monkeypatch.setattr(responsiveness, "MEDIUM_MAX_HOURS", 100)
+    index = Responsiveness.from_export(str(path))
+    assert index.get("https://github.com/a/b") == "low"
@@ -1,3 +1,5 @@
+import gzip
+import io
 import os
 
 import boto3
@@ -49,3 +51,53 @@ def test_s3_hash_exists():
         "mybucket",
         "extractors/tap-csv/meltanolabs/something_else--2023-03-23.json",
     )
+
+
+@mock_s3
+def test_s3_upload_bytes():
+    conn = boto3.resource("s3", region_name="us-east-1")
+    conn.create_bucket(Bucket="mybucket")
+    s3_obj = S3()
+    s3_obj.upload_bytes("mybucket", "plain.json", b'{"foo": "bar"}')
+    s3_obj.upload_bytes(
+        "mybucket", "compressed.json", io.BytesIO(b'{"foo": "bar"}'), compress=True
+    )
+
+    plain = conn.Object("mybucket", "plain.json").get()
+    assert plain["ContentType"] == "application/json"
+    assert plain.get("ContentEncoding") != "gzip"
+    assert plain["Body"].read() == b'{"foo": "bar"}'
+    compressed = conn.Object("mybucket", "compressed.json").get()
+    # moto keeps botocore's `aws-chunked` transfer encoding, S3 strips it
+    assert compressed["ContentEncoding"].split(",")[0] == "gzip"
+    assert gzip.decompress(compressed["Body"].read()) == b'{"foo": "bar"}'
+
+
+@mock_s3
+def test_s3_read_latest_compressed(local_cleanup):
+    conn = boto3.resource("s3", region_name="us-east-1")
+    conn.create_bucket(Bucket="mybucket")
+    s3_obj = S3()
+    # An older uncompressed extract next to a newer compressed one
+    s3_obj.upload_bytes(
+        "mybucket",
+        "extractors/tap-csv/meltanolabs/aaa--2023-03-01.json",
+        b'{"v": 1}',
+    )
+    s3_obj.upload_bytes(
+        "mybucket",
+        "extractors/tap-csv/meltanolabs/bbb--2023-03-23.json",
+        b'{"v":2}',
+        compress=True,
+    )
+    assert s3_obj.read_latest("mybucket", "extractors/tap-csv/meltanolabs") == (
+        "extractors/tap-csv/meltanolabs/bbb--2023-03-23.json",
+        b'{"v":2}',
+    )
+    assert s3_obj.read_object(
+        "mybucket", "extractors/tap-csv/meltanolabs/aaa--2023-03-01.json"
+    ) == b'{"v": 1}'
+    local_file_path = f"{LOCAL_PATH}/extractors/tap-csv/meltanolabs.json"
+    s3_obj.download_latest("mybucket", "extractors/tap-csv/meltanolabs", local_file_path)
+    with open(local_file_path, "rb") as f:
+        assert f.read() == b'{"v":2}'
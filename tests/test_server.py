@@ -0,0 +1,161 @@
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+
+import pytest
+
+from hub_utils.client import query
+from hub_utils.server import CatalogIndex, HubServer, ServerAlreadyRunning
+from hub_utils.utilities import Utilities
+
+DATA_PATH = f"{os.path.dirname(__file__)}/_data"
+
+
+@pytest.fixture
+def hub_root(tmp_path):
+    shutil.copytree(DATA_PATH, tmp_path / "_data")
+    return str(tmp_path)
+
+
+@pytest.fixture
+def socket_path():
+    # Unix socket paths are limited to ~100 characters, so keep it short
+    socket_dir = tempfile.mkdtemp(prefix="hu")
+    yield f"{socket_dir}/hub.sock"
+    shutil.rmtree(socket_dir)
+
+
+@pytest.fixture
+def hub_server(hub_root, socket_path):
+    hub_server = HubServer(socket_path, CatalogIndex(hub_root), poll_interval=60)
+    thread = threading.Thread(target=hub_server.serve_forever, daemon=True)
+    thread.start()
+    yield hub_server
+    hub_server.shutdown()
+    hub_server.server_close()
+    thread.join()
+
+
+def test_variant_names_match_scan(hub_root, hub_server, socket_path):
+    util = Utilities(True)
+    util.hub_root = hub_root
+    for skip, limit in ((0, 10000), (1, 1)):
+        assert query(
+            "variant_names",
+            socket_path=socket_path,
+            plugin_type="extractors",
+            skip=skip,
+            limit=limit,
+        ) == util.get_variant_names("extractors", "sdk", skip, limit)
+
+
+def test_list_and_lookup(hub_server, socket_path):
+    assert query("ping", socket_path=socket_path) == "pong"
+    listed = query(
+        "list", socket_path=socket_path, keyword="meltano_sdk", fields=["variant"]
+    )
+    assert {
+        "suffix": "extractors/tap-github/meltanolabs",
+        "variant": "meltanolabs",
+    } in (listed)
+    found = query(
+        "lookup", socket_path=socket_path, plugin_type="extractors", name="tap-hubspot"
+    )
+    assert sorted(found) == [
+        "extractors/tap-hubspot/hotgluexyz",
+        "extractors/tap-hubspot/meltanolabs",
+    ]
+
+
+def test_refresh_picks_up_changes(hub_root, hub_server, socket_path):
+    path = f"{hub_root}/_data/meltano/loaders/target-foo/someone.yml"
+    os.makedirs(os.path.dirname(path))
+    with open(path, "w") as f:
+        f.write("name: target-foo\nvariant: someone\nkeywords: []\n")
+    assert query("refresh", socket_path=socket_path) == 1
+    assert list(
+        query(
+            "lookup", socket_path=socket_path, plugin_type="loaders", name="target-foo"
+        )
+    ) == ["loaders/target-foo/someone"]
+
+    os.remove(path)
+    assert query("refresh", socket_path=socket_path) == 1
+    assert query("list", socket_path=socket_path, plugin_type="loaders") == []
+
+
+def test_refresh_survives_malformed_save(hub_root, hub_server, socket_path):
+    path = f"{hub_root}/_data/meltano/extractors/tap-github/meltanolabs.yml"
+    with open(path) as f:
+        content = f.read()
+
+    def save(text):
+        with open(path, "w") as f:
+            f.write(text)
+        # Make sure the mtime moves even on coarse-grained filesystems
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    def quality():
+        lookup = query(
+            "lookup", socket_path=socket_path, plugin_type="extractors", name="tap-github"
+        )
+        return lookup["extractors/tap-github/meltanolabs"]["quality"]
+
+    original = quality()
+    save(content + "settings: [\n")
+    assert query("refresh", socket_path=socket_path) == 1
+    # The last good definition is kept
+    assert quality() == original
+
+    save(content.replace(f"quality: {original}", "quality: fixed"))
+    assert query("refresh", socket_path=socket_path) == 1
+    assert quality() == "fixed"
+
+
+def test_watcher_survives_refresh_errors(hub_root, socket_path):
+    index = CatalogIndex(hub_root)
+    calls = []
+
+    def refresh():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+        return 0
+
+    index.refresh = refresh
+    hub_server = HubServer(socket_path, index, poll_interval=0.01)
+    watcher = threading.Thread(target=hub_server._watch, daemon=True)
+    watcher.start()
+    deadline = time.monotonic() + 5
+    while len(calls) < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    hub_server._stopped.set()
+    watcher.join()
+    hub_server.server_close()
+    assert len(calls) >= 3
+
+
+def test_errors_are_returned(hub_server, socket_path):
+    with pytest.raises(RuntimeError, match="Unknown or missing op"):
+        query("nope", socket_path=socket_path)
+    with pytest.raises(RuntimeError, match="TypeError"):
+        query("lookup", socket_path=socket_path, unexpected=1)
+
+
+def test_refuses_to_replace_live_server(hub_root, hub_server, socket_path):
+    with pytest.raises(ServerAlreadyRunning):
+        HubServer(socket_path, CatalogIndex(hub_root))
+    assert query("ping", socket_path=socket_path) == "pong"
+
+
+def test_replaces_stale_socket(hub_root, socket_path):
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(socket_path)
+    stale.close()
+    hub_server = HubServer(socket_path, CatalogIndex(hub_root))
+    hub_server.server_close()
+    assert not os.path.exists(socket_path)
@@ -0,0 +1,68 @@
+import json
+import os
+
+import boto3
+import pytest
+from moto import mock_s3
+
+from hub_utils.main import download_metadata, publish_snapshot
+from hub_utils.s3 import S3
+from hub_utils.snapshot import pack_snapshot, snapshot_format, unpack_snapshot
+
+PATH = os.path.dirname(__file__)
+GITHUB_KEY = "extractors/tap-github/meltanolabs/aaa--2023-03-23.json"
+HUBSPOT_KEY = "extractors/tap-hubspot/meltanolabs/bbb--2023-03-24.json"
+
+
+@pytest.mark.parametrize("fmt", ["tar.gz", "jsonl.gz"])
+def test_pack_unpack_snapshot(fmt):
+    extracts = [
+        ({"suffix": "extractors/tap-github/meltanolabs", "hash": "aaa"}, b'{"a":1}'),
+        ({"suffix": "loaders/target-csv/meltanolabs", "hash": "bbb"}, b'{"b":2}'),
+    ]
+    manifest, unpacked = unpack_snapshot(pack_snapshot(extracts, fmt), fmt)
+    assert manifest["format"] == fmt
+    assert manifest["extracts"] == [entry for entry, _ in extracts]
+    assert {suffix: json.loads(body) for suffix, body in unpacked.items()} == {
+        "extractors/tap-github/meltanolabs": {"a": 1},
+        "loaders/target-csv/meltanolabs": {"b": 2},
+    }
+
+
+def test_snapshot_format():
+    assert snapshot_format("snapshots/latest.jsonl.gz") == "jsonl.gz"
+    with pytest.raises(ValueError):
+        snapshot_format("snapshots/latest.zip")
+
+
+@mock_s3
+@pytest.mark.parametrize("key", ["snapshots/latest.tar.gz", "s/latest.jsonl.gz"])
+def test_publish_and_download_snapshot(key, tmp_path):
+    os.environ["AWS_S3_BUCKET"] = "mybucket"
+    boto3.resource("s3", region_name="us-east-1").create_bucket(Bucket="mybucket")
+    s3 = S3()
+    s3.upload_bytes("mybucket", GITHUB_KEY, b'{"name": "tap-github"}')
+    s3.upload_bytes("mybucket", HUBSPOT_KEY, b'{"name":"tap-hubspot"}', compress=True)
+
+    publish_snapshot(PATH, variant_path_list=None, key=key, workers=2)
+
+    manifest, _ = unpack_snapshot(s3.read_object("mybucket", key), snapshot_format(key))
+    assert [entry["key"] for entry in manifest["extracts"]] == [
+        GITHUB_KEY,
+        HUBSPOT_KEY,
+    ]
+    assert manifest["extracts"][0]["date"] == "2023-03-23"
+
+    download_metadata(
+        str(tmp_path),
+        variant_path_list="extractors/tap-hubspot/meltanolabs",
+        all_sdk=False,
+        ignore_list_str="",
+        snapshot=True,
+        snapshot_key=key,
+    )
+    assert [str(p.relative_to(tmp_path)) for p in tmp_path.rglob("*.json")] == [
+        "extractors/tap-hubspot/meltanolabs.json"
+    ]
+    with open(tmp_path / "extractors/tap-hubspot/meltanolabs.json") as f:
+        assert json.load(f) == {"name": "tap-hubspot"}
@@ -0,0 +1,81 @@
+import json
+import os
+import shutil
+from unittest.mock import patch
+
+import boto3
+from moto import mock_s3
+
+from hub_utils.s3 import S3
+from hub_utils.sync import sync_sdk_metadata
+from hub_utils.utilities import Utilities
+
+PATH = os.path.dirname(__file__)
+
+
+def _hub(tmp_path):
+    shutil.copytree(f"{PATH}/_data", tmp_path / "_data")
+    util = Utilities()
+    util.hub_root = str(tmp_path)
+    return util
+
+
+def _put_extract(key, about):
+    conn = boto3.resource("s3", region_name="us-east-1")
+    conn.Object("mybucket", key).put(Body=json.dumps(about).encode("utf-8"))
+
+
+@mock_s3
+@patch("hub_utils.sync.run_yamllint")
+def test_sync_sdk_metadata(run_yamllint, tmp_path):
+    util = _hub(tmp_path)
+    boto3.resource("s3", region_name="us-east-1").create_bucket(Bucket="mybucket")
+    with open(f"{PATH}/data/tap_apaleo_about.json", "r") as f:
+        about = json.load(f)
+    about["name"] = "tap-github"
+    _put_extract("extractors/tap-github/meltanolabs/aaa--2023-03-01.json", {})
+    _put_extract("extractors/tap-github/meltanolabs/bbb--2023-03-23.json", about)
+    # Shares the prefix of tap-github/meltanolabs but isn't its extract
+    _put_extract("extractors/tap-github/meltanolabs-x/ccc--2023-04-01.json", {})
+
+    summary = sync_sdk_metadata(util, S3(), "mybucket", workers=2, queue_size=1)
+
+    assert summary["merged"] == [{"suffix": "extractors/tap-github/meltanolabs"}]
+    assert sorted(entry["suffix"] for entry in summary["missing"]) == [
+        "extractors/tap-hubspot/hotgluexyz",
+        "extractors/tap-hubspot/meltanolabs",
+    ]
+    assert summary["failed"] == []
+    github = util._read_yaml(
+        f"{tmp_path}/_data/meltano/extractors/tap-github/meltanolabs.yml"
+    )
+    setting_names = {setting["name"] for setting in github["settings"]}
+    assert {"client_id", "client_secret"} <= setting_names
+    run_yamllint.assert_called_once_with(
+        [f"{tmp_path}/_data/meltano/extractors/tap-github/meltanolabs.yml"]
+    )
+
+
+@mock_s3
+@patch("hub_utils.sync.run_yamllint")
+def test_sync_sdk_metadata_failure_doesnt_stop_pipeline(run_yamllint, tmp_path):
+    util = _hub(tmp_path)
+    boto3.resource("s3", region_name="us-east-1").create_bucket(Bucket="mybucket")
+    conn = boto3.resource("s3", region_name="us-east-1")
+    conn.Object(
+        "mybucket", "extractors/tap-github/meltanolabs/bbb--2023-03-23.json"
+    ).put(Body=b"not json")
+
+    ignore_list = {
+        "extractors/tap-hubspot/meltanolabs",
+        "extractors/tap-hubspot/hotgluexyz",
+    }
+
+    summary = sync_sdk_metadata(util, S3(), "mybucket", ignore_list=ignore_list)
+
+    assert summary["merged"] == []
+    assert [entry["suffix"] for entry in summary["failed"]] == [
+        "extractors/tap-github/meltanolabs"
+    ]
+    assert "JSONDecodeError" in summary["failed"][0]["error"]
+    run_yamllint.assert_not_called()
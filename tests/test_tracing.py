@@ -0,0 +1,49 @@
+import json
+import threading
+
+from hub_utils.tracing import Tracer
+
+
+def test_span_disabled_records_nothing(tmp_path):
+    tracer = Tracer()
+    with tracer.span("noop"):
+        pass
+    tracer.export(tmp_path / "trace.json")
+    with open(tmp_path / "trace.json") as f:
+        assert json.load(f)["traceEvents"] == []
+
+
+def test_span_export_chrome_format(tmp_path):
+    tracer = Tracer()
+    tracer.enable()
+
+    def work():
+        with tracer.span("worker", "test"):
+            pass
+
+    with tracer.span("outer", "test", plugin="tap-csv"):
+        with tracer.span("inner", "test"):
+            pass
+        worker = threading.Thread(target=work)
+        worker.start()
+        worker.join()
+    tracer.export(tmp_path / "trace.json")
+    with open(tmp_path / "trace.json") as f:
+        events = json.load(f)["traceEvents"]
+    spans = [e for e in events if e["ph"] == "X"]
+    assert [e["name"] for e in spans] == ["inner", "worker", "outer"]
+    assert spans[2]["args"] == {"plugin": "tap-csv"}
+    assert spans[2]["dur"] >= spans[0]["dur"]
+    assert spans[0]["tid"] == spans[2]["tid"] != spans[1]["tid"]
+    assert {e["tid"] for e in events if e["ph"] == "M"} == {e["tid"] for e in spans}
+
+
+def test_span_records_error(tmp_path):
+    tracer = Tracer()
+    tracer.enable()
+    try:
+        with tracer.span("boom"):
+            raise ValueError("bad")
+    except ValueError:
+        pass
+    assert "ValueError" in tracer._events[0]["args"]["error"]
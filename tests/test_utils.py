@@ -2,6 +2,8 @@ from unittest.mock import patch
 
 import pytest
 
+from hub_utils.meltano_util import MeltanoUtil
+from hub_utils.preinstall import BackgroundInstall
 from hub_utils.utilities import Utilities
 
 
@@ -72,6 +74,7 @@ def test_merge_and_update(patch):
             ],
             "settings_group_validation": [["files"], ["csv_files_definition"]],
         },
+        True,
     )
 
 
@@ -170,6 +173,7 @@ def test_merge_and_update_manual_sgv(patch):
                 ]
             ]
         },
+        True,
     )
 
 
@@ -355,3 +359,90 @@ def test_merge_settings(existing, new, expected):
     utils = Utilities()
     merged_settings = utils._merge_settings(existing, new)
     assert merged_settings == expected
+
+
+@patch.object(MeltanoUtil, "sdk_about", return_value={"name": "tap-foo"})
+@patch.object(MeltanoUtil, "help_test")
+@patch.object(MeltanoUtil, "add", return_value="installed package tap-foo\n")
+def test_test_uses_background_install(add, help_test, sdk_about, capsys):
+    utils = Utilities(True)
+    args = ("tap-foo", "extractors", "git+https://github.com/a/tap-foo.git")
+    preinstall = BackgroundInstall(*args, "tap_foo", "tap-foo").start()
+    assert preinstall.restart_if_changed(*args, "tap_foo", "tap-foo") is preinstall
+    preinstall.join()
+    # The captured pipx output is only shown once the result is collected
+    assert capsys.readouterr().out == ""
+    about = utils._test(*args, "tap_foo", "tap-foo", True, preinstall=preinstall)
+    assert about == {"name": "tap-foo"}
+    assert capsys.readouterr().out == "installed package tap-foo\n"
+    add.assert_called_once()
+    assert add.call_args.kwargs == {"capture_stderr": True}
+    sdk_about.assert_called_once_with("tap-foo")
+
+
+@patch("hub_utils.utilities.BackgroundInstall")
+def test_add_only_preinstalls_after_install_test_accepted(background_install):
+    class Answered(Exception):
+        pass
+
+    def prompt(question, default_val=None, type=None):
+        if question == "Run install test?":
+            return answer
+        if question == "is_meltano_sdk":
+            raise Answered()
+        return default_val
+
+    utils = Utilities()
+    utils._prompt = prompt
+    for answer, started in ((False, False), (True, True)):
+        background_install.reset_mock()
+        with pytest.raises(Answered):
+            utils.add("https://github.com/a/tap-foo")
+        assert background_install.called == started
+
+
+@patch.object(MeltanoUtil, "sdk_about", return_value={"name": "tap-foo"})
+@patch.object(MeltanoUtil, "help_test")
+@patch.object(MeltanoUtil, "add")
+def test_test_skips_declined_install(add, help_test, sdk_about):
+    utils = Utilities(True)
+    args = ("tap-foo", "extractors", "git+https://github.com/a/tap-foo.git")
+    about = utils._test(*args, "tap_foo", "tap-foo", True, run_install=False)
+    assert about == {"name": "tap-foo"}
+    add.assert_not_called()
+    help_test.assert_not_called()
+
+
+@patch.object(MeltanoUtil, "sdk_about", side_effect=lambda executable: executable)
+@patch.object(MeltanoUtil, "help_test")
+@patch.object(MeltanoUtil, "add")
+def test_background_install_restarts_on_change(add, help_test, sdk_about):
+    utils = Utilities(True)
+    first = BackgroundInstall(
+        "tap-foo", "extractors", "git+https://x/tap-foo.git", "tap_foo", "tap-foo"
+    ).start()
+    second = first.restart_if_changed(
+        "tap-foo", "extractors", "git+https://x/tap-foo.git", "tap_foo", "foo"
+    )
+    assert second is not first
+    about = utils._test(
+        "tap-foo",
+        "extractors",
+        "git+https://x/tap-foo.git",
+        "tap_foo",
+        "foo",
+        True,
+        preinstall=second,
+    )
+    assert about == "foo"
+    assert [c.args[2] for c in add.call_args_list] == ["tap-foo", "foo"]
+
+
+@patch.object(MeltanoUtil, "help_test", side_effect=ValueError("no help"))
+@patch.object(MeltanoUtil, "add")
+def test_background_install_failure_is_raised(add, help_test):
+    preinstall = BackgroundInstall(
+        "tap-foo", "extractors", "git+https://x/tap-foo.git", "tap_foo", "tap-foo"
+    ).start()
+    with pytest.raises(ValueError, match="no help"):
+        preinstall.about_result()
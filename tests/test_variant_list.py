@@ -0,0 +1,34 @@
+import io
+
+from hub_utils.variant_list import iter_variant_paths
+
+
+def test_comma_separated():
+    assert list(iter_variant_paths("a/b/c.yml,,d/e/f.yml")) == [
+        "a/b/c.yml",
+        "d/e/f.yml",
+    ]
+    assert list(iter_variant_paths(None)) == []
+
+
+def test_file(tmp_path):
+    path = tmp_path / "variants.txt"
+    path.write_text("a/b/c.yml\n\nd/e/f.yml,g/h/i.yml\n")
+    assert list(iter_variant_paths(f"@{path}")) == [
+        "a/b/c.yml",
+        "d/e/f.yml",
+        "g/h/i.yml",
+    ]
+
+
+def test_ndjson_stdin():
+    stdin = io.StringIO(
+        '{"plugin-name": "extractors/tap-a/x.yml"}\n'
+        '"loaders/target-b/y.yml"\n'
+        '{"suffix": "extractors/tap-c/z"}\n'
+    )
+    paths = iter_variant_paths("-", stdin=stdin)
+    assert next(paths) == "extractors/tap-a/x.yml"
+    # Lines are read lazily
+    assert stdin.tell() < len(stdin.getvalue())
+    assert list(paths) == ["loaders/target-b/y.yml", "extractors/tap-c/z"]
@@ -0,0 +1,91 @@
+import os
+import shutil
+
+import pytest
+
+from hub_utils.watch import Watcher
+
+DATA_PATH = f"{os.path.dirname(__file__)}/_data"
+CONFIG_PATH = f"{os.path.dirname(os.path.dirname(__file__))}/.yamllint.yaml"
+
+
+@pytest.fixture
+def watcher(tmp_path):
+    shutil.copytree(DATA_PATH, tmp_path / "_data")
+    return Watcher(str(tmp_path / "_data"), config_path=CONFIG_PATH, debounce=0.3)
+
+
+def _edit(path, content):
+    with open(path, "w") as f:
+        f.write(content)
+    # Make sure the mtime moves even on coarse-grained filesystems
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+def test_watch_debounces_and_fixes(watcher, tmp_path):
+    path = str(tmp_path / "_data/meltano/extractors/tap-foo/someone.yml")
+    os.makedirs(os.path.dirname(path))
+    _edit(path, "variant: someone\nname: tap-foo\n")
+
+    # Still inside the debounce window
+    assert watcher.tick(now=100.0) == {}
+    assert watcher.tick(now=100.1) == {}
+    assert watcher.tick(now=100.5) == {path: []}
+    with open(path) as f:
+        content = f.read()
+    assert content.index("name: tap-foo") < content.index("variant: someone")
+
+    # The fix was our own write, so nothing is pending
+    assert watcher.tick(now=101.0) == {}
+
+
+def test_watch_reports_lint_problems(watcher, tmp_path):
+    path = str(tmp_path / "_data/meltano/extractors/tap-bar/someone.yml")
+    os.makedirs(os.path.dirname(path))
+    _edit(path, "name: tap-bar\nvariant: someone\n")
+    watcher.tick(now=0.0)
+    assert watcher.tick(now=1.0) == {path: []}
+
+    watcher.fix = False
+    _edit(path, "variant: someone\nname: tap-bar\n")
+    watcher.tick(now=2.0)
+    results = watcher.tick(now=3.0)
+    assert len(results[path]) == 1
+    assert "key-ordering" in results[path][0]
+
+
+def test_watch_skips_unchanged_content(watcher, tmp_path):
+    path = str(tmp_path / "_data/meltano/extractors/tap-github/meltanolabs.yml")
+    with open(path) as f:
+        _edit(path, f.read())
+    watcher.tick(now=0.0)
+    assert path in watcher.tick(now=1.0)
+
+    # Touching the file with the fixed content again isn't a change
+    with open(path) as f:
+        content = f.read()
+    _edit(path, content)
+    watcher.tick(now=2.0)
+    assert watcher.tick(now=3.0) == {}
+
+
+def test_watch_leaves_malformed_save_untouched(watcher, tmp_path):
+    path = str(tmp_path / "_data/meltano/extractors/tap-x/someone.yml")
+    os.makedirs(os.path.dirname(path))
+    # A missing colon parses as a plain string
+    _edit(path, "name tap-x\nvariant someone\n")
+    watcher.tick(now=0.0)
+    results = watcher.tick(now=1.0)
+    assert "not a YAML mapping" in results[path][0]
+    with open(path) as f:
+        assert f.read() == "name tap-x\nvariant someone\n"
+    assert os.listdir(os.path.dirname(path)) == ["someone.yml"]
+
+    # Once fixed by the user it's processed like any other edit
+    _edit(path, "variant: someone\nname: tap-x\n")
+    watcher.tick(now=2.0)
+    assert watcher.tick(now=3.0) == {path: []}
+    with open(path) as f:
+        content = f.read()
+    assert content.index("name: tap-x") < content.index("variant: someone")